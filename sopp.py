@@ -44,8 +44,9 @@ def main():
 
     sopp = Sopp(configuration)
 
-    interference_windows = sopp.get_satellites_crossing_main_beam()
-    satellites_above_horizon = sopp.get_satellites_above_horizon()
+    interference_report = sopp.get_interference_report()
+    interference_windows = interference_report.satellites_crossing_main_beam
+    satellites_above_horizon = interference_report.satellites_above_horizon
 
     print("=======================================================================================\n")
     print('       Found ', len(interference_windows), ' instances of satellites crossing the main beam.')
@@ -129,11 +129,23 @@ class ConfigurationBuilder:
         time_continuity_resolution: Optional[int] = 1,
         concurrency_level: Optional[int] = 1,
         min_altitude: Optional[float] = 0.0,
+        ephemeris_cache_directory: Optional[Path] = None,
+        ephemeris_cache_max_size_mb: Optional[float] = 1024,
+        coarse_time_resolution: Optional[int] = None,
+        circular_main_beam: bool = False,
+        memory_budget_mb: Optional[float] = None,
+        track_power_contributions: bool = False,
     ) -> 'ConfigurationBuilder':
         self.runtime_settings = RuntimeSettings(
             concurrency_level=concurrency_level,
             time_continuity_resolution=time_continuity_resolution,
             min_altitude=min_altitude,
+            ephemeris_cache_directory=ephemeris_cache_directory,
+            ephemeris_cache_max_size_mb=ephemeris_cache_max_size_mb,
+            coarse_time_resolution=coarse_time_resolution,
+            circular_main_beam=circular_main_beam,
+            memory_budget_mb=memory_budget_mb,
+            track_power_contributions=track_power_contributions,
         )
         return self
 
@@ -0,0 +1,20 @@
+from dataclasses import dataclass, field
+from typing import List
+
+from sopp.custom_dataclasses.overhead_window import OverheadWindow
+
+'''
+The InterferenceReport class holds the results of the horizon and main beam queries found together from a single
+propagation of every satellite.
+
+  + satellites_above_horizon:       the OverheadWindows returned by get_satellites_above_horizon().
+  + satellites_crossing_main_beam:  the OverheadWindows returned by get_satellites_crossing_main_beam().
+  + number_of_satellites_pruned:    how many satellites the visibility prefilter dropped without propagating them.
+'''
+
+
+@dataclass
+class InterferenceReport:
+    satellites_above_horizon: List[OverheadWindow] = field(default_factory=list)
+    satellites_crossing_main_beam: List[OverheadWindow] = field(default_factory=list)
+    number_of_satellites_pruned: int = field(default=0)
@@ -1,29 +1,71 @@
 from dataclasses import dataclass, field
 from operator import attrgetter
-from typing import List
+from typing import List, Optional
 from sopp.custom_dataclasses.satellite.satellite import Satellite
 from sopp.custom_dataclasses.time_window import TimeWindow
 from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.position_arrays import PositionArrays
 
 '''
 OverheadWindow class is designed to store the time windows that a given satellite is overhead and includes the Satellite object,
 as well as a TimeWindow object that contains the interference start and end times.
 
-  + satellite:      the Satellite that is overhead during the time window.
-  + positions:      a list of PositionTimes of the satellite while within the main beam
-  + overhead_time:  a property TimeWindow representing the time the satellite enters and exits view.
+  + satellite:          the Satellite that is overhead during the time window.
+  + positions:          a list of PositionTimes of the satellite while within the main beam
+  + position_arrays:    optional PositionArrays of the satellite while within the main beam, usually a time_slice() view of the
+                        arrays the satellite was propagated into. When it is given instead of positions, the positions are
+                        only built from it the first time they are accessed, and they are not sorted again since the arrays
+                        are already in time order. Only the arrays are pickled.
+  + overhead_time:      a property TimeWindow representing the time the satellite enters and exits view.
+
+Windows compare and print by their satellite and positions, whether these were given or built from position_arrays.
 '''
 
-@dataclass
+@dataclass(init=False, repr=False, eq=False)
 class OverheadWindow:
     satellite: Satellite
-    positions: List[PositionTime] = field(default_factory=list)
+    position_arrays: Optional[PositionArrays] = field(default=None, repr=False, compare=False)
+    _positions: Optional[List[PositionTime]] = field(default=None, repr=False, compare=False)
+
+    def __init__(
+        self,
+        satellite: Satellite,
+        positions: Optional[List[PositionTime]] = None,
+        position_arrays: Optional[PositionArrays] = None
+    ):
+        self.satellite = satellite
+        self.position_arrays = position_arrays
+        if position_arrays is not None and not positions:
+            self._positions = None
+        else:
+            self._positions = [] if positions is None else positions
+            self._positions.sort(key=attrgetter('time'))
+
+    @property
+    def positions(self) -> List[PositionTime]:
+        if self._positions is None:
+            self._positions = self.position_arrays.to_position_times()
+        return self._positions
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.satellite == other.satellite and self.positions == other.positions
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(satellite={self.satellite!r}, positions={self.positions!r})'
 
-    def __post_init__(self):
-        self.positions.sort(key=attrgetter('time'))
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        if state['position_arrays'] is not None:
+            state['_positions'] = None
+        return state
 
     @property
     def overhead_time(self):
+        if self.position_arrays is not None:
+            times = self.position_arrays.times
+            return TimeWindow(begin=times[0], end=times[-1]) if len(times) else None
         if not self.positions:
             return None
         begin = self.positions[0].time
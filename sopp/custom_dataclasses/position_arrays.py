@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Union
+
+import numpy as np
+
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.time_grid import TimeGrid
+
+'''
+The PositionArrays class stores the topocentric positions of a catalog of satellites over a shared time grid as dense
+NumPy arrays instead of per-sample PositionTime objects.
+
+  + altitude:       array of altitudes in degrees with shape (n_satellites, n_times).
+  + azimuth:        array of azimuths in degrees with shape (n_satellites, n_times).
+  + distance_km:    array of distances to the facility in kilometers with shape (n_satellites, n_times).
+  + times:          the TimeGrid, or list of datetimes, of the samples, one per column.
+
+Indexing a PositionArrays with a satellite index returns the PositionArrays of that satellite alone, with one dimensional
+arrays, which can be converted into a list of PositionTimes with to_position_times(), optionally for a subset of sample
+indices only. time_slice() returns the samples between two time indices as views of the same arrays, without copying them,
+and concatenate() joins consecutive PositionArrays along the time axis.
+'''
+
+
+@dataclass
+class PositionArrays:
+    altitude: np.ndarray
+    azimuth: np.ndarray
+    distance_km: np.ndarray
+    times: Union[List[datetime], TimeGrid]
+
+    def __getitem__(self, index: int) -> 'PositionArrays':
+        return PositionArrays(
+            altitude=self.altitude[index],
+            azimuth=self.azimuth[index],
+            distance_km=self.distance_km[index],
+            times=self.times
+        )
+
+    def time_slice(self, start: int, stop: int) -> 'PositionArrays':
+        return PositionArrays(
+            altitude=self.altitude[..., start:stop],
+            azimuth=self.azimuth[..., start:stop],
+            distance_km=self.distance_km[..., start:stop],
+            times=self.times[start:stop]
+        )
+
+    @classmethod
+    def concatenate(cls, position_arrays: List['PositionArrays']) -> 'PositionArrays':
+        times = [arrays.times for arrays in position_arrays]
+        return cls(
+            altitude=np.concatenate([arrays.altitude for arrays in position_arrays], axis=-1),
+            azimuth=np.concatenate([arrays.azimuth for arrays in position_arrays], axis=-1),
+            distance_km=np.concatenate([arrays.distance_km for arrays in position_arrays], axis=-1),
+            times=(
+                TimeGrid.concatenate(times) if all(isinstance(time_grid, TimeGrid) for time_grid in times)
+                else [time for chunk_times in times for time in chunk_times]
+            )
+        )
+
+    def to_position_times(self, indices: Optional[np.ndarray] = None) -> List[PositionTime]:
+        if indices is None:
+            indices = range(len(self.times))
+        return [
+            PositionTime(
+                Position(altitude=self.altitude[index], azimuth=self.azimuth[index], distance_km=self.distance_km[index]),
+                time=self.times[index]
+            )
+            for index in indices
+        ]
@@ -1,18 +1,145 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
 import numpy as np
 
+from sopp.custom_dataclasses.power_summary import PowerSummary
+from sopp.custom_dataclasses.time_window import TimeWindow
+from sopp.power_tracer import POWER_TRACER
+
+DEFAULT_SUMMARY_BIN_WIDTHS = (timedelta(minutes=1), timedelta(hours=1))
+BIN_INDEX_TOLERANCE = 1e-9
+
+
 class PowerArray:
-    def __init__(self, length: int):
+    '''
+    The PowerArray accumulates received power over time in bins of bin_width, starting at begin. Bin i covers the times from
+    begin + i * bin_width up to the next bin, so the bin width can follow time_continuity_resolution, including fractions of
+    a second, without samples colliding in or skipping bins. Without a begin time the PowerArray is indexed by bin only.
+
+    summary() downsamples the array to a coarser bin width, with the maximum and mean power of each coarse bin, and
+    summaries() returns the per-minute and per-hour levels. Levels are computed the first time they are asked for and kept
+    until power is added again, so plots and threshold checks on long windows can read them without going over the full
+    resolution array each time.
+    '''
+    def __init__(self, length: int, begin: Optional[datetime] = None, bin_width: timedelta = timedelta(seconds=1)):
+        if bin_width <= timedelta(0):
+            raise ValueError(f"bin_width must be positive, provided: {bin_width}")
         self.length = length
+        self.begin = begin
+        self.bin_width = bin_width
         self.array = np.zeros(length, dtype=np.float64)  # Initialize as a NumPy array of zeros with float type
+        self._summaries: Dict[timedelta, PowerSummary] = {}
+
+    @classmethod
+    def for_time_window(cls, time_window: TimeWindow, bin_width: timedelta = timedelta(seconds=1)) -> 'PowerArray':
+        return cls(int((time_window.end - time_window.begin) / bin_width) + 1, begin=time_window.begin, bin_width=bin_width)
+
+    @classmethod
+    def zeros_like(cls, power_array: 'PowerArray') -> 'PowerArray':
+        return cls(power_array.length, begin=power_array.begin, bin_width=power_array.bin_width)
+
+    def index_of(self, time: datetime) -> int:
+        return int(self.indices_of(np.array([time.timestamp()]))[0])
+
+    def indices_of(self, timestamps: np.ndarray) -> np.ndarray:
+        if self.begin is None:
+            raise ValueError("PowerArray has no begin time to index by time")
+        bins = (np.asarray(timestamps, dtype=float) - self.begin.timestamp()) / self.bin_width.total_seconds()
+        return np.floor(bins + BIN_INDEX_TOLERANCE).astype(np.int64)
+
+    def time_of(self, index: int) -> datetime:
+        if self.begin is None:
+            raise ValueError("PowerArray has no begin time")
+        return self.begin + index * self.bin_width
+
+    def add_power_at(self, time: datetime, power: float):
+        self.add_power(self.index_of(time), power)
+
+    def add_powers_at(self, timestamps: np.ndarray, powers: np.ndarray):
+        self.add_powers(self.indices_of(timestamps), powers)
 
     def add_power(self, index, power):
         if 0 <= index < self.length:
             self.array[index] += float(power)
-            print("We got here!! index we're adding the power to is: " + str(index) + " the power is" + str(power))
-            #print(self.array)
+            self._summaries.clear()
+            if POWER_TRACER.enabled:
+                POWER_TRACER.record('power_array.add_power', index=index, power=power)
         else:
             raise IndexError("Index out of range")
 
+    def add_powers(self, indices: np.ndarray, powers: np.ndarray):
+        indices = np.asarray(indices, dtype=np.int64)
+        if indices.size and (indices.min() < 0 or indices.max() >= self.length):
+            raise IndexError("Index out of range")
+        np.add.at(self.array, indices, np.asarray(powers, dtype=np.float64))
+        self._summaries.clear()
+        if POWER_TRACER.enabled:
+            POWER_TRACER.record('power_array.add_powers', count=indices.size, indices=indices, powers=powers)
+
+    def add_power_array(self, other: 'PowerArray'):
+        if not self._has_same_axis(other):
+            raise ValueError(f"PowerArray time axes differ: {self._axis} and {other._axis}")
+        self.array += other.array
+        self._summaries.clear()
+
+    @staticmethod
+    def tree_sum(power_arrays: List['PowerArray']) -> 'PowerArray':
+        '''
+        Sums equal length PowerArrays pairwise, halving the number of arrays on every pass, so that partial results of
+        similar size are added together. Returns a new PowerArray and leaves the given ones unchanged.
+        '''
+        if not power_arrays:
+            raise ValueError("No PowerArrays to sum")
+        if not all(power_arrays[0]._has_same_axis(power_array) for power_array in power_arrays):
+            raise ValueError("PowerArray time axes differ")
+
+        partial_sums = [power_array.array for power_array in power_arrays]
+        while len(partial_sums) > 1:
+            partial_sums = [
+                partial_sums[index] + partial_sums[index + 1] if index + 1 < len(partial_sums) else partial_sums[index]
+                for index in range(0, len(partial_sums), 2)
+            ]
+
+        power_array = PowerArray.zeros_like(power_arrays[0])
+        power_array.array += partial_sums[0]
+        return power_array
+
+    def summary(self, bin_width: timedelta) -> PowerSummary:
+        '''
+        Downsamples the array to bins of bin_width. Each PowerArray bin goes to the coarse bin its start falls in, so the
+        bin width does not need to divide bin_width evenly. The last coarse bin may hold fewer PowerArray bins.
+        '''
+        if bin_width < self.bin_width:
+            raise ValueError(f"Summary bin_width must be at least the PowerArray bin_width {self.bin_width}, provided: {bin_width}")
+        if bin_width not in self._summaries:
+            self._summaries[bin_width] = self._summarize(bin_width)
+        return self._summaries[bin_width]
+
+    def summaries(self, bin_widths: Tuple[timedelta, ...] = DEFAULT_SUMMARY_BIN_WIDTHS) -> List[PowerSummary]:
+        return [self.summary(bin_width) for bin_width in bin_widths if bin_width >= self.bin_width]
+
+    def _summarize(self, bin_width: timedelta) -> PowerSummary:
+        if not self.length:
+            return PowerSummary(begin=self.begin, bin_width=bin_width, maximum=np.zeros(0), mean=np.zeros(0))
+
+        coarse_indices = np.floor(np.arange(self.length) * (self.bin_width / bin_width) + BIN_INDEX_TOLERANCE).astype(np.int64)
+        starts = np.flatnonzero(np.diff(coarse_indices, prepend=-1))
+        counts = np.diff(np.append(starts, self.length))
+        return PowerSummary(
+            begin=self.begin,
+            bin_width=bin_width,
+            maximum=np.maximum.reduceat(self.array, starts),
+            mean=np.add.reduceat(self.array, starts) / counts
+        )
+
+    @property
+    def _axis(self) -> Tuple[int, Optional[datetime], timedelta]:
+        return self.length, self.begin, self.bin_width
+
+    def _has_same_axis(self, other: 'PowerArray') -> bool:
+        return self._axis == other._axis
+
     def get_power(self, index):
         if 0 <= index < self.length:
             return self.array[index]
@@ -20,7 +147,7 @@ class PowerArray:
             raise IndexError("Index out of range")
 
     def __repr__(self):
-        return f"PowerArray(length={self.length}, array={self.array})"
+        return f"PowerArray(length={self.length}, begin={self.begin}, bin_width={self.bin_width}, array={self.array})"
 
 # Example usage:
 if __name__ == "__main__":
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csc_matrix
+
+from sopp.custom_dataclasses.power_array import PowerArray
+from sopp.custom_dataclasses.time_window import TimeWindow
+
+
+class PowerContribution(NamedTuple):
+    satellite_index: int
+    satellite_name: str
+    energy: float
+
+
+class PowerContributions:
+    '''
+    The PowerContributions store the power that each satellite adds to every bin of a PowerArray, as a sparse
+    (satellite x bin) matrix. Only the bins where a satellite is in view are stored, so memory grows with the number of in
+    view samples and not with the size of the catalog times the length of the reservation.
+
+    Contributions are added as coordinate triplets, one batch per satellite, and turned into a compressed sparse column
+    matrix the first time they are queried. Columns are time bins, so slicing an interval only reads the bins inside it.
+
+      + top_contributors():     the k satellites with the most energy in a time window, or in the whole reservation.
+      + energy_per_satellite(): the energy received from every satellite, in Joules.
+      + power_of():             the power of a single satellite in every bin.
+      + to_power_array():       the summed power of all the satellites, the same as the PowerArray of the run.
+
+    Satellites are identified by their index in the catalog of the run.
+    '''
+    def __init__(self, satellite_names: List[str], length: int, begin: Optional[datetime] = None,
+                 bin_width: timedelta = timedelta(seconds=1)):
+        self.satellite_names = list(satellite_names)
+        self.length = length
+        self.begin = begin
+        self.bin_width = bin_width
+        self._triplets: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._matrix: Optional[csc_matrix] = None
+
+    @classmethod
+    def for_power_array(cls, power_array: PowerArray, satellite_names: List[str]) -> 'PowerContributions':
+        return cls(satellite_names, length=power_array.length, begin=power_array.begin, bin_width=power_array.bin_width)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.satellite_names), self.length
+
+    def add(self, satellite_index: int, indices: np.ndarray, powers: np.ndarray):
+        indices = np.asarray(indices, dtype=np.int64)
+        if indices.size and (indices.min() < 0 or indices.max() >= self.length):
+            raise IndexError("Index out of range")
+        self._triplets.append((np.full(indices.size, satellite_index, dtype=np.int64), indices,
+                               np.asarray(powers, dtype=np.float64)))
+
+    def extend(self, other: 'PowerContributions'):
+        if (other.shape, other.begin, other.bin_width) != (self.shape, self.begin, self.bin_width):
+            raise ValueError("PowerContributions axes differ")
+        self._triplets.extend(other._triplets)
+        if other._matrix is not None:
+            other_matrix = other._matrix.tocoo()
+            self._triplets.append((other_matrix.row.astype(np.int64), other_matrix.col.astype(np.int64), other_matrix.data))
+
+    @property
+    def matrix(self) -> csc_matrix:
+        '''
+        The (satellite x bin) matrix of power in Watts. Triplets added since the last query are summed into it first.
+        '''
+        if self._triplets:
+            satellite_indices, indices, powers = (np.concatenate(parts) for parts in zip(*self._triplets))
+            added_matrix = csc_matrix((powers, (satellite_indices, indices)), shape=self.shape)
+            self._matrix = added_matrix if self._matrix is None else self._matrix + added_matrix
+            self._triplets = []
+        if self._matrix is None:
+            self._matrix = csc_matrix(self.shape, dtype=np.float64)
+        return self._matrix
+
+    def energy_per_satellite(self, time_window: Optional[TimeWindow] = None) -> np.ndarray:
+        start, stop = self._bin_range(time_window)
+        return np.asarray(self.matrix[:, start:stop].sum(axis=1)).ravel() * self.bin_width.total_seconds()
+
+    def top_contributors(self, k: int, time_window: Optional[TimeWindow] = None) -> List[PowerContribution]:
+        energy = self.energy_per_satellite(time_window)
+        contributing_indices = np.flatnonzero(energy > 0)
+        top_indices = contributing_indices[np.argsort(-energy[contributing_indices], kind='stable')[:k]]
+        return [
+            PowerContribution(satellite_index=int(index), satellite_name=self.satellite_names[index], energy=float(energy[index]))
+            for index in top_indices
+        ]
+
+    def power_of(self, satellite_index: int) -> np.ndarray:
+        return self.matrix[satellite_index].toarray().ravel()
+
+    def to_power_array(self) -> PowerArray:
+        power_array = PowerArray(self.length, begin=self.begin, bin_width=self.bin_width)
+        power_array.array += np.asarray(self.matrix.sum(axis=0)).ravel()
+        return power_array
+
+    def _bin_range(self, time_window: Optional[TimeWindow]) -> Tuple[int, int]:
+        '''
+        The range of bins that begin inside time_window, clipped to the array.
+        '''
+        if time_window is None:
+            return 0, self.length
+        if self.begin is None:
+            raise ValueError("PowerContributions have no begin time to select a time window")
+
+        bin_seconds = self.bin_width.total_seconds()
+        start = int(np.ceil((time_window.begin - self.begin).total_seconds() / bin_seconds))
+        stop = int(np.ceil((time_window.end - self.begin).total_seconds() / bin_seconds))
+        return min(max(start, 0), self.length), min(max(stop, 0), self.length)
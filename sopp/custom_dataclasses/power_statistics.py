@@ -0,0 +1,121 @@
+from datetime import timedelta
+from typing import Iterable, List
+
+import numpy as np
+
+DEFAULT_MINIMUM_DBW = -300.0
+DEFAULT_MAXIMUM_DBW = 0.0
+DEFAULT_RESOLUTION_DB = 0.01
+
+
+class PowerStatistics:
+    '''
+    The PowerStatistics accumulate the distribution of aggregate received power over time without keeping the samples.
+    Chunks of samples, one per time bin of bin_width, are added with update(), and the statistics can be read at any
+    point:
+
+      + exceedance_fraction():  the fraction of time bins whose power is above a threshold.
+      + exceedance_duration():  the time the power is above a threshold.
+      + quantile(), quantiles(): the power below which a given fraction of the time bins fall.
+      + peak, mean, count:      the highest and mean power and the number of time bins added.
+
+    Powers are counted in a histogram of fixed width bins in dBW between minimum_dbw and maximum_dbw, so memory does not
+    depend on the length of the run, and quantiles and exceedance fractions are accurate to resolution_db. Bins of zero
+    power, when no satellite is in view, are counted separately. Powers outside the range are counted in the first or last
+    bin. The peak, mean and count are exact.
+
+    Statistics of separate runs with the same bins, for example per worker or per month, are combined with merge().
+    '''
+    def __init__(
+        self,
+        bin_width: timedelta = timedelta(seconds=1),
+        minimum_dbw: float = DEFAULT_MINIMUM_DBW,
+        maximum_dbw: float = DEFAULT_MAXIMUM_DBW,
+        resolution_db: float = DEFAULT_RESOLUTION_DB
+    ):
+        if maximum_dbw <= minimum_dbw or resolution_db <= 0:
+            raise ValueError(f'Invalid histogram range: {minimum_dbw} to {maximum_dbw} dBW in steps of {resolution_db} dB')
+        self.bin_width = bin_width
+        self.minimum_dbw = minimum_dbw
+        self.maximum_dbw = maximum_dbw
+        self.resolution_db = resolution_db
+        self.counts = np.zeros(int(np.ceil((maximum_dbw - minimum_dbw) / resolution_db)), dtype=np.int64)
+        self.zero_count = 0
+        self.count = 0
+        self.peak = 0.0
+        self._total = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self._total / self.count if self.count else 0.0
+
+    def update(self, powers: Iterable[float]):
+        powers = np.asarray(powers, dtype=np.float64).ravel()
+        if not powers.size:
+            return
+
+        positive_powers = powers[powers > 0]
+        self.counts += np.bincount(self._histogram_indices(positive_powers), minlength=len(self.counts))
+        self.zero_count += powers.size - positive_powers.size
+        self.count += powers.size
+        self.peak = max(self.peak, float(powers.max()))
+        self._total += float(powers.sum())
+
+    def merge(self, other: 'PowerStatistics'):
+        if self._binning != other._binning:
+            raise ValueError('PowerStatistics bins differ')
+        self.counts += other.counts
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.peak = max(self.peak, other.peak)
+        self._total += other._total
+
+    def exceedance_fraction(self, threshold: float) -> float:
+        '''
+        The fraction of time bins with power above threshold, in Watts.
+        '''
+        if not self.count:
+            return 0.0
+        if threshold <= 0:
+            return (self.count - self.zero_count) / self.count if threshold == 0 else 1.0
+        if threshold >= self.peak:
+            return 0.0
+
+        position = np.clip((10 * np.log10(threshold) - self.minimum_dbw) / self.resolution_db, 0, len(self.counts))
+        index = min(int(position), len(self.counts) - 1)
+        counts_above = self.counts[index + 1:].sum() + self.counts[index] * (1 - (position - index))
+        return float(counts_above) / self.count
+
+    def exceedance_duration(self, threshold: float) -> timedelta:
+        return self.exceedance_fraction(threshold) * self.count * self.bin_width
+
+    def quantile(self, q: float) -> float:
+        '''
+        The power, in Watts, that a fraction q of the time bins are at or below, interpolated within a histogram bin.
+        '''
+        if not 0 <= q <= 1:
+            raise ValueError(f'Quantile must be between 0 and 1, provided: {q}')
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count - self.zero_count
+        if rank <= 0:
+            return 0.0
+
+        cumulative_counts = np.cumsum(self.counts)
+        index = min(int(np.searchsorted(cumulative_counts, rank)), len(self.counts) - 1)
+        counts_below = cumulative_counts[index] - self.counts[index]
+        fraction = (rank - counts_below) / self.counts[index] if self.counts[index] else 1.0
+        power_dbw = self.minimum_dbw + (index + fraction) * self.resolution_db
+        return min(10 ** (power_dbw / 10), self.peak)
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        return [self.quantile(q) for q in qs]
+
+    @property
+    def _binning(self):
+        return self.bin_width, self.minimum_dbw, self.maximum_dbw, self.resolution_db
+
+    def _histogram_indices(self, positive_powers: np.ndarray) -> np.ndarray:
+        positions = (10 * np.log10(positive_powers) - self.minimum_dbw) / self.resolution_db
+        return np.clip(np.floor(positions), 0, len(self.counts) - 1).astype(np.int64)
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+
+'''
+The PowerSummary class is a downsampled level of a PowerArray, with one coarse bin for every bin_width of time. Each
+coarse bin holds the statistics of the PowerArray bins that begin inside it.
+
+  + begin:          the datetime of the start of the first bin, or None when the PowerArray has no time axis.
+  + bin_width:      the time covered by each bin.
+  + maximum:        the highest power of the PowerArray bins in each coarse bin.
+  + mean:           the mean power of the PowerArray bins in each coarse bin.
+'''
+
+
+@dataclass
+class PowerSummary:
+    begin: Optional[datetime]
+    bin_width: timedelta
+    maximum: np.ndarray
+    mean: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.maximum)
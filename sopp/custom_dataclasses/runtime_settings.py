@@ -1,11 +1,24 @@
 from dataclasses import dataclass, field
 from datetime import timedelta
+from pathlib import Path
+from typing import Optional
 
 '''
 The RuntimeSettings class stores the run time settings used in EventFinderRhodesMill
   + time_continutity_resolution: The time step resolution used to calculate satellite positions. (Default 1 second)
   + concurrency_level: The number of cores to use for multiprocessing the satellite position calculations. (Default 2)
   + min_altitude: The minimum altitude that a satellite must be to be considered above horizon. (Default 0.0)
+  + ephemeris_cache_directory: Directory to cache propagated satellite positions in between runs. (Default None, no caching)
+  + ephemeris_cache_max_size_mb: The maximum size of the ephemeris cache before least recently used entries are removed. (Default 1024)
+  + coarse_time_resolution: The time step of a first, coarse propagation pass. Only the intervals where a satellite may be in view are
+                            then propagated at time_continuity_resolution. (Default None, every time step is propagated)
+  + circular_main_beam: Test main beam crossings by the angular separation from the antenna pointing instead of separate
+                        altitude and azimuth ranges. (Default False)
+  + memory_budget_mb: Approximate memory that propagated positions may take at once. The reservation is then processed in
+                      time chunks sized to fit it, and windows that cross a chunk boundary are stitched back together.
+                      Applies to the get_* and iter_* queries alike. (Default None, the whole reservation is propagated at once)
+  + track_power_contributions: Keep the power of every satellite in every time bin, in a sparse store, next to the summed
+                               power of a power run. (Default False)
 '''
 
 
@@ -14,10 +27,18 @@ class RuntimeSettings:
     time_continuity_resolution: timedelta = field(default=timedelta(seconds=1))
     concurrency_level: int = field(default=1)
     min_altitude: float = field(default=0.0)
+    ephemeris_cache_directory: Optional[Path] = field(default=None)
+    ephemeris_cache_max_size_mb: float = field(default=1024)
+    coarse_time_resolution: Optional[timedelta] = field(default=None)
+    circular_main_beam: bool = field(default=False)
+    memory_budget_mb: Optional[float] = field(default=None)
+    track_power_contributions: bool = field(default=False)
 
     def __post_init__(self):
         if isinstance(self.time_continuity_resolution, int):
             self.time_continuity_resolution = timedelta(seconds=self.time_continuity_resolution)
+        if isinstance(self.coarse_time_resolution, int):
+            self.coarse_time_resolution = timedelta(seconds=self.coarse_time_resolution)
 
     def __str__(self):
         return (
@@ -1,7 +1,8 @@
 from dataclasses import dataclass, field
+from functools import cached_property
 from os.path import realpath
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import math
 
 from skyfield.api import load
@@ -14,8 +15,7 @@ from sopp.utilities import temporary_file
 from sopp.custom_dataclasses.satellite.transmitter import Transmitter
 from sopp.custom_dataclasses.antenna import Antenna
 
-from sopp.healpix import HealpixGainPattern
-from sopp.healpix import HealpixLoader
+from sopp.gain_pattern_registry import GAIN_PATTERN_REGISTRY, RegisteredGainPattern
 
 
 '''
@@ -27,18 +27,41 @@ for each satellite.
   + tle_information:    stores TLE information. TleInformation is another custom object to store TLE data and can be found in
                         ROOT/sopp/custom_dataclasses/satellite/tle_information.py
   + frequency:          list of type FrequencyRange. FrequencyRange is a custom dataclass that stores a center frequency and bandwidth.
+  + antenna:            the satellite Antenna. By default its gain pattern is a RegisteredGainPattern reference to the
+                        DEFAULT_SATELLITE_GAIN_PATTERN, which is only loaded the first time a gain is looked up.
   
 
-  + to_rhodesmill():    class method to convert a Satellite object into a Rhodemill-Skyfield EarthSatellite object for use with the Skyfield API
+  + to_rhodesmill():    class method to convert a Satellite object into a Rhodemill-Skyfield EarthSatellite object for use with the Skyfield API.
+                        The EarthSatellite is memoized and only rebuilt when the name or TLE information changes.
   + from_tle_file():    class method to load Satellite from provided TLE file. Returns a list of type Satellite.
 '''
 
 NUMBER_OF_LINES_PER_TLE_OBJECT = 3
 
-satellite_gain = 'gain_test.csv'
-healpix_loader = HealpixLoader(satellite_gain)
-healpix_gain = healpix_loader.load_healpix_gain_pattern()
-healpix_pattern_sat = HealpixGainPattern(healpix_gain)
+DEFAULT_SATELLITE_GAIN_PATTERN = 'default_satellite'
+GAIN_PATTERN_REGISTRY.register(DEFAULT_SATELLITE_GAIN_PATTERN, Path(__file__).parent / 'gain_test.csv')
+
+class RhodesmillSatelliteCache:
+    '''
+    Memoizes the EarthSatellite built from a Satellite's TLE information. Building it runs sgp4init, exports the TLE text
+    and parses it again, so it is done once per TLE instead of on every call. Pickles as the exported TLE lines only, so
+    a worker process rebuilds the EarthSatellite by parsing the lines on first use.
+    '''
+    def __init__(self, key: Tuple, line1: str, line2: str, name: str):
+        self.key = key
+        self._line1 = line1
+        self._line2 = line2
+        self._name = name
+
+    @cached_property
+    def earth_satellite(self) -> EarthSatellite:
+        return EarthSatellite(line1=self._line1, line2=self._line2, name=self._name)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('earth_satellite', None)
+        return state
+
 
 @dataclass
 class Satellite:
@@ -46,11 +69,15 @@ class Satellite:
     tle_information: Optional[TleInformation] = None
     frequency: List[FrequencyRange] = field(default_factory=list)
     transmitter: Transmitter = field(default_factory=Transmitter) 
-    antenna: Antenna = field(default_factory=lambda: Antenna(healpix_gain))
+    antenna: Antenna = field(default_factory=lambda: Antenna(RegisteredGainPattern(DEFAULT_SATELLITE_GAIN_PATTERN)))
+    _rhodesmill_cache: Optional[RhodesmillSatelliteCache] = field(default=None, init=False, repr=False, compare=False)
 
     def to_rhodesmill(self) -> EarthSatellite:
-        line1, line2 = self.tle_information.to_tle_lines()
-        return EarthSatellite(line1=line1, line2=line2, name=self.name)
+        key = (self.name, self.tle_information.cache_key)
+        if self._rhodesmill_cache is None or self._rhodesmill_cache.key != key:
+            line1, line2 = self.tle_information.to_tle_lines()
+            self._rhodesmill_cache = RhodesmillSatelliteCache(key=key, line1=line1, line2=line2, name=self.name)
+        return self._rhodesmill_cache.earth_satellite
 
     @property
     def orbits_per_day(self) -> float:
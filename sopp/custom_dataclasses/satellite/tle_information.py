@@ -50,6 +50,25 @@ class TleInformation:
 
         return export_tle(satrec=satrec)
 
+    @property
+    def cache_key(self) -> tuple:
+        return (
+            self.argument_of_perigee,
+            self.drag_coefficient,
+            self.eccentricity,
+            self.epoch_days,
+            self.inclination,
+            self.mean_anomaly,
+            self.mean_motion.first_derivative,
+            self.mean_motion.second_derivative,
+            self.mean_motion.value,
+            self.revolution_number,
+            self.right_ascension_of_ascending_node,
+            self.satellite_number,
+            self.classification,
+            self.international_designator.to_tle_string() if self.international_designator is not None else None,
+        )
+
     @classmethod
     def from_tle_lines(cls, line1: str, line2: str) -> 'TleInformation':
         verify_checksum(line1, line2)
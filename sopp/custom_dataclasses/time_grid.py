@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+from typing import Iterator, List, Union
+
+import numpy as np
+from skyfield.timelib import Time, Timescale
+
+'''
+The TimeGrid class stores the sample times of a search as float seconds since a begin datetime in a NumPy array instead
+of a list of datetimes, so that time comparisons, slicing and the conversion to Skyfield times are done over arrays.
+
+  + begin:          the datetime that the seconds are counted from, usually the beginning of the reservation.
+  + seconds:        one dimensional array of the seconds since begin of every sample.
+  + timestamps:     a property array of the POSIX timestamps of every sample.
+  + datetimes:      a property list of the datetimes of every sample, only built when it is first accessed.
+
+A TimeGrid can be used in place of a list of datetimes: it has a length, iterating it yields datetimes and indexing it
+with an integer returns a datetime. Indexing it with a slice or an array of indices returns another TimeGrid, and
+concatenate() joins TimeGrids back together. to_timescale() converts the whole grid into a Skyfield Time with a single call
+to Timescale.utc().
+'''
+
+
+@dataclass
+class TimeGrid:
+    begin: datetime
+    seconds: np.ndarray
+
+    @classmethod
+    def from_datetimes(cls, datetimes: List[datetime]) -> 'TimeGrid':
+        begin = datetimes[0] if datetimes else datetime.fromtimestamp(0, tz=timezone.utc)
+        return cls(begin=begin, seconds=np.array([(time - begin).total_seconds() for time in datetimes], dtype=float))
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self.begin.timestamp() + self.seconds
+
+    @cached_property
+    def datetimes(self) -> List[datetime]:
+        return [self.begin + timedelta(seconds=seconds) for seconds in self.seconds.tolist()]
+
+    def to_timescale(self, timescale: Timescale) -> Time:
+        begin = self.begin.astimezone(timezone.utc)
+        return timescale.utc(begin.year, begin.month, begin.day, begin.hour, begin.minute,
+                             begin.second + begin.microsecond / 1e6 + self.seconds)
+
+    def __len__(self) -> int:
+        return len(self.seconds)
+
+    def __iter__(self) -> Iterator[datetime]:
+        return iter(self.datetimes)
+
+    def __getitem__(self, index) -> Union[datetime, 'TimeGrid']:
+        if isinstance(index, (int, np.integer)):
+            if 'datetimes' in self.__dict__:
+                return self.datetimes[index]
+            return self.begin + timedelta(seconds=self.seconds[index].item())
+        return TimeGrid(begin=self.begin, seconds=self.seconds[index])
+
+    @classmethod
+    def concatenate(cls, time_grids: List['TimeGrid']) -> 'TimeGrid':
+        begin = time_grids[0].begin
+        return cls(
+            begin=begin,
+            seconds=np.concatenate([
+                time_grid.seconds + (time_grid.begin - begin).total_seconds() for time_grid in time_grids
+            ])
+        )
+
+    def __getstate__(self):
+        return {'begin': self.begin, 'seconds': self.seconds}
+
+
+def to_time_grid(datetimes: Union[List[datetime], TimeGrid]) -> TimeGrid:
+    return datetimes if isinstance(datetimes, TimeGrid) else TimeGrid.from_datetimes(datetimes)
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List, Type
+from typing import Iterator, List, Type
 
+from sopp.custom_dataclasses.interference_report import InterferenceReport
 from sopp.custom_dataclasses.overhead_window import OverheadWindow
 from sopp.custom_dataclasses.position_time import PositionTime
 from sopp.custom_dataclasses.reservation import Reservation
@@ -11,6 +12,7 @@ from sopp.custom_dataclasses.runtime_settings import RuntimeSettings
 
 from sopp.custom_dataclasses.power_window import PowerWindow
 from sopp.custom_dataclasses.power_array import PowerArray
+from sopp.custom_dataclasses.power_statistics import PowerStatistics
 
 
 class EventFinder(ABC):
@@ -23,6 +25,9 @@ class EventFinder(ABC):
       + get_satellites_above_horizon():         Determines the satellites visible above the horizon during the search window and returns a list of
                                         OverheadWindows for each event. This can be used to find all satellite visible over the horizon or
                                         to determine events for a stationary observation if an azimuth and altitude is provided
+      + iter_satellites_crossing_main_beam(),
+        iter_satellites_above_horizon():        generator versions of the two queries above that yield OverheadWindows as they
+                                        are found. Closing the generator early cancels the remaining work
 
     '''
     def __init__(self,
@@ -48,10 +53,23 @@ class EventFinder(ABC):
     def get_satellites_crossing_main_beam(self) -> List[OverheadWindow]:
         pass
 
-    @abstractmethod
+    def iter_satellites_above_horizon(self) -> Iterator[OverheadWindow]:
+        yield from self.get_satellites_above_horizon()
+
+    def iter_satellites_crossing_main_beam(self) -> Iterator[OverheadWindow]:
+        yield from self.get_satellites_crossing_main_beam()
+
+    def get_interference_report(self) -> InterferenceReport:
+        return InterferenceReport(
+            satellites_above_horizon=self.get_satellites_above_horizon(),
+            satellites_crossing_main_beam=self.get_satellites_crossing_main_beam()
+        )
+
     def get_satellite_power(self) -> PowerArray:
-        pass
+        raise NotImplementedError(f'{self.__class__.__name__} does not calculate satellite power.')
 
-    @abstractmethod
     def get_satellite_power_array(self) -> PowerArray:
-        pass
\ No newline at end of file
+        raise NotImplementedError(f'{self.__class__.__name__} does not calculate satellite power.')
+
+    def get_power_statistics(self) -> PowerStatistics:
+        raise NotImplementedError(f'{self.__class__.__name__} does not calculate satellite power.')
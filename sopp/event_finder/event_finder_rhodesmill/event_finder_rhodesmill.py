@@ -1,111 +1,434 @@
 from dataclasses import replace
-from typing import List, Type
-import multiprocessing
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Type
 
+import numpy as np
+
+from sopp.custom_dataclasses.interference_report import InterferenceReport
 from sopp.custom_dataclasses.overhead_window import OverheadWindow
 from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_arrays import PositionArrays
 from sopp.custom_dataclasses.position_time import PositionTime
 from sopp.custom_dataclasses.reservation import Reservation
-from sopp.custom_dataclasses.time_window import TimeWindow
+from sopp.custom_dataclasses.time_grid import TimeGrid
 from sopp.event_finder.event_finder_rhodesmill.support.evenly_spaced_time_intervals_calculator import \
     EvenlySpacedTimeIntervalsCalculator
+from sopp.event_finder.event_finder_rhodesmill.support.coarse_to_fine_time_refiner import CoarseToFineTimeRefiner
+from sopp.event_finder.event_finder_rhodesmill.support.satellites_visibility_prefilter import SatellitesVisibilityPrefilter
+from sopp.event_finder.event_finder_rhodesmill.support.antenna_direction_pairing import AntennaDirectionPairing
+from sopp.event_finder.event_finder_rhodesmill.support.worker_pool import WorkerPool, query_worker_pool
 from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.satellite_positions_with_respect_to_facility_retriever import \
     SatellitePositionsWithRespectToFacilityRetriever
 from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.satellite_positions_with_respect_to_facility_retriever_rhodesmill import \
     SatellitePositionsWithRespectToFacilityRetrieverRhodesmill
+from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.satellite_positions_with_respect_to_facility_retriever_satrec_array import \
+    SatellitePositionsWithRespectToFacilityRetrieverSatrecArray
+from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.satellite_positions_with_respect_to_facility_retriever_cache import \
+    SatellitePositionsWithRespectToFacilityRetrieverCache
+from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.ephemeris_cache import \
+    EphemerisCache
 from sopp.event_finder.event_finder_rhodesmill.support.satellites_interference_filter import (
     SatellitesInterferenceFilter,
+    SatellitesFilterStrategy,
     SatellitesWithinMainBeamFilter,
-    SatellitesAboveHorizonFilter,
-    AntennaPosition
+    SatellitesWithinCircularMainBeamFilter,
+    SatellitesAboveHorizonFilter
 )
 from sopp.event_finder.event_finder import EventFinder
 from sopp.custom_dataclasses.satellite.satellite import Satellite
 from sopp.custom_dataclasses.runtime_settings import RuntimeSettings
 
 
+BYTES_PER_MEGABYTE = 1024 ** 2
+# Peak of building the Skyfield time frame of a chunk, once per retriever and so once per process: the IAU 2000A
+# nutation series is evaluated on (terms x samples) float64 arrays, about 22 KB per sample when measured with
+# tracemalloc, and released once the 3 x 3 float64 rotation matrices (72 B per sample each) are kept.
+TIME_FRAME_BYTES_PER_SAMPLE = 22_500
+# Per satellite and sample when the whole catalog is propagated at once: sgp4 returns r and v (2 x 3 float64, 48 B) and
+# an error code, which are rotated to the facility (3 float64, 24 B) and converted to altitude, azimuth and distance
+# (3 float64, 24 B kept), about 120 B at peak. The paired altitude and azimuth copies and the filter masks take ~80 B.
+BYTES_PER_BATCHED_SAMPLE = 200
+# Per sample of one satellite propagated on its own: the list of PositionTimes, each with its Position and datetime, is
+# about 265 B per sample and peaks at ~320 B while it is built. The altitude, azimuth and timestamp arrays (24 B), the
+# antenna direction indices (8 B), the paired copies (32 B) and the filter masks add about 80 B.
+BYTES_PER_SAMPLE = 500
+MINIMUM_TIME_CHUNK_SIZE = 2
+
+
+class _TimeChunkPropagation(NamedTuple):
+    time_chunk: Tuple[int, int]
+    satellite_positions_retriever: SatellitePositionsWithRespectToFacilityRetriever
+    time_refiner: Optional[CoarseToFineTimeRefiner]
+    coarse_satellite_positions_retriever: Optional[SatellitePositionsWithRespectToFacilityRetriever]
+
+
 class EventFinderRhodesmill(EventFinder):
     def __init__(self,
                  antenna_direction_path: List[PositionTime],
                  list_of_satellites: List[Satellite],
                  reservation: Reservation,
                  satellite_positions_with_respect_to_facility_retriever_class: Type[SatellitePositionsWithRespectToFacilityRetriever] = SatellitePositionsWithRespectToFacilityRetrieverRhodesmill,
-                 runtime_settings: RuntimeSettings = RuntimeSettings()):
+                 runtime_settings: RuntimeSettings = RuntimeSettings(),
+                 worker_pool: Optional[WorkerPool] = None):
         super().__init__(antenna_direction_path=antenna_direction_path,
                          list_of_satellites=list_of_satellites,
                          reservation=reservation,
                          satellite_positions_with_respect_to_facility_retriever_class=satellite_positions_with_respect_to_facility_retriever_class,
                          runtime_settings=runtime_settings)
 
-        datetimes = EvenlySpacedTimeIntervalsCalculator(
+        self._time_grid = EvenlySpacedTimeIntervalsCalculator(
             time_window=reservation.time,
             resolution=runtime_settings.time_continuity_resolution
-        ).run()
+        ).run_time_grid()
 
-        self._satellite_positions_retriever = satellite_positions_with_respect_to_facility_retriever_class(
-            facility=reservation.facility,
-            datetimes=datetimes
-        )
-        
-        self._filter_strategy = None
+        self._worker_pool = worker_pool
+        self._antenna_directions = AntennaDirectionPairing(antenna_direction_path, reservation.time)
+        self._time_chunk_propagation: Optional[_TimeChunkPropagation] = None
+        self.number_of_satellites_pruned = 0
 
     def get_satellites_above_horizon(self):
-        self._filter_strategy = SatellitesAboveHorizonFilter
-        return self._get_satellites_interference()
+        return self._get_satellites_interference(filter_strategies=(SatellitesAboveHorizonFilter,))[0]
 
     def get_satellites_crossing_main_beam(self) -> List[OverheadWindow]:
-        self._filter_strategy = SatellitesWithinMainBeamFilter
-        return self._get_satellites_interference()
-
-    def _get_satellites_interference(self) -> List[OverheadWindow]:
-        processes = int(self.runtime_settings.concurrency_level) if self.runtime_settings.concurrency_level > 1 else 1
-        pool = multiprocessing.Pool(processes=processes)
-        results = pool.map(self._get_satellite_overhead_windows, self.list_of_satellites)
-        pool.close()
-        pool.join()
-
-        return [overhead_window for result in results for overhead_window in result]
-
-    def _get_satellite_overhead_windows(self, satellite: Satellite) -> List[OverheadWindow]:
-        antenna_direction_end_times = (
-            [antenna_direction.time for antenna_direction in self.antenna_direction_path[1:]]
-            + [self.reservation.time.end]
+        return self._get_satellites_interference(filter_strategies=(self._main_beam_filter_strategy,))[0]
+
+    def iter_satellites_above_horizon(self) -> Iterator[OverheadWindow]:
+        yield from self._iter_satellites_interference(filter_strategy=SatellitesAboveHorizonFilter)
+
+    def iter_satellites_crossing_main_beam(self) -> Iterator[OverheadWindow]:
+        yield from self._iter_satellites_interference(filter_strategy=self._main_beam_filter_strategy)
+
+    def get_interference_report(self) -> InterferenceReport:
+        satellites_above_horizon, satellites_crossing_main_beam = self._get_satellites_interference(
+            filter_strategies=(SatellitesAboveHorizonFilter, self._main_beam_filter_strategy)
         )
-        satellite_positions = self._get_satellite_positions_within_reservation(satellite)
-        antenna_positions = [
-            AntennaPosition(
-                satellite_positions=self._filter_satellite_positions_within_time_window(
-                    satellite_positions,
-                    time_window=TimeWindow(
-                        begin=max(self.reservation.time.begin, antenna_direction.time),
-                        end=end_time
-                    )
-                ),
-                antenna_direction=antenna_direction
-            )
-            for antenna_direction, end_time in zip(self.antenna_direction_path, antenna_direction_end_times)
-            if end_time > self.reservation.time.begin
+        return InterferenceReport(
+            satellites_above_horizon=satellites_above_horizon,
+            satellites_crossing_main_beam=satellites_crossing_main_beam,
+            number_of_satellites_pruned=self.number_of_satellites_pruned
+        )
+
+    @property
+    def _main_beam_filter_strategy(self) -> Type[SatellitesFilterStrategy]:
+        return SatellitesWithinCircularMainBeamFilter if self.runtime_settings.circular_main_beam else SatellitesWithinMainBeamFilter
+
+    def _get_satellites_interference(
+        self,
+        filter_strategies: Tuple[Type[SatellitesFilterStrategy], ...]
+    ) -> List[List[OverheadWindow]]:
+        '''
+        Propagates every satellite once and applies each of the filter_strategies to the same positions. Returns one list
+        of OverheadWindows per filter strategy, in the same order.
+
+        The reservation is processed one time chunk after the other, see _time_chunks(). Windows that run up to the end of
+        a chunk and continue at the start of the next one are stitched into a single window.
+        '''
+        satellite_indices = self._prefilter_satellite_indices()
+        overhead_windows = [[[] for _ in filter_strategies] for _ in satellite_indices]
+        with query_worker_pool(self._worker_pool, self.runtime_settings.concurrency_level) as worker_pool:
+            for time_chunk in self._time_chunks(number_of_satellites=len(satellite_indices)):
+                arguments = self._satellite_arguments(satellite_indices, filter_strategies, time_chunk)
+                results = worker_pool.map(EventFinderRhodesmill._get_overhead_windows_by_satellite_index, state=self,
+                                          arguments=arguments)
+                for satellite_overhead_windows, overhead_windows_by_strategy in zip(overhead_windows, results):
+                    for strategy_overhead_windows, chunk_overhead_windows in zip(satellite_overhead_windows, overhead_windows_by_strategy):
+                        self._stitch_overhead_windows(strategy_overhead_windows, chunk_overhead_windows, time_chunk)
+
+        return [
+            [overhead_window for satellite_overhead_windows in overhead_windows for overhead_window in satellite_overhead_windows[strategy_index]]
+            for strategy_index in range(len(filter_strategies))
         ]
-        time_windows = SatellitesInterferenceFilter(
+
+    def _satellite_arguments(
+        self,
+        satellite_indices: List[int],
+        filter_strategies: Tuple[Type[SatellitesFilterStrategy], ...],
+        time_chunk: Tuple[int, int]
+    ) -> List[Tuple]:
+        '''
+        The task arguments of each satellite. When the catalog is propagated at once, the positions of every satellite are
+        either passed along, or, with an ephemeris cache, stored in it and passed as their cache key. Workers then map the
+        cache entry themselves, since pickling a memory-mapped entry would copy all of it.
+        '''
+        if not self._propagates_catalog_at_once or not satellite_indices:
+            return [(satellite_index, filter_strategies, time_chunk) for satellite_index in satellite_indices]
+
+        satellite_positions_retriever = self._time_chunk_propagation_for(time_chunk).satellite_positions_retriever
+        satellites = [self.list_of_satellites[index] for index in satellite_indices]
+        if isinstance(satellite_positions_retriever, SatellitePositionsWithRespectToFacilityRetrieverCache):
+            return [
+                (satellite_index, filter_strategies, time_chunk, None, ephemeris_cache_key)
+                for satellite_index, ephemeris_cache_key in zip(satellite_indices, satellite_positions_retriever.cache_all(satellites))
+            ]
+
+        positions = satellite_positions_retriever.run_all(satellites)
+        return [
+            (satellite_index, filter_strategies, time_chunk, positions[index]) for index, satellite_index in enumerate(satellite_indices)
+        ]
+
+    @property
+    def _propagates_catalog_at_once(self) -> bool:
+        return self.runtime_settings.coarse_time_resolution is None and (
+            self.runtime_settings.ephemeris_cache_directory is not None
+            or issubclass(self.satellite_positions_with_respect_to_facility_retriever_class,
+                          SatellitePositionsWithRespectToFacilityRetrieverSatrecArray)
+        )
+
+    def _time_chunks(self, number_of_satellites: int, propagates_catalog_at_once: Optional[bool] = None) -> List[Tuple[int, int]]:
+        '''
+        Splits the time grid into (start, stop) index ranges. Without a memory budget the whole grid is a single chunk.
+        Otherwise each chunk holds as many samples as fit in the budget: the time frame of the chunk plus every satellite
+        when the catalog is propagated at once, or a time frame and one satellite per worker when each worker propagates
+        its own.
+        '''
+        number_of_samples = len(self._time_grid)
+        if self.runtime_settings.memory_budget_mb is None:
+            return [(0, number_of_samples)]
+
+        if propagates_catalog_at_once is None:
+            propagates_catalog_at_once = self._propagates_catalog_at_once
+        if propagates_catalog_at_once:
+            bytes_per_sample = TIME_FRAME_BYTES_PER_SAMPLE + BYTES_PER_BATCHED_SAMPLE * max(1, number_of_satellites)
+        else:
+            bytes_per_sample = (TIME_FRAME_BYTES_PER_SAMPLE + BYTES_PER_SAMPLE) * max(1, self.runtime_settings.concurrency_level)
+        chunk_size = max(MINIMUM_TIME_CHUNK_SIZE, int(self.runtime_settings.memory_budget_mb * BYTES_PER_MEGABYTE // bytes_per_sample))
+        return [(start, min(start + chunk_size, number_of_samples)) for start in range(0, number_of_samples, chunk_size)]
+
+    def _stitch_overhead_windows(
+        self,
+        overhead_windows: List[OverheadWindow],
+        chunk_overhead_windows: List[OverheadWindow],
+        time_chunk: Tuple[int, int]
+    ):
+        start, _ = time_chunk
+        if (
+            start > 0 and overhead_windows and chunk_overhead_windows
+            and overhead_windows[-1].overhead_time.end == self._time_grid[start - 1]
+            and chunk_overhead_windows[0].overhead_time.begin == self._time_grid[start]
+        ):
+            overhead_windows[-1] = self._concatenate_overhead_windows(overhead_windows[-1], chunk_overhead_windows[0])
+            chunk_overhead_windows = chunk_overhead_windows[1:]
+        overhead_windows.extend(chunk_overhead_windows)
+
+    @staticmethod
+    def _concatenate_overhead_windows(first: OverheadWindow, second: OverheadWindow) -> OverheadWindow:
+        if first.position_arrays is not None and second.position_arrays is not None:
+            return OverheadWindow(
+                satellite=first.satellite,
+                position_arrays=PositionArrays.concatenate([first.position_arrays, second.position_arrays])
+            )
+        return OverheadWindow(satellite=first.satellite, positions=first.positions + second.positions)
+
+    def _iter_satellites_interference(self, filter_strategy: Type[SatellitesFilterStrategy]) -> Iterator[OverheadWindow]:
+        '''
+        Yields the OverheadWindows of each satellite as soon as a worker finishes it, in completion order. Every worker
+        propagates its own satellite, so memory does not grow with the size of the catalog. Closing the generator early
+        terminates the workers.
+
+        With a memory budget the time chunks are streamed one after the other. A window that runs up to the end of a
+        chunk is held back until the next chunk of its satellite tells whether it continues there.
+        '''
+        satellite_indices = self._prefilter_satellite_indices()
+        open_overhead_windows: Dict[int, OverheadWindow] = {}
+        with query_worker_pool(self._worker_pool, self.runtime_settings.concurrency_level) as worker_pool:
+            for time_chunk in self._time_chunks(number_of_satellites=len(satellite_indices), propagates_catalog_at_once=False):
+                arguments = [(satellite_index, filter_strategy, time_chunk) for satellite_index in satellite_indices]
+                results = worker_pool.imap_unordered(EventFinderRhodesmill._get_indexed_overhead_windows, state=self,
+                                                     arguments=arguments)
+                try:
+                    for satellite_index, chunk_overhead_windows in results:
+                        overhead_windows = [open_overhead_windows.pop(satellite_index)] if satellite_index in open_overhead_windows else []
+                        self._stitch_overhead_windows(overhead_windows, chunk_overhead_windows, time_chunk)
+                        if overhead_windows and self._runs_into_next_time_chunk(overhead_windows[-1], time_chunk):
+                            open_overhead_windows[satellite_index] = overhead_windows.pop()
+                        yield from overhead_windows
+                finally:
+                    results.close()
+
+    def _runs_into_next_time_chunk(self, overhead_window: OverheadWindow, time_chunk: Tuple[int, int]) -> bool:
+        _, stop = time_chunk
+        return stop < len(self._time_grid) and overhead_window.overhead_time.end == self._time_grid[stop - 1]
+
+    def _prefilter_satellite_indices(self) -> List[int]:
+        prefilter = SatellitesVisibilityPrefilter(
             facility=self.reservation.facility,
-            antenna_positions=antenna_positions,
-            cutoff_time=self.reservation.time.end,
-            filter_strategy=self._filter_strategy,
-            runtime_settings=self.runtime_settings,
-        ).run()
+            time_window=self.reservation.time,
+            runtime_settings=self.runtime_settings
+        )
+        satellite_indices = prefilter.run_indices(self.list_of_satellites)
+        self.number_of_satellites_pruned = prefilter.number_of_satellites_pruned
+        return satellite_indices
+
+    def _get_overhead_windows_by_satellite_index(
+        self,
+        satellite_index: int,
+        filter_strategies: Tuple[Type[SatellitesFilterStrategy], ...],
+        time_chunk: Tuple[int, int],
+        satellite_position_arrays: Optional[PositionArrays] = None,
+        ephemeris_cache_key: Optional[str] = None
+    ) -> List[List[OverheadWindow]]:
+        if ephemeris_cache_key is not None:
+            satellite_position_arrays = self._time_chunk_propagation_for(time_chunk).satellite_positions_retriever.load(ephemeris_cache_key)
+        return self._get_satellite_overhead_windows(
+            satellite=self.list_of_satellites[satellite_index],
+            filter_strategies=filter_strategies,
+            time_chunk=time_chunk,
+            satellite_position_arrays=satellite_position_arrays
+        )
 
-        return [OverheadWindow(satellite=satellite, positions=positions) for positions in time_windows]
+    def _get_indexed_overhead_windows(
+        self,
+        satellite_index: int,
+        filter_strategy: Type[SatellitesFilterStrategy],
+        time_chunk: Tuple[int, int]
+    ) -> Tuple[int, List[OverheadWindow]]:
+        return satellite_index, self._get_overhead_windows_by_satellite_index(satellite_index, (filter_strategy,), time_chunk)[0]
+
+    def _get_satellite_overhead_windows(
+        self,
+        satellite: Satellite,
+        filter_strategies: Tuple[Type[SatellitesFilterStrategy], ...],
+        time_chunk: Tuple[int, int],
+        satellite_position_arrays: Optional[PositionArrays] = None
+    ) -> List[List[OverheadWindow]]:
+        if satellite_position_arrays is None:
+            satellite_positions = self._get_satellite_positions_within_reservation(satellite, filter_strategies, time_chunk)
+            altitude = np.array([position.position.altitude for position in satellite_positions], dtype=float)
+            azimuth = np.array([position.position.azimuth for position in satellite_positions], dtype=float)
+            times = [position.time for position in satellite_positions]
+        else:
+            satellite_positions = None
+            altitude = satellite_position_arrays.altitude
+            azimuth = satellite_position_arrays.azimuth
+            times = satellite_position_arrays.times
+
+        antenna_direction_indices = self._antenna_directions.pair(times)
+        paired_indices = np.flatnonzero(antenna_direction_indices >= 0)
+        paired_altitude = altitude[paired_indices]
+        paired_azimuth = azimuth[paired_indices]
+        antenna_altitude = self._antenna_directions.altitudes[antenna_direction_indices[paired_indices]]
+        antenna_azimuth = self._antenna_directions.azimuths[antenna_direction_indices[paired_indices]]
+
+        overhead_windows_by_strategy = []
+        for filter_strategy in filter_strategies:
+            _, begins, ends = SatellitesInterferenceFilter(
+                facility=self.reservation.facility,
+                antenna_positions=[],
+                cutoff_time=self.reservation.time.end,
+                filter_strategy=filter_strategy,
+                runtime_settings=self.runtime_settings,
+            ).run_index_ranges(
+                satellite_altitude=paired_altitude,
+                satellite_azimuth=paired_azimuth,
+                antenna_altitude=antenna_altitude,
+                antenna_azimuth=antenna_azimuth
+            )
+            overhead_windows_by_strategy.append([
+                self._overhead_window(satellite, satellite_positions, satellite_position_arrays,
+                                      start=paired_indices[begin], stop=paired_indices[end - 1] + 1)
+                for begin, end in zip(begins, ends)
+            ])
 
-    def _get_satellite_positions_within_reservation(self, satellite: Satellite) -> List[PositionTime]:
-        return self._satellite_positions_retriever.run(satellite)
+        return overhead_windows_by_strategy
 
     @staticmethod
-    def _filter_satellite_positions_within_time_window(
-        satellite_positions: List[PositionTime],
-        time_window: TimeWindow
+    def _overhead_window(
+        satellite: Satellite,
+        satellite_positions: Optional[List[PositionTime]],
+        satellite_position_arrays: Optional[PositionArrays],
+        start: int,
+        stop: int
+    ) -> OverheadWindow:
+        '''
+        Paired samples are one contiguous run of the propagated samples, so every window is a slice of them. Windows
+        found on position arrays keep a view of the arrays and only build their PositionTimes when they are accessed.
+        '''
+        if satellite_position_arrays is None:
+            return OverheadWindow(satellite=satellite, positions=satellite_positions[start:stop])
+        return OverheadWindow(satellite=satellite, position_arrays=satellite_position_arrays.time_slice(start, stop))
+
+    def _get_satellite_positions_within_reservation(
+        self,
+        satellite: Satellite,
+        filter_strategies: Tuple[Type[SatellitesFilterStrategy], ...],
+        time_chunk: Tuple[int, int]
     ) -> List[PositionTime]:
-        return [
-            positions
-            for positions in satellite_positions
-            if time_window.begin <= positions.time < time_window.end
-        ]
+        time_chunk_propagation = self._time_chunk_propagation_for(time_chunk)
+        time_refiner = time_chunk_propagation.time_refiner
+        if time_refiner is None:
+            return time_chunk_propagation.satellite_positions_retriever.run(satellite)
+
+        coarse_positions = time_chunk_propagation.coarse_satellite_positions_retriever.run(satellite)
+        refined_indices = time_refiner.refine(
+            satellite=satellite,
+            coarse_altitudes=np.array([position.position.altitude for position in coarse_positions]),
+            lowest_altitude_in_view=min(self._lowest_altitude_in_view(filter_strategy) for filter_strategy in filter_strategies)
+        )
+        if not len(refined_indices):
+            return []
+
+        run_indices = getattr(time_chunk_propagation.satellite_positions_retriever, 'run_indices', None)
+        if run_indices is not None:
+            return run_indices(satellite, refined_indices)
+        return self.satellite_positions_with_respect_to_facility_retriever_class(
+            facility=self.reservation.facility,
+            datetimes=self._time_grid[time_chunk[0] + refined_indices]
+        ).run(satellite)
+
+    def _lowest_altitude_in_view(self, filter_strategy: Type[SatellitesFilterStrategy]) -> float:
+        strategy = filter_strategy(facility=self.reservation.facility, runtime_settings=self.runtime_settings)
+        return min(
+            strategy.lowest_altitude_in_view(antenna_direction.position)
+            for antenna_direction in self.antenna_direction_path
+        )
+
+    def _time_chunk_propagation_for(self, time_chunk: Tuple[int, int]) -> '_TimeChunkPropagation':
+        '''
+        Builds the retrievers and time refiner of a time chunk and keeps them for the next satellites of the same chunk.
+        Skyfield caches the nutation and precession of the times a retriever was built with, so reusing the retriever
+        avoids computing them again for every satellite.
+        '''
+        if self._time_chunk_propagation is not None and self._time_chunk_propagation.time_chunk == time_chunk:
+            return self._time_chunk_propagation
+
+        start, stop = time_chunk
+        time_grid = self._time_grid[start:stop]
+        time_refiner = self._new_time_refiner(time_grid)
+        self._time_chunk_propagation = _TimeChunkPropagation(
+            time_chunk=time_chunk,
+            satellite_positions_retriever=self._new_satellite_positions_retriever(time_grid),
+            time_refiner=time_refiner,
+            coarse_satellite_positions_retriever=None if time_refiner is None else self.satellite_positions_with_respect_to_facility_retriever_class(
+                facility=self.reservation.facility,
+                datetimes=time_refiner.coarse_datetimes
+            )
+        )
+        return self._time_chunk_propagation
+
+    def _new_satellite_positions_retriever(self, time_grid: TimeGrid) -> SatellitePositionsWithRespectToFacilityRetriever:
+        retriever = self.satellite_positions_with_respect_to_facility_retriever_class(
+            facility=self.reservation.facility,
+            datetimes=time_grid
+        )
+        if self.runtime_settings.ephemeris_cache_directory is None:
+            return retriever
+
+        return SatellitePositionsWithRespectToFacilityRetrieverCache(
+            facility=self.reservation.facility,
+            datetimes=time_grid,
+            retriever=retriever,
+            cache=EphemerisCache(
+                directory=self.runtime_settings.ephemeris_cache_directory,
+                max_size_mb=self.runtime_settings.ephemeris_cache_max_size_mb
+            )
+        )
+
+    def _new_time_refiner(self, time_grid: TimeGrid) -> Optional[CoarseToFineTimeRefiner]:
+        if self.runtime_settings.coarse_time_resolution is None or not self.antenna_direction_path:
+            return None
+
+        return CoarseToFineTimeRefiner(
+            facility=self.reservation.facility,
+            datetimes=time_grid,
+            resolution=self.runtime_settings.time_continuity_resolution,
+            coarse_resolution=self.runtime_settings.coarse_time_resolution
+        )
@@ -1,23 +1,27 @@
 from abc import ABC, abstractmethod
-from typing import List, Type
+from datetime import timedelta
+from typing import Iterable, List, Optional, Tuple, Type
 import multiprocessing
 
 import numpy as np
 
+from sopp.custom_dataclasses.position_arrays import PositionArrays
 from sopp.custom_dataclasses.position_time import PositionTime
 from sopp.custom_dataclasses.reservation import Reservation
-from sopp.custom_dataclasses.time_window import TimeWindow
+from sopp.custom_dataclasses.time_grid import to_time_grid
 from sopp.event_finder.event_finder_rhodesmill.support.evenly_spaced_time_intervals_calculator import \
     EvenlySpacedTimeIntervalsCalculator
 from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.satellite_positions_with_respect_to_facility_retriever import \
     SatellitePositionsWithRespectToFacilityRetriever
 from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.satellite_positions_with_respect_to_facility_retriever_rhodesmill import \
     SatellitePositionsWithRespectToFacilityRetrieverRhodesmill
+from sopp.event_finder.event_finder_rhodesmill.support.satellite_link_budget_engine import SatelliteLinkBudgetEngine
+from sopp.event_finder.event_finder_rhodesmill.support.antenna_direction_pairing import AntennaDirectionPairing
+from sopp.event_finder.event_finder_rhodesmill.support.worker_pool import WorkerPool, query_worker_pool
 from sopp.event_finder.event_finder_rhodesmill.support.satellites_interference_filter import (
-    SatellitesInterferenceFilter,
+    SatellitesFilterStrategy,
     SatellitesWithinMainBeamFilter,
     SatellitesAboveHorizonFilter,
-    AntennaPosition
 )
 from sopp.event_finder.event_finder import EventFinder
 from sopp.custom_dataclasses.satellite.satellite import Satellite
@@ -26,7 +30,12 @@ from sopp.custom_dataclasses.power_time import PowerTime
 from sopp.custom_dataclasses.power_window import PowerWindow
 
 from sopp.custom_dataclasses.power_array import PowerArray
+from sopp.custom_dataclasses.power_contributions import PowerContributions
+from sopp.custom_dataclasses.power_statistics import PowerStatistics
 from sopp.custom_dataclasses.overhead_window import OverheadWindow
+from sopp.power_tracer import POWER_TRACER
+
+POWER_STATISTICS_TIME_CHUNK = timedelta(hours=6)
 
 
 class PowerFinderRhodesmill(EventFinder):
@@ -38,6 +47,19 @@ class PowerFinderRhodesmill(EventFinder):
 
       + get_peak_power_satellites(): Finds the satellites with the highest peak power during the observation window and returns a list of PowerWindows
                                         for each event.
+
+    With a concurrency_level above 1 the satellites are split into one batch per worker process. Every worker
+    accumulates the power of its batch into its own PowerArray, and the partial PowerArrays are summed pairwise once all
+    the workers are done, so no array is shared between processes.
+
+    With track_power_contributions in the runtime settings, the power of every satellite is also kept in
+    power_contributions, a sparse PowerContributions store on the same time bins as the power array.
+
+    get_power_statistics() computes the power one time chunk of the reservation at a time and only adds each chunk to
+    PowerStatistics, so month long runs do not keep the whole power array. The chunks are tasks on the same workers and
+    worker state, so the workers are started once for the whole run. The power array, the power contributions and the
+    retriever of the whole reservation are only built when get_satellite_power() needs them, and are never sent to the
+    workers.
     '''
 
     def __init__(self,
@@ -45,98 +67,237 @@ class PowerFinderRhodesmill(EventFinder):
                  list_of_satellites: List[Satellite],
                  reservation: Reservation,
                  satellite_positions_with_respect_to_facility_retriever_class: Type[SatellitePositionsWithRespectToFacilityRetriever] = SatellitePositionsWithRespectToFacilityRetrieverRhodesmill,
-                 runtime_settings: RuntimeSettings = RuntimeSettings()):
+                 runtime_settings: RuntimeSettings = RuntimeSettings(),
+                 worker_pool: Optional[WorkerPool] = None):
         super().__init__(antenna_direction_path=antenna_direction_path,
                          list_of_satellites=list_of_satellites,
                          reservation=reservation,
                          satellite_positions_with_respect_to_facility_retriever_class=satellite_positions_with_respect_to_facility_retriever_class,
                          runtime_settings=runtime_settings)
 
-        datetimes = EvenlySpacedTimeIntervalsCalculator(
+        self._time_grid = EvenlySpacedTimeIntervalsCalculator(
             time_window=reservation.time,
             resolution=runtime_settings.time_continuity_resolution
-        ).run()
+        ).run_time_grid()
 
-        self._satellite_positions_retriever = satellite_positions_with_respect_to_facility_retriever_class(
-            facility=reservation.facility,
-            datetimes=datetimes
-        )
-        self.power_array = PowerArray(int(self.reservation.time.end.timestamp()-self.reservation.time.begin.timestamp()+1))
-        self._filter_strategy = None
+        self._time_chunk_satellite_positions_retriever: Optional[Tuple[Tuple[int, int], SatellitePositionsWithRespectToFacilityRetriever]] = None
+        self._power_array: Optional[PowerArray] = None
+        self._power_contributions: Optional[PowerContributions] = None
+        self._link_budget_engine = SatelliteLinkBudgetEngine(facility=reservation.facility)
+        self._worker_pool = worker_pool
+        self._antenna_directions = AntennaDirectionPairing(antenna_direction_path, reservation.time)
+
+    @property
+    def power_array(self) -> PowerArray:
+        if self._power_array is None:
+            self._power_array = self._new_power_array(self._full_time_chunk)
+        return self._power_array
+
+    @property
+    def power_contributions(self) -> Optional[PowerContributions]:
+        if self._power_contributions is None and self.runtime_settings.track_power_contributions:
+            self._power_contributions = PowerContributions.for_power_array(
+                self.power_array, [satellite.name for satellite in self.list_of_satellites]
+            )
+        return self._power_contributions
+
+    def __getstate__(self):
+        '''
+        The workers get the finder without the results of the whole reservation and without retrievers, which keep the
+        Skyfield times of their chunk, so the worker state does not grow with the length of the reservation.
+        '''
+        state = self.__dict__.copy()
+        state.update(_power_array=None, _power_contributions=None, _time_chunk_satellite_positions_retriever=None)
+        return state
 
     def get_satellite_power_array(self) -> PowerArray:
-        self._filter_strategy = SatellitesAboveHorizonFilter
         pass
 
     #def get_satellite_power(self) -> List[PowerWindow]:
     def get_satellite_power(self) -> PowerArray:
-        self._filter_strategy = SatellitesAboveHorizonFilter
         # return self._get_satellites_interference()
-        self._get_satellites_interference()
+        self._get_satellites_interference(filter_strategy=SatellitesAboveHorizonFilter)
         return self.power_array
 
-    def _get_satellites_interference(self) -> List[PowerWindow]:
-        for sat in self.list_of_satellites:
-            self._get_satellite_power_windows(sat)
-        """
-        processes = int(self.runtime_settings.concurrency_level) if self.runtime_settings.concurrency_level > 1 else 1
-        pool = multiprocessing.Pool(processes=processes)
-        results = pool.map(self._get_satellite_power_windows, self.list_of_satellites)
-        pool.close()
-        pool.join()
-
-        return [power_window for result in results for power_window in result]
-        """
-
-    def _get_satellite_power_windows(self, satellite: Satellite) -> List[PowerWindow]:
-        antenna_direction_end_times = (
-            [antenna_direction.time for antenna_direction in self.antenna_direction_path[1:]]
-            + [self.reservation.time.end]
-        )
-        satellite_positions = self._get_satellite_positions_within_reservation(satellite)
-        antenna_positions = [
-            AntennaPosition(
-                satellite_positions=self._filter_satellite_positions_within_time_window(
-                    satellite_positions,
-                    time_window=TimeWindow(
-                        begin=max(self.reservation.time.begin, antenna_direction.time),
-                        end=end_time
-                    )
-                ),
-                antenna_direction=antenna_direction
+    def get_power_statistics(
+        self,
+        power_statistics: Optional[PowerStatistics] = None,
+        time_chunk: timedelta = POWER_STATISTICS_TIME_CHUNK
+    ) -> PowerStatistics:
+        power_statistics = power_statistics or PowerStatistics(bin_width=self.runtime_settings.time_continuity_resolution)
+        with query_worker_pool(self._worker_pool, self.runtime_settings.concurrency_level) as worker_pool:
+            for start, stop in self._time_chunks(time_chunk):
+                power_array, _ = self._get_power(SatellitesAboveHorizonFilter, (start, stop), track_power_contributions=False,
+                                                 worker_pool=worker_pool)
+                power_statistics.update(power_array.array[:stop - start])
+        return power_statistics
+
+    def _time_chunks(self, time_chunk: timedelta) -> List[Tuple[int, int]]:
+        '''
+        Splits the time grid into (start, stop) index ranges of time_chunk, rounded up to a whole number of samples.
+        '''
+        chunk_size = max(1, int(np.ceil(time_chunk / self.runtime_settings.time_continuity_resolution)))
+        number_of_samples = len(self._time_grid)
+        return [(start, min(start + chunk_size, number_of_samples)) for start in range(0, number_of_samples, chunk_size)]
+
+    @property
+    def _full_time_chunk(self) -> Tuple[int, int]:
+        return 0, len(self._time_grid)
+
+    def _get_satellites_interference(self, filter_strategy: Type[SatellitesFilterStrategy]):
+        with query_worker_pool(self._worker_pool, self.runtime_settings.concurrency_level) as worker_pool:
+            power_array, power_contributions = self._get_power(
+                filter_strategy, self._full_time_chunk, track_power_contributions=self.runtime_settings.track_power_contributions,
+                worker_pool=worker_pool
             )
-            for antenna_direction, end_time in zip(self.antenna_direction_path, antenna_direction_end_times)
-            if end_time > self.reservation.time.begin
-        ]
-        time_windows = SatellitesInterferenceFilter(
+        if self._power_array is None:
+            self._power_array = power_array
+        else:
+            self._power_array.add_power_array(power_array)
+        if power_contributions is not None:
+            self.power_contributions.extend(power_contributions)
+
+    def _get_power(
+        self,
+        filter_strategy: Type[SatellitesFilterStrategy],
+        time_chunk: Tuple[int, int],
+        track_power_contributions: bool,
+        worker_pool: WorkerPool
+    ) -> Tuple[PowerArray, Optional[PowerContributions]]:
+        '''
+        The power of all the satellites in a time chunk. With more than one satellite batch every batch is a task on the
+        worker pool, with the finder itself as the worker state, and the partial results are summed here. The filter strategy
+        is a task argument, like the time chunk, so workers started for an earlier query never use a stale one.
+        '''
+        satellite_index_batches = self._satellite_index_batches()
+        if len(satellite_index_batches) <= 1:
+            return self._get_partial_power(range(len(self.list_of_satellites)), filter_strategy, time_chunk,
+                                           track_power_contributions)
+
+        partial_results = worker_pool.map(
+            PowerFinderRhodesmill._get_partial_power, state=self,
+            arguments=[(batch, filter_strategy, time_chunk, track_power_contributions) for batch in satellite_index_batches],
+            chunksize=1
+        )
+        partial_power_arrays, partial_power_contributions = zip(*partial_results)
+        power_contributions = None
+        if track_power_contributions:
+            power_contributions = partial_power_contributions[0]
+            for other_power_contributions in partial_power_contributions[1:]:
+                power_contributions.extend(other_power_contributions)
+        return PowerArray.tree_sum(list(partial_power_arrays)), power_contributions
+
+    def _satellite_index_batches(self) -> List[List[int]]:
+        '''
+        Splits the satellite indices into one batch per worker process. Satellites are dealt out in turn, so satellites that
+        are next to each other in the catalog, and often in similar orbits, end up in different batches.
+        '''
+        number_of_batches = min(max(1, int(self.runtime_settings.concurrency_level)), len(self.list_of_satellites))
+        return [list(range(start, len(self.list_of_satellites), number_of_batches)) for start in range(number_of_batches)]
+
+    def _get_partial_power(
+        self,
+        satellite_indices: Iterable[int],
+        filter_strategy: Type[SatellitesFilterStrategy],
+        time_chunk: Tuple[int, int],
+        track_power_contributions: bool = False
+    ) -> Tuple[PowerArray, Optional[PowerContributions]]:
+        partial_power_array = self._new_power_array(time_chunk)
+        partial_power_contributions = (
+            PowerContributions.for_power_array(partial_power_array, [satellite.name for satellite in self.list_of_satellites])
+            if track_power_contributions else None
+        )
+        for satellite_index in satellite_indices:
+            self._add_satellite_power(satellite_index, filter_strategy, partial_power_array, partial_power_contributions, time_chunk)
+        return partial_power_array, partial_power_contributions
+
+    def _new_power_array(self, time_chunk: Tuple[int, int]) -> PowerArray:
+        if time_chunk == self._full_time_chunk:
+            return PowerArray.for_time_window(self.reservation.time, bin_width=self.runtime_settings.time_continuity_resolution)
+        start, stop = time_chunk
+        return PowerArray(stop - start, begin=self._time_grid[start], bin_width=self.runtime_settings.time_continuity_resolution)
+
+    def _add_satellite_power(
+        self,
+        satellite_index: int,
+        filter_strategy: Type[SatellitesFilterStrategy],
+        power_array: PowerArray,
+        power_contributions: Optional[PowerContributions] = None,
+        time_chunk: Optional[Tuple[int, int]] = None
+    ):
+        '''
+        Adds the power received from a satellite at every in view sample to power_array, and to power_contributions when
+        they are tracked. Only the samples of time_chunk are used, or all of them without one. The samples are paired with
+        the antenna direction active at their time, filtered with the filter strategy and converted to power by the
+        SatelliteLinkBudgetEngine, all as arrays over the samples of the satellite.
+        '''
+        satellite = self.list_of_satellites[satellite_index]
+        satellite_positions = self._get_satellite_positions_within_reservation(satellite, time_chunk)
+        altitude = satellite_positions.altitude
+        azimuth = satellite_positions.azimuth
+        distance_km = satellite_positions.distance_km
+        times = to_time_grid(satellite_positions.times)
+
+        antenna_direction_indices = self._antenna_directions.pair(times)
+        paired_indices = np.flatnonzero(antenna_direction_indices >= 0)
+        antenna_altitude = self._antenna_directions.altitudes[antenna_direction_indices[paired_indices]]
+        antenna_azimuth = self._antenna_directions.azimuths[antenna_direction_indices[paired_indices]]
+        in_view = filter_strategy(
             facility=self.reservation.facility,
-            antenna_positions=antenna_positions,
-            cutoff_time=self.reservation.time.end,
-            start_time=self.reservation.time.begin,
-            filter_strategy=self._filter_strategy,
-            runtime_settings=self.runtime_settings,
-        ).power_run(satellite, self.power_array)
-
-        return [PowerWindow(satellite=satellite, powertimes=times) for times in time_windows]
-
-    def _get_satellite_positions_within_reservation(self, satellite: Satellite) -> List[PositionTime]:
-        return self._satellite_positions_retriever.run(satellite)
-
-    @staticmethod
-    def _filter_satellite_positions_within_time_window(
-        satellite_positions: List[PositionTime],
-        time_window: TimeWindow
-    ) -> List[PositionTime]:
-        return [
-            positions
-            for positions in satellite_positions
-            if time_window.begin <= positions.time < time_window.end
-        ]
-    
+            runtime_settings=self.runtime_settings
+        ).is_in_view_array(altitude[paired_indices], azimuth[paired_indices], antenna_altitude, antenna_azimuth)
+        in_view_indices = paired_indices[in_view]
+        if POWER_TRACER.enabled:
+            POWER_TRACER.record('power_finder.satellite', satellite=satellite.name, samples=len(altitude),
+                                samples_in_view=len(in_view_indices))
+        if not len(in_view_indices):
+            return
+
+        power = self._link_budget_engine.received_power(
+            satellite=satellite,
+            altitude=altitude[in_view_indices],
+            azimuth=azimuth[in_view_indices],
+            distance_km=distance_km[in_view_indices],
+            antenna_altitude=antenna_altitude[in_view],
+            antenna_azimuth=antenna_azimuth[in_view]
+        )
+        indices = power_array.indices_of(times.timestamps[in_view_indices])
+        power_array.add_powers(indices, power)
+        if power_contributions is not None:
+            power_contributions.add(satellite_index, indices, power)
+
+    def _get_satellite_positions_within_reservation(
+        self,
+        satellite: Satellite,
+        time_chunk: Optional[Tuple[int, int]] = None
+    ) -> PositionArrays:
+        satellite_positions_retriever = self._satellite_positions_retriever_for(time_chunk or self._full_time_chunk)
+        run_all = getattr(satellite_positions_retriever, 'run_all', None)
+        if run_all is not None:
+            return run_all([satellite])[0]
+
+        satellite_positions = satellite_positions_retriever.run(satellite)
+        return PositionArrays(
+            altitude=np.array([position.position.altitude for position in satellite_positions], dtype=float),
+            azimuth=np.array([position.position.azimuth for position in satellite_positions], dtype=float),
+            distance_km=np.array([position.position.distance_km for position in satellite_positions], dtype=float),
+            times=[position.time for position in satellite_positions]
+        )
+
+    def _satellite_positions_retriever_for(self, time_chunk: Tuple[int, int]) -> SatellitePositionsWithRespectToFacilityRetriever:
+        '''
+        The retriever for the times of time_chunk, built on first use and kept for the next satellites of the same chunk.
+        '''
+        if self._time_chunk_satellite_positions_retriever is None or self._time_chunk_satellite_positions_retriever[0] != time_chunk:
+            start, stop = time_chunk
+            self._time_chunk_satellite_positions_retriever = (time_chunk, self.satellite_positions_with_respect_to_facility_retriever_class(
+                facility=self.reservation.facility,
+                datetimes=self._time_grid[start:stop]
+            ))
+        return self._time_chunk_satellite_positions_retriever[1]
+
     def get_satellites_above_horizon(self) -> List[OverheadWindow]:
-        self._filter_strategy = SatellitesAboveHorizonFilter
         pass
 
     def get_satellites_crossing_main_beam(self) -> List[OverheadWindow]:
-        self._filter_strategy = SatellitesAboveHorizonFilter
         pass
\ No newline at end of file
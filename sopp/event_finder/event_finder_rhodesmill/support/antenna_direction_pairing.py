@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import List, Union
+
+import numpy as np
+
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.time_grid import TimeGrid
+from sopp.custom_dataclasses.time_window import TimeWindow
+
+
+class AntennaDirectionPairing:
+    '''
+    The AntennaDirectionPairing pairs the sample times of a satellite with the antenna direction active at each of them,
+    the last one that starts at or before the sample, in one searchsorted pass over the antenna direction path sorted by
+    time.
+
+      + pair():     the index of the antenna direction of every sample time, or -1 for samples before the first antenna
+                    direction or outside the time window of the reservation.
+      + altitudes:  the altitudes of the antenna directions by time, indexed by the result of pair().
+      + azimuths:   the azimuths of the antenna directions by time, indexed by the result of pair().
+    '''
+    def __init__(self, antenna_direction_path: List[PositionTime], time_window: TimeWindow):
+        antenna_direction_path_by_time = sorted(antenna_direction_path, key=lambda antenna_direction: antenna_direction.time)
+        self.timestamps = np.array([direction.time.timestamp() for direction in antenna_direction_path_by_time])
+        self.altitudes = np.array([direction.position.altitude for direction in antenna_direction_path_by_time], dtype=float)
+        self.azimuths = np.array([direction.position.azimuth for direction in antenna_direction_path_by_time], dtype=float)
+        self._begin_timestamp = time_window.begin.timestamp()
+        self._end_timestamp = time_window.end.timestamp()
+
+    def pair(self, times: Union[List[datetime], TimeGrid]) -> np.ndarray:
+        timestamps = times.timestamps if isinstance(times, TimeGrid) \
+            else np.fromiter((time.timestamp() for time in times), dtype=float, count=len(times))
+        antenna_direction_indices = np.searchsorted(self.timestamps, timestamps, side='right') - 1
+        is_paired = (
+            (antenna_direction_indices >= 0)
+            & (timestamps >= self._begin_timestamp)
+            & (timestamps < self._end_timestamp)
+        )
+        return np.where(is_paired, antenna_direction_indices, -1)
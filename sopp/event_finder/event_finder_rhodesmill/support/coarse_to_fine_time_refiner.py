@@ -0,0 +1,89 @@
+import math
+from datetime import datetime, timedelta
+from typing import List, Union
+
+import numpy as np
+
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_grid import TimeGrid, to_time_grid
+
+EARTH_GRAVITATIONAL_PARAMETER_KM3_PER_S2 = 398600.4418
+EARTH_EQUATORIAL_RADIUS_KM = 6378.137
+EARTH_SURFACE_ROTATION_SPEED_KM_PER_S = 0.4651
+MINIMUM_REFINABLE_PERIGEE_HEIGHT_KM = 80
+ALTITUDE_MARGIN_SAFETY_FACTOR = 2
+SECONDS_PER_MINUTE = 60
+
+
+class CoarseToFineTimeRefiner:
+    '''
+    The CoarseToFineTimeRefiner picks which samples of the full resolution time grid need to be propagated for a satellite,
+    given its altitudes on a coarse grid made of every coarse_step_count-th sample.
+
+    A satellite below the lowest_altitude_in_view given to refine() cannot be in view. Its altitude rate there is bounded
+    by its fastest speed relative to the facility divided by its shortest possible range at that altitude, which is
+    reached at perigee. So if both ends of a coarse interval are further below lowest_altitude_in_view than that rate
+    allows it to climb in half an interval, the satellite stays out of view for the whole interval and it is skipped.
+    Every other interval is refined, including both of its ends, so every skipped gap is bordered by out of view samples
+    and the windows found on the refined samples are identical to the ones found on the full grid.
+    '''
+    def __init__(
+        self,
+        facility: Facility,
+        datetimes: Union[List[datetime], TimeGrid],
+        resolution: timedelta,
+        coarse_resolution: timedelta
+    ):
+        self._facility = facility
+        self._datetimes = to_time_grid(datetimes)
+        self._coarse_step_count = max(1, round(coarse_resolution / resolution))
+        self._coarse_step_seconds = (resolution * self._coarse_step_count).total_seconds()
+
+    @property
+    def coarse_indices(self) -> np.ndarray:
+        last_index = len(self._datetimes) - 1
+        indices = np.arange(0, len(self._datetimes), self._coarse_step_count)
+        return indices if indices[-1] == last_index else np.append(indices, last_index)
+
+    @property
+    def coarse_datetimes(self) -> TimeGrid:
+        return self._datetimes[self.coarse_indices]
+
+    def refine(self, satellite: Satellite, coarse_altitudes: np.ndarray, lowest_altitude_in_view: float) -> np.ndarray:
+        coarse_indices = self.coarse_indices
+        if len(coarse_indices) < 2:
+            return coarse_indices
+
+        threshold = lowest_altitude_in_view - self._altitude_margin(satellite, lowest_altitude_in_view)
+        possibly_in_view = ~(np.asarray(coarse_altitudes) < threshold)
+        refined_intervals = possibly_in_view[:-1] | possibly_in_view[1:]
+
+        coverage = np.zeros(len(self._datetimes) + 1, dtype=np.int64)
+        np.add.at(coverage, coarse_indices[:-1][refined_intervals], 1)
+        np.add.at(coverage, coarse_indices[1:][refined_intervals] + 1, -1)
+        return np.flatnonzero(np.cumsum(coverage[:-1]) > 0)
+
+    def _altitude_margin(self, satellite: Satellite, lowest_altitude_in_view: float) -> float:
+        tle_information = satellite.tle_information
+        mean_motion_radians_per_second = tle_information.mean_motion.value / SECONDS_PER_MINUTE
+        if mean_motion_radians_per_second <= 0:
+            return math.inf
+
+        semi_major_axis = (EARTH_GRAVITATIONAL_PARAMETER_KM3_PER_S2 / mean_motion_radians_per_second ** 2) ** (1 / 3)
+        perigee_radius = semi_major_axis * (1 - tle_information.eccentricity)
+        perigee_height = perigee_radius - EARTH_EQUATORIAL_RADIUS_KM - self._facility.elevation / 1000
+        if perigee_height < MINIMUM_REFINABLE_PERIGEE_HEIGHT_KM:
+            return math.inf
+
+        perigee_speed = math.sqrt(EARTH_GRAVITATIONAL_PARAMETER_KM3_PER_S2 * (2 / perigee_radius - 1 / semi_major_axis))
+        relative_speed = perigee_speed + EARTH_SURFACE_ROTATION_SPEED_KM_PER_S
+        sine_altitude = math.sin(math.radians(lowest_altitude_in_view))
+        shortest_range = (
+            -EARTH_EQUATORIAL_RADIUS_KM * sine_altitude
+            + math.sqrt((EARTH_EQUATORIAL_RADIUS_KM * sine_altitude) ** 2
+                        + 2 * EARTH_EQUATORIAL_RADIUS_KM * perigee_height
+                        + perigee_height ** 2)
+        )
+        altitude_rate = math.degrees(relative_speed / shortest_range)
+        return ALTITUDE_MARGIN_SAFETY_FACTOR * altitude_rate * self._coarse_step_seconds / 2
@@ -2,6 +2,9 @@ from datetime import datetime, timedelta
 from math import ceil
 from typing import List
 
+import numpy as np
+
+from sopp.custom_dataclasses.time_grid import TimeGrid
 from sopp.custom_dataclasses.time_window import TimeWindow
 
 
@@ -11,5 +14,15 @@ class EvenlySpacedTimeIntervalsCalculator:
         self._time_window = time_window
 
     def run(self) -> List[datetime]:
+        return [self._time_window.begin + self._resolution * i for i in range(self._number_of_intervals)]
+
+    def run_time_grid(self) -> TimeGrid:
+        return TimeGrid(
+            begin=self._time_window.begin,
+            seconds=np.arange(self._number_of_intervals) * self._resolution.total_seconds()
+        )
+
+    @property
+    def _number_of_intervals(self) -> int:
         timespan = self._time_window.end - self._time_window.begin
-        return [self._time_window.begin + self._resolution * i for i in range(ceil(timespan / self._resolution))]
+        return ceil(timespan / self._resolution)
@@ -9,19 +9,13 @@ from sopp.custom_dataclasses.satellite.satellite import Satellite
 
 from sopp.custom_dataclasses.position import CartesianCoordinate
 from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.time_grid import TimeGrid
 
-from sopp.event_finder.event_finder_rhodesmill.support.gcrs_geodetic_local_switcher import compute_rotation_matrix_gcrs_to_geodetic
-from sopp.event_finder.event_finder_rhodesmill.support.gcrs_geodetic_local_switcher import compute_rotation_matrix_geodetic_to_local
-
-
-
-from skyfield.api import load
+from sopp.event_finder.event_finder_rhodesmill.support.satellite_link_budget_engine import SatelliteLinkBudgetEngine
 
 R = 6371.0  # approximate radius of Earth in km
 base_alt = 500 # relative average of altitude in km, tbd might need to change or alter value
 
-ts = load.timescale()
-
 class SatelliteLinkBudgetAngleCalculator:
     def __init__(self, facility: Facility, ground_antenna_direction: PositionTime, satellite_position: PositionTime, satellite: Satellite):
         self.facility = facility
@@ -50,29 +44,15 @@ class SatelliteLinkBudgetAngleCalculator:
         return new_coordinate.cartesian_to_spherical()
     
     def calculate_ab_sat(self) -> List[float]: #calculates the alpha and beta angles for gain pattern of the satellite antenna
-        dt = self.satellite_position.time
-        t = ts.utc(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
-        earth_sat = self.satellite.to_rhodesmill()
-        position, velocity, _, error = earth_sat._at(t) # gives the velocity in x,y,z for the geocentric coordinate system
-        velocity_cartesian = CartesianCoordinate(velocity[0],velocity[1],velocity[2])
-        matOne = compute_rotation_matrix_gcrs_to_geodetic(self.facility.coordinates.latitude,self.facility.coordinates.longitude)
-        matTwo = compute_rotation_matrix_geodetic_to_local(self.facility.coordinates.latitude,self.facility.coordinates.longitude)
-        rotated_velocity = velocity_cartesian.pass_to_gsrc_local_matrix(matOne,matTwo)
-        theta = self.calculate_altitude_difference_space() #altitude difference
-        vert_angle = 360 - (self.satellite_position.position.altitude + theta + 90)
-        rotated_velocity_coord = CartesianCoordinate(rotated_velocity[0],rotated_velocity[1],rotated_velocity[2])
-        phi = self.calculate_azimuth_difference_space(rotated_velocity_coord) #azimuth difference
-        horiz_angle = phi + self.ground_antenna_direction.position.azimuth
-        ground_cartesian = self.satellite_position.position.to_cartesian()
-        ground_cartesian.x = -(ground_cartesian.x)
-        ground_cartesian.y = -(ground_cartesian.y)
-        ground_cartesian.z = -(ground_cartesian.z)
-        rotated_vector = ground_cartesian.pass_to_rotation_matrix(horiz_angle, vert_angle)
-        x = rotated_vector[0]
-        y = rotated_vector[1]
-        z = rotated_vector[2]
-        new_coordinate = CartesianCoordinate(x,y,z)
-        return new_coordinate.cartesian_to_spherical()
+        # The engine flips the azimuth itself, so the azimuth is flipped back to pass the position as it is now
+        position = self.satellite_position.position
+        engine = SatelliteLinkBudgetEngine(self.facility)
+        alpha, beta = engine.satellite_angles(
+            np.array([position.altitude]), np.array([-position.azimuth]), np.array([position.distance_km]),
+            np.array([self.ground_antenna_direction.position.azimuth]),
+            engine.local_velocities(self.satellite, TimeGrid.from_datetimes([self.satellite_position.time]))
+        )
+        return [float(alpha[0]), float(beta[0])]
 
     #### some of the functions below this were used before and might become useful for additional algorithms in the future, but are not in use in this file
 
@@ -0,0 +1,197 @@
+import math
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+from skyfield.api import load
+
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_grid import TimeGrid
+from sopp.event_finder.event_finder_rhodesmill.support.gcrs_geodetic_local_switcher import (
+    compute_rotation_matrix_gcrs_to_geodetic,
+    compute_rotation_matrix_geodetic_to_local
+)
+from sopp.power_tracer import POWER_TRACER
+
+EARTH_RADIUS_KM = 6371.0
+MAIN_LOBE_TRANSMITTER_GAIN_DB = 39.3
+SPEED_OF_LIGHT_M_PER_S = 299792458
+
+LINK_BUDGET_TIMESCALE = load.timescale()
+
+
+class SatelliteLinkBudgetEngine:
+    '''
+    The SatelliteLinkBudgetEngine is the array form of SatelliteLinkBudgetAngleCalculator and
+    SatellitesInterferenceFilter.convert_position_to_power(). It takes the altitudes, azimuths and distances of one satellite
+    as (n_samples,) arrays, with the antenna pointing at each sample, and computes every sample at once:
+
+      + ground_angles():        the alpha and beta angles of the satellite in the frame of the ground antenna beam.
+      + satellite_angles():     the alpha and beta angles of the facility in the frame of the satellite antenna, given the
+                                satellite velocity in the local frame of the facility.
+      + local_velocities():     the satellite velocity at the sample times in the local frame of the facility, from a single
+                                SGP4 call over all the times.
+      + link_angles():          the ground and satellite angles together, like get_link_angles(). The times are those of
+                                the samples, or a time grid and the indices of the samples in it.
+      + free_space_loss():      the linear free-space path loss at the transmitter frequency.
+      + received_power():       the power received from the satellite in Watts.
+
+    The rotations and spherical conversions are the same as the scalar calculator's, written out over arrays, so the results
+    agree with it to floating point rounding. The receiver gain is looked up with the gain pattern's get_gains() when it has
+    one, and sample by sample otherwise. The rotation from the GCRS to the local frame of the facility only depends on the
+    facility location, so it is computed once per location, shared by every engine, and applied to all the velocities with
+    one matrix product. When the POWER_TRACER is enabled, received_power() records the angles, gains and powers of each
+    batch.
+    '''
+    def __init__(self, facility: Facility):
+        self._facility = facility
+        self._gcrs_to_local_rotation = gcrs_to_local_rotation(facility.coordinates.latitude, facility.coordinates.longitude)
+
+    def ground_angles(
+        self,
+        altitude: np.ndarray,
+        azimuth: np.ndarray,
+        distance_km: np.ndarray,
+        antenna_altitude: np.ndarray,
+        antenna_azimuth: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        satellite_cartesian = altitude_azimuth_to_cartesian(altitude, -np.asarray(azimuth), distance_km)
+        rotated = rotate_into_beam_frame(satellite_cartesian, -np.asarray(antenna_azimuth), 90 - np.asarray(antenna_altitude))
+        return cartesian_to_spherical(rotated)
+
+    def satellite_angles(
+        self,
+        altitude: np.ndarray,
+        azimuth: np.ndarray,
+        distance_km: np.ndarray,
+        antenna_azimuth: np.ndarray,
+        local_velocity: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        altitude = np.asarray(altitude)
+        distance_km = np.asarray(distance_km)
+        satellite_radius_km = EARTH_RADIUS_KM + distance_km * np.sin(np.radians(altitude))
+        altitude_difference = np.degrees(np.arccos(
+            (distance_km ** 2 + satellite_radius_km ** 2 - EARTH_RADIUS_KM ** 2) / (2 * distance_km * satellite_radius_km)
+        ))
+        vertical_angle = 360 - (altitude + altitude_difference + 90)
+        azimuth_difference = np.degrees(np.arctan2(local_velocity[..., 0], local_velocity[..., 1]))
+        horizontal_angle = azimuth_difference + np.asarray(antenna_azimuth)
+
+        facility_cartesian = -altitude_azimuth_to_cartesian(altitude, -np.asarray(azimuth), distance_km)
+        rotated = rotate_into_beam_frame(facility_cartesian, horizontal_angle, vertical_angle)
+        return cartesian_to_spherical(rotated)
+
+    def local_velocities(self, satellite: Satellite, times: TimeGrid, indices: Optional[np.ndarray] = None) -> np.ndarray:
+        '''
+        The (n_samples, 3) velocities at times[indices], or at every time when indices is None. Only the selected times
+        are propagated. The velocities are in km/s, the satellite angles only depend on their direction.
+        '''
+        if indices is not None:
+            times = times[np.asarray(indices, dtype=np.int64)]
+        velocity = satellite.to_rhodesmill().at(times.to_timescale(LINK_BUDGET_TIMESCALE)).velocity.km_per_s
+        return np.einsum('ij,jn->ni', self._gcrs_to_local_rotation, np.reshape(velocity, (3, -1)))
+
+    def link_angles(
+        self,
+        satellite: Satellite,
+        altitude: np.ndarray,
+        azimuth: np.ndarray,
+        distance_km: np.ndarray,
+        antenna_altitude: np.ndarray,
+        antenna_azimuth: np.ndarray,
+        times: TimeGrid,
+        indices: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        local_velocity = self.local_velocities(satellite, times, indices)
+        if len(local_velocity) != len(altitude):
+            raise ValueError(f'{len(local_velocity)} sample times for {len(altitude)} satellite positions')
+
+        ground_alpha, ground_beta = self.ground_angles(altitude, azimuth, distance_km, antenna_altitude, antenna_azimuth)
+        satellite_alpha, satellite_beta = self.satellite_angles(altitude, azimuth, distance_km, antenna_azimuth, local_velocity)
+        return ground_alpha, ground_beta, satellite_alpha, satellite_beta
+
+    def receiver_gains(self, alpha: np.ndarray, beta: np.ndarray) -> np.ndarray:
+        gain_pattern = self._facility.antenna.gain_pattern
+        if isinstance(gain_pattern, (int, float)):
+            return np.full(np.shape(alpha), float(gain_pattern))
+        if hasattr(gain_pattern, 'get_gains'):
+            return np.asarray(gain_pattern.get_gains(alpha, beta), dtype=float)
+        return np.fromiter((gain_pattern.get_gain(theta, phi) for theta, phi in zip(alpha.tolist(), beta.tolist())),
+                           dtype=float, count=len(alpha))
+
+    @staticmethod
+    def free_space_loss(distance_km: np.ndarray, frequency_mhz: float) -> np.ndarray:
+        wavelength = SPEED_OF_LIGHT_M_PER_S / (frequency_mhz * 1e6)
+        return (4 * math.pi * np.asarray(distance_km) * 1000 / wavelength) ** 2
+
+    def received_power(
+        self,
+        satellite: Satellite,
+        altitude: np.ndarray,
+        azimuth: np.ndarray,
+        distance_km: np.ndarray,
+        antenna_altitude: np.ndarray,
+        antenna_azimuth: np.ndarray
+    ) -> np.ndarray:
+        distance_km = np.asarray(distance_km, dtype=float)
+        if np.isnan(distance_km).any():
+            raise ValueError("Distance must be provided to convert to Cartesian coordinates.")
+
+        alpha, beta = self.ground_angles(altitude, azimuth, distance_km, antenna_altitude, antenna_azimuth)
+        receiver_gain = self.receiver_gains(alpha, beta)
+        transmitter_gain = 10 ** ((MAIN_LOBE_TRANSMITTER_GAIN_DB - 30) / 10.0)
+        power = (
+            satellite.transmitter.power * transmitter_gain * receiver_gain
+            / self.free_space_loss(distance_km, satellite.transmitter.frequency)
+        )
+        if POWER_TRACER.enabled:
+            POWER_TRACER.record('link_budget.received_power', count=len(power), satellite=satellite.name, alpha=alpha,
+                                beta=beta, receiver_gain=receiver_gain, power=power)
+        return power
+
+
+@lru_cache(maxsize=None)
+def gcrs_to_local_rotation(latitude: float, longitude: float) -> np.ndarray:
+    rotation = np.matmul(compute_rotation_matrix_gcrs_to_geodetic(latitude, longitude),
+                         compute_rotation_matrix_geodetic_to_local(latitude, longitude))
+    rotation.flags.writeable = False
+    return rotation
+
+
+def altitude_azimuth_to_cartesian(altitude: np.ndarray, azimuth: np.ndarray, distance_km: np.ndarray) -> np.ndarray:
+    theta = np.radians(90 - np.asarray(altitude))
+    phi = np.radians(azimuth)
+    distance_km = np.asarray(distance_km)
+    return np.stack(np.broadcast_arrays(distance_km * np.sin(theta) * np.cos(phi),
+                                        distance_km * np.sin(theta) * np.sin(phi),
+                                        distance_km * np.cos(theta)), axis=-1)
+
+
+def rotate_into_beam_frame(vectors: np.ndarray, gamma: np.ndarray, phi: np.ndarray) -> np.ndarray:
+    '''
+    Applies the transpose of Rz(gamma) Ry(phi) to every (..., 3) vector, with one pair of angles in degrees per vector. This is
+    CartesianCoordinate.pass_to_rotation_matrix() for whole arrays.
+    '''
+    gamma = np.radians(gamma)
+    phi = np.radians(phi)
+    cosine_gamma, sine_gamma = np.cos(gamma), np.sin(gamma)
+    cosine_phi, sine_phi = np.cos(phi), np.sin(phi)
+    x, y, z = vectors[..., 0], vectors[..., 1], vectors[..., 2]
+    return np.stack([
+        cosine_gamma * cosine_phi * x + sine_gamma * cosine_phi * y - sine_phi * z,
+        -sine_gamma * x + cosine_gamma * y,
+        cosine_gamma * sine_phi * x + sine_gamma * sine_phi * y + cosine_phi * z
+    ], axis=-1)
+
+
+def cartesian_to_spherical(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Array form of CartesianCoordinate.cartesian_to_spherical(): the polar angle from the z axis and the azimuth from the x
+    axis, both in degrees, with the azimuth of vectors on the x axis taken as 0 or 180 like the scalar version.
+    '''
+    x, y, z = vectors[..., 0], vectors[..., 1], vectors[..., 2]
+    r = np.sqrt(x ** 2 + y ** 2 + z ** 2)
+    theta = np.arccos(z / r)
+    phi = np.where(y == 0, np.where(x < 0, np.pi, 0.0), np.arctan2(y, x))
+    return np.degrees(theta), np.degrees(phi)
@@ -0,0 +1,98 @@
+import hashlib
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional, Union
+from uuid import uuid4
+
+import numpy as np
+
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_grid import TimeGrid, to_time_grid
+
+CACHE_FILE_EXTENSION = '.npy'
+BYTES_PER_MEGABYTE = 1024 ** 2
+EVICTION_TARGET_FRACTION = 0.9
+UNIX_EPOCH = datetime.fromtimestamp(0, tz=timezone.utc)
+MICROSECONDS_PER_SECOND = 1_000_000
+
+
+class EphemerisCache:
+    '''
+    The EphemerisCache stores propagated satellite positions on disk so that reruns for the same facility and time grid do
+    not propagate the same satellites again. Each entry is a (3, n_times) array of altitude, azimuth and distance_km saved
+    as an .npy file named after a hash of the satellite's TLE information, the facility coordinates and elevation, and the
+    time grid. Entries are loaded memory-mapped, so a hit does not copy the positions into memory.
+
+    The total size of the cache directory is capped at max_size_mb. When storing an entry pushes the cache over the cap,
+    the least recently used entries are removed, using the file modification time which is refreshed on every hit, until
+    the cache is back under EVICTION_TARGET_FRACTION of the cap.
+    '''
+    def __init__(self, directory: Path, max_size_mb: float = 1024):
+        self._directory = Path(directory)
+        self._max_size_bytes = max_size_mb * BYTES_PER_MEGABYTE
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._size_bytes = sum(stat.st_size for _, stat in self._entries())
+
+    @staticmethod
+    def hash_time_grid(datetimes: Union[List[datetime], TimeGrid]) -> str:
+        '''
+        Hashes the integer microseconds since the Unix epoch of every sample, so that the same sample times give the same
+        hash whatever datetime the grid counts its seconds from, and float rounding below a microsecond does not change it.
+        '''
+        time_grid = to_time_grid(datetimes)
+        begin_microseconds = (time_grid.begin.astimezone(timezone.utc) - UNIX_EPOCH) // timedelta(microseconds=1)
+        microseconds = begin_microseconds + np.round(time_grid.seconds * MICROSECONDS_PER_SECOND).astype(np.int64)
+        return hashlib.sha256(microseconds.astype('<i8').tobytes()).hexdigest()
+
+    @staticmethod
+    def key(satellite: Satellite, facility: Facility, time_grid_hash: str) -> str:
+        contents = repr((
+            satellite.tle_information.cache_key,
+            facility.coordinates.latitude,
+            facility.coordinates.longitude,
+            facility.elevation,
+            time_grid_hash,
+        ))
+        return hashlib.sha256(contents.encode()).hexdigest()
+
+    def load(self, key: str) -> Optional[np.ndarray]:
+        path = self._path(key)
+        try:
+            positions = np.load(path, mmap_mode='r')
+        except (FileNotFoundError, ValueError):
+            return None
+        os.utime(path)
+        return positions
+
+    def store(self, key: str, positions: np.ndarray):
+        temporary_path = self._directory / f'{uuid4().hex}.tmp'
+        with open(temporary_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(positions, dtype=np.float64))
+        self._size_bytes += temporary_path.stat().st_size
+        path = self._path(key)
+        try:
+            self._size_bytes -= path.stat().st_size
+        except FileNotFoundError:
+            pass
+        os.replace(temporary_path, path)
+
+        if self._size_bytes > self._max_size_bytes:
+            self._evict()
+
+    def _evict(self):
+        entries = self._entries()
+        self._size_bytes = sum(stat.st_size for _, stat in entries)
+        target_size_bytes = self._max_size_bytes * EVICTION_TARGET_FRACTION
+        for path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime):
+            if self._size_bytes <= target_size_bytes:
+                break
+            path.unlink(missing_ok=True)
+            self._size_bytes -= stat.st_size
+
+    def _entries(self):
+        return [(path, path.stat()) for path in self._directory.glob(f'*{CACHE_FILE_EXTENSION}')]
+
+    def _path(self, key: str) -> Path:
+        return self._directory / f'{key}{CACHE_FILE_EXTENSION}'
@@ -1,15 +1,17 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List
+from typing import List, Union
 
 from sopp.custom_dataclasses.facility import Facility
 from sopp.custom_dataclasses.position_time import PositionTime
 from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_grid import TimeGrid, to_time_grid
 
 
 class SatellitePositionsWithRespectToFacilityRetriever(ABC):
-    def __init__(self, facility: Facility, datetimes: List[datetime]):
+    def __init__(self, facility: Facility, datetimes: Union[List[datetime], TimeGrid]):
         self._datetimes = datetimes
+        self._time_grid = to_time_grid(datetimes)
         self._facility = facility
 
     @abstractmethod
@@ -0,0 +1,112 @@
+from datetime import datetime
+from typing import List, Optional, Union
+
+import numpy as np
+
+from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.satellite_positions_with_respect_to_facility_retriever import \
+    SatellitePositionsWithRespectToFacilityRetriever
+from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.ephemeris_cache import \
+    EphemerisCache
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.position_arrays import PositionArrays
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_grid import TimeGrid
+
+
+class SatellitePositionsWithRespectToFacilityRetrieverCache(SatellitePositionsWithRespectToFacilityRetriever):
+    '''
+    Wraps another SatellitePositionsWithRespectToFacilityRetriever and serves its positions from an EphemerisCache. Only
+    satellites missing from the cache are propagated by the wrapped retriever, and their positions are stored for later
+    runs. When the wrapped retriever provides run_all(), the missing satellites are propagated together in one call.
+    run_all() returns a list with a PositionArrays per satellite instead of stacking them, which would copy every cache
+    entry into a new array. run_indices() reads the samples it needs from a cached entry, and otherwise propagates only
+    those samples with the wrapped retriever without storing them, since they do not make a whole entry.
+
+    cache_all() only makes sure every satellite has an entry and returns the cache keys, which load() reads back. Another
+    process, such as a worker, then maps the entry itself instead of receiving a pickled copy of the positions.
+    '''
+    def __init__(
+        self,
+        facility: Facility,
+        datetimes: Union[List[datetime], TimeGrid],
+        retriever: SatellitePositionsWithRespectToFacilityRetriever,
+        cache: EphemerisCache
+    ):
+        super().__init__(facility=facility, datetimes=datetimes)
+        self._retriever = retriever
+        self._cache = cache
+        self._time_grid_hash = EphemerisCache.hash_time_grid(self._time_grid)
+
+    def run(self, satellite: Satellite) -> List[PositionTime]:
+        return self.run_all([satellite])[0].to_position_times()
+
+    def run_indices(self, satellite: Satellite, indices: np.ndarray) -> List[PositionTime]:
+        indices = np.asarray(indices, dtype=np.int64)
+        satellite_positions = self._cache.load(EphemerisCache.key(satellite, self._facility, self._time_grid_hash))
+        if satellite_positions is not None:
+            return self._position_arrays(satellite_positions).to_position_times(indices)
+
+        run_indices = getattr(self._retriever, 'run_indices', None)
+        if run_indices is not None:
+            return run_indices(satellite, indices)
+        return type(self._retriever)(facility=self._facility, datetimes=self._time_grid[indices]).run(satellite)
+
+    def run_all(self, satellites: List[Satellite]) -> List[PositionArrays]:
+        '''
+        Returns one PositionArrays per satellite, indexed like the PositionArrays of the other retrievers. The arrays of
+        cached satellites are views of the memory-mapped cache entries, so a hit is not copied into memory until the
+        positions are read.
+        '''
+        keys = [EphemerisCache.key(satellite, self._facility, self._time_grid_hash) for satellite in satellites]
+        return [self._position_arrays(satellite_positions) for satellite_positions in self._load_or_store(satellites, keys)]
+
+    def cache_all(self, satellites: List[Satellite]) -> List[str]:
+        keys = [EphemerisCache.key(satellite, self._facility, self._time_grid_hash) for satellite in satellites]
+        self._load_or_store(satellites, keys)
+        return keys
+
+    def load(self, key: str) -> Optional[PositionArrays]:
+        '''
+        The positions of a cache key returned by cache_all(), or None when the entry has been evicted since.
+        '''
+        satellite_positions = self._cache.load(key)
+        return None if satellite_positions is None else self._position_arrays(satellite_positions)
+
+    def _load_or_store(self, satellites: List[Satellite], keys: List[str]) -> List[np.ndarray]:
+        positions = [self._cache.load(key) for key in keys]
+        missing = [index for index, cached in enumerate(positions) if cached is None]
+
+        if missing:
+            propagated = self._propagate([satellites[index] for index in missing])
+            for propagated_index, index in enumerate(missing):
+                satellite_positions = np.stack((
+                    propagated.altitude[propagated_index],
+                    propagated.azimuth[propagated_index],
+                    propagated.distance_km[propagated_index],
+                ))
+                self._cache.store(keys[index], satellite_positions)
+                positions[index] = satellite_positions
+
+        return positions
+
+    def _position_arrays(self, satellite_positions: np.ndarray) -> PositionArrays:
+        return PositionArrays(
+            altitude=satellite_positions[0],
+            azimuth=satellite_positions[1],
+            distance_km=satellite_positions[2],
+            times=self._time_grid
+        )
+
+    def _propagate(self, satellites: List[Satellite]) -> PositionArrays:
+        run_all = getattr(self._retriever, 'run_all', None)
+        if run_all is not None:
+            return run_all(satellites)
+
+        satellite_positions = [self._retriever.run(satellite) for satellite in satellites]
+        return PositionArrays(
+            altitude=np.array([[position.position.altitude for position in positions] for positions in satellite_positions]),
+            azimuth=np.array([[position.position.azimuth for position in positions] for positions in satellite_positions]),
+            distance_km=np.array([[position.position.distance_km for position in positions] for positions in satellite_positions]),
+            times=self._time_grid
+        )
@@ -1,31 +1,32 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional, Union
 
+import numpy as np
 from skyfield.api import load
+from skyfield.timelib import Time
 from skyfield.toposlib import wgs84
 
 from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.satellite_positions_with_respect_to_facility_retriever import \
     SatellitePositionsWithRespectToFacilityRetriever
 from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_arrays import PositionArrays
 from sopp.custom_dataclasses.position_time import PositionTime
 from sopp.custom_dataclasses.facility import Facility
 from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_grid import TimeGrid
 
 
 RHODESMILL_TIMESCALE = load.timescale()
 
 
 class SatellitePositionsWithRespectToFacilityRetrieverRhodesmill(SatellitePositionsWithRespectToFacilityRetriever):
-    def __init__(self, facility: Facility, datetimes: List[datetime]):
+    def __init__(self, facility: Facility, datetimes: Union[List[datetime], TimeGrid]):
         super().__init__(facility, datetimes)
-        self._timescales = RHODESMILL_TIMESCALE.from_datetimes(datetimes)
+        self._timescales = self._time_grid.to_timescale(RHODESMILL_TIMESCALE)
         self._facility_latlon = self._calculate_facility_latlon()
 
     def run(self, satellite: Satellite) -> List[PositionTime]:
-        satellite_rhodesmill_with_respect_to_facility = satellite.to_rhodesmill() - self._facility_latlon
-
-        topocentric = satellite_rhodesmill_with_respect_to_facility.at(self._timescales)
-        altitude, azimuth, distance = topocentric.altaz()
+        altitude, azimuth, distance = self._altaz(satellite)
 
         return [
             PositionTime(
@@ -35,6 +36,36 @@ class SatellitePositionsWithRespectToFacilityRetrieverRhodesmill(SatellitePositi
             for altitude, azimuth, distance_km, time in zip(altitude.degrees, azimuth.degrees, distance.km, self._datetimes)
         ]
 
+    def run_indices(self, satellite: Satellite, indices: np.ndarray) -> List[PositionTime]:
+        '''
+        The positions at the samples indices of the time grid only. The Skyfield times are indexed out of those the
+        retriever was built with, so the time scale conversions and the facility are not computed again.
+        '''
+        indices = np.asarray(indices, dtype=np.int64)
+        altitude, azimuth, distance = self._altaz(satellite, self._timescales[indices])
+
+        return [
+            PositionTime(
+                Position(altitude=altitude, azimuth=azimuth, distance_km=distance_km),
+                time=time
+            )
+            for altitude, azimuth, distance_km, time in zip(altitude.degrees, azimuth.degrees, distance.km, self._time_grid[indices])
+        ]
+
+    def run_all(self, satellites: List[Satellite]) -> PositionArrays:
+        altaz = [self._altaz(satellite) for satellite in satellites]
+        shape = (len(satellites), len(self._time_grid))
+        return PositionArrays(
+            altitude=np.array([altitude.degrees for altitude, _, _ in altaz]).reshape(shape),
+            azimuth=np.array([azimuth.degrees for _, azimuth, _ in altaz]).reshape(shape),
+            distance_km=np.array([distance.km for _, _, distance in altaz]).reshape(shape),
+            times=self._time_grid
+        )
+
+    def _altaz(self, satellite: Satellite, timescales: Optional[Time] = None):
+        satellite_rhodesmill_with_respect_to_facility = satellite.to_rhodesmill() - self._facility_latlon
+        return satellite_rhodesmill_with_respect_to_facility.at(self._timescales if timescales is None else timescales).altaz()
+
     def _calculate_facility_latlon(self):
         return wgs84.latlon(
             latitude_degrees=self._facility.coordinates.latitude,
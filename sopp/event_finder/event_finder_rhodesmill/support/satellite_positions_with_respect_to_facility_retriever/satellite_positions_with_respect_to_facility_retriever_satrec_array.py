@@ -0,0 +1,94 @@
+import logging
+from datetime import datetime, timezone
+from typing import List, Tuple, Union
+
+import numpy as np
+from sgp4.api import SatrecArray
+from sgp4.conveniences import jday_datetime
+from skyfield.constants import AU_KM, DAY_S
+from skyfield.functions import mxm, to_spherical
+from skyfield.sgp4lib import TEME
+
+from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.satellite_positions_with_respect_to_facility_retriever_rhodesmill import \
+    SatellitePositionsWithRespectToFacilityRetrieverRhodesmill
+from sopp.custom_dataclasses.position_arrays import PositionArrays
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_grid import TimeGrid
+
+LOGGER = logging.getLogger('sopp.propagation')
+
+
+class SatellitePositionsWithRespectToFacilityRetrieverSatrecArray(SatellitePositionsWithRespectToFacilityRetrieverRhodesmill):
+    '''
+    Propagates a whole catalog of satellites over the time grid in a single vectorized SGP4 call using sgp4's SatrecArray,
+    instead of one Skyfield EarthSatellite at a time. The frame rotations from TEME to the facility's altazimuth system and
+    the facility's own position only depend on time, so they are computed once per time grid and shared by every satellite.
+
+      + run():      returns the positions of a single satellite, matching SatellitePositionsWithRespectToFacilityRetrieverRhodesmill.
+      + run_all():  returns dense (n_satellites, n_times) altitude/azimuth/distance arrays for a list of satellites.
+      + run_indices(): returns the positions of a single satellite at some samples of the time grid only, indexing the
+                       frame rotations computed for the whole grid.
+
+    Samples where SGP4 reports an error, for example a satellite that has decayed, are NaN in every array, so they are
+    never in view, and are logged as a warning to the 'sopp.propagation' logger.
+    '''
+    def __init__(self, facility: Facility, datetimes: Union[List[datetime], TimeGrid]):
+        super().__init__(facility, datetimes)
+        self._teme_to_altaz_rotation, self._facility_position_au = self._calculate_facility_frame()
+
+    def run(self, satellite: Satellite) -> List[PositionTime]:
+        return self.run_all([satellite])[0].to_position_times()
+
+    def run_indices(self, satellite: Satellite, indices: np.ndarray) -> List[PositionTime]:
+        return self._propagate([satellite], np.asarray(indices, dtype=np.int64))[0].to_position_times()
+
+    def run_all(self, satellites: List[Satellite]) -> PositionArrays:
+        return self._propagate(satellites, slice(None))
+
+    def _propagate(self, satellites: List[Satellite], indices: Union[np.ndarray, slice]) -> PositionArrays:
+        satrec_array = SatrecArray([satellite.to_rhodesmill().model for satellite in satellites])
+        julian_date, fraction = self._julian_dates()
+        error, position_teme_km, _ = satrec_array.sgp4(julian_date[indices], fraction[indices])
+
+        position_au = np.einsum('ijt,stj->sti', self._teme_to_altaz_rotation[..., indices], position_teme_km / AU_KM)
+        position_au -= self._facility_position_au[indices]
+        distance_au, altitude, azimuth = to_spherical(np.moveaxis(position_au, -1, 0))
+
+        is_error = error != 0
+        if is_error.any():
+            self._log_propagation_errors(satellites, error)
+            for array in (distance_au, altitude, azimuth):
+                array[is_error] = np.nan
+
+        return PositionArrays(
+            altitude=np.degrees(altitude),
+            azimuth=np.degrees(azimuth),
+            distance_km=distance_au * AU_KM,
+            times=self._time_grid[indices]
+        )
+
+    def _julian_dates(self) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        The UTC Julian dates of the time grid split into whole days and day fractions, as SGP4 takes them.
+        '''
+        begin_julian_date, begin_fraction = jday_datetime(self._time_grid.begin.astimezone(timezone.utc))
+        fraction = begin_fraction + self._time_grid.seconds / DAY_S
+        whole_days = np.floor(fraction)
+        return begin_julian_date + whole_days, fraction - whole_days
+
+    @staticmethod
+    def _log_propagation_errors(satellites: List[Satellite], error: np.ndarray):
+        for satellite_index in np.flatnonzero(error.any(axis=1)):
+            error_codes = sorted(set(error[satellite_index][error[satellite_index] != 0].tolist()))
+            LOGGER.warning('SGP4 failed for %s at %d of %d samples, error codes %s',
+                           satellites[satellite_index].name, np.count_nonzero(error[satellite_index]),
+                           error.shape[1], error_codes)
+
+    def _calculate_facility_frame(self):
+        gcrs_to_altaz = self._facility_latlon.rotation_at(self._timescales)
+        teme_to_altaz = mxm(gcrs_to_altaz, np.swapaxes(TEME.rotation_at(self._timescales), 0, 1))
+        facility_gcrs_au = self._facility_latlon.at(self._timescales).xyz.au
+        facility_altaz_au = np.einsum('ijt,jt->ti', gcrs_to_altaz, facility_gcrs_au)
+        return teme_to_altaz, facility_altaz_au
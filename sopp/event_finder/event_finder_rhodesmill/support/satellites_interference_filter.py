@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from functools import cached_property
 from math import isclose
-from typing import List
+from typing import List, Optional, Tuple
 from abc import ABC, abstractmethod
 
 import math
@@ -24,10 +24,11 @@ from sopp.custom_dataclasses.satellite.satellite import Satellite
 from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.satellite_positions_with_respect_to_facility_retriever_rhodesmill import \
     SatellitePositionsWithRespectToFacilityRetrieverRhodesmill
 
-from sopp.event_finder.event_finder_rhodesmill.support.satellite_link_budget_angle_calc import SatelliteLinkBudgetAngleCalculator
+from sopp.event_finder.event_finder_rhodesmill.support.satellite_link_budget_engine import SatelliteLinkBudgetEngine
 from sopp.custom_dataclasses.power_array import PowerArray
 
 DEGREES_IN_A_CIRCLE = 360
+ISCLOSE_RELATIVE_TOLERANCE = 1e-9
 
 
 @dataclass
@@ -44,14 +45,31 @@ class SatellitesFilterStrategy(ABC):
     def is_in_view(self, satellite_position: Position, antenna_position: Position) -> bool:
         pass
 
+    def is_in_view_array(
+        self,
+        satellite_altitude: numpy.ndarray,
+        satellite_azimuth: numpy.ndarray,
+        antenna_altitude: numpy.ndarray,
+        antenna_azimuth: numpy.ndarray
+    ) -> numpy.ndarray:
+        is_in_view = numpy.vectorize(
+            lambda *angles: self.is_in_view(Position(altitude=angles[0], azimuth=angles[1]),
+                                            Position(altitude=angles[2], azimuth=angles[3])),
+            otypes=[bool]
+        )
+        return is_in_view(satellite_altitude, satellite_azimuth, antenna_altitude, antenna_azimuth)
+
+    def lowest_altitude_in_view(self, antenna_position: Position) -> float:
+        return self._runtime_settings.min_altitude
+
 class SatellitesInterferenceFilter:
     def __init__(
         self,
         facility: Facility,
         antenna_positions: List[AntennaPosition],
         cutoff_time: datetime,
-        start_time: datetime,
         filter_strategy: SatellitesFilterStrategy,
+        start_time: Optional[datetime] = None,
         runtime_settings: RuntimeSettings = RuntimeSettings(),
     ):
         self._cutoff_time = cutoff_time
@@ -61,31 +79,69 @@ class SatellitesInterferenceFilter:
         self._filter_strategy = filter_strategy(facility=facility, runtime_settings=runtime_settings)
 
     def run(self) -> List[List[PositionTime]]:
-        segments_of_satellite_positions = []
-        satellite_positions_in_view = []
-
-        for antenna_position in self._antenna_positions_by_time:
-            for satellite_position in self._sort_satellite_positions_by_time(satellite_positions=antenna_position.satellite_positions):
-
-                if satellite_position.time >= self._cutoff_time:
-                    break
+        satellite_positions_by_antenna_direction = [
+            (antenna_position.antenna_direction.position, self._satellite_positions_before_cutoff(antenna_position))
+            for antenna_position in self._antenna_positions_by_time
+        ]
+        satellite_positions = [
+            satellite_position
+            for _, satellite_positions in satellite_positions_by_antenna_direction
+            for satellite_position in satellite_positions
+        ]
+        antenna_directions = [
+            antenna_direction
+            for antenna_direction, satellite_positions in satellite_positions_by_antenna_direction
+            for _ in satellite_positions
+        ]
+        _, begins, ends = self.run_index_ranges(
+            satellite_altitude=numpy.array([position.position.altitude for position in satellite_positions], dtype=float),
+            satellite_azimuth=numpy.array([position.position.azimuth for position in satellite_positions], dtype=float),
+            antenna_altitude=numpy.array([direction.altitude for direction in antenna_directions], dtype=float),
+            antenna_azimuth=numpy.array([direction.azimuth for direction in antenna_directions], dtype=float)
+        )
+        return [satellite_positions[begin:end] for begin, end in zip(begins, ends)]
 
-                in_view = self._filter_strategy.is_in_view(satellite_position.position, antenna_position.antenna_direction.position)
+    def run_index_ranges(
+        self,
+        satellite_altitude: numpy.ndarray,
+        satellite_azimuth: numpy.ndarray,
+        antenna_altitude: numpy.ndarray,
+        antenna_azimuth: numpy.ndarray,
+        times: Optional[numpy.ndarray] = None
+    ) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        '''
+        Array form of run(). Takes the positions of one satellite as (n_times,) arrays, or of the whole catalog as
+        (n_satellites, n_times) arrays, with the antenna pointing at each sample broadcastable against them. If times are
+        given they must be sorted, and samples at or after cutoff_time are dropped. Returns the satellite index and the
+        [begin, end) sample indices of every segment in view, without building any PositionTime.
+        '''
+        satellite_altitude, satellite_azimuth, antenna_altitude, antenna_azimuth = numpy.broadcast_arrays(
+            numpy.atleast_2d(satellite_altitude), satellite_azimuth, antenna_altitude, antenna_azimuth
+        )
+        if times is not None:
+            number_of_times = numpy.searchsorted(numpy.asarray(times), self._cutoff_time, side='left')
+            satellite_altitude, satellite_azimuth, antenna_altitude, antenna_azimuth = (
+                angles[:, :number_of_times] for angles in (satellite_altitude, satellite_azimuth, antenna_altitude, antenna_azimuth)
+            )
 
-                if in_view:
-                    satellite_positions_in_view.append(satellite_position)
-                elif satellite_positions_in_view:
-                    segments_of_satellite_positions.append(satellite_positions_in_view)
-                    satellite_positions_in_view = []
+        in_view = self._filter_strategy.is_in_view_array(satellite_altitude, satellite_azimuth, antenna_altitude, antenna_azimuth)
+        return self._segment_mask(in_view)
 
-        if satellite_positions_in_view:
-            segments_of_satellite_positions.append(satellite_positions_in_view)
+    @staticmethod
+    def _segment_mask(in_view: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        number_of_times = in_view.shape[1]
+        edges = numpy.diff(numpy.pad(in_view.astype(numpy.int8), ((0, 0), (1, 1))), axis=1).ravel()
+        begins = numpy.flatnonzero(edges == 1)
+        ends = numpy.flatnonzero(edges == -1)
+        satellite_indices, begins = numpy.divmod(begins, number_of_times + 1)
+        return satellite_indices, begins, ends % (number_of_times + 1)
 
-        return segments_of_satellite_positions
-    
     def power_run(self, satellite: Satellite, power_array: PowerArray) -> List[List[PowerTime]]:
         segments_of_power_times = []
         power_times_in_view = []
+        if power_array.begin is None:
+            # A PowerArray without a time axis is indexed in bins from the start time, as it was before it had one.
+            power_array.begin = self._start_time
 
         for antenna_position in self._antenna_positions:
             for satellite_position in self._sort_satellite_positions_by_time(satellite_positions=antenna_position.satellite_positions):
@@ -97,10 +153,7 @@ class SatellitesInterferenceFilter:
 
                 if in_view:
                     power_times_in_view.append(self.convert_position_to_power(self._facility, antenna_position.antenna_direction, satellite, satellite_position))
-                    index_offset = self._start_time.timestamp()
-                    time = satellite_position.time.timestamp()
-                    # power_array.add_power(int(time-index_offset),self.convert_position_to_power(self._facility, antenna_position.antenna_direction, satellite, satellite_position).power)
-                    power_array.add_power(int(time-index_offset),power_times_in_view[-1].power)
+                    power_array.add_power_at(satellite_position.time, power_times_in_view[-1].power)
                     # print("We got to this point cool: The power added is: " + str(self.convert_position_to_power(self._facility, antenna_position.antenna_direction, satellite, satellite_position).power))
                 elif power_times_in_view:
                     segments_of_power_times.append(power_times_in_view)
@@ -113,25 +166,27 @@ class SatellitesInterferenceFilter:
     
     
     def convert_position_to_power(self, facility: Facility, antenna_position: PositionTime, satellite: Satellite, position_time: PositionTime) -> PowerTime:
-        calculator_instance = SatelliteLinkBudgetAngleCalculator(facility, antenna_position, position_time, satellite)
-        link_array = calculator_instance.get_link_angles()
-        ### rec_gain = 5
-        rec_gain = facility.antenna.gain_pattern.get_gain(link_array[0],link_array[1]) # in altitude and azimuth, currently
-        ###trans_gain = satellite.antenna.gain_pattern.get_gain(link_array[2],link_array[3]) # also in altitude and azimuth, currently
-        main_lobe_trans_gain = 39.3#in dB
-        trans_gain = 10**((main_lobe_trans_gain-30)/ 10.0)
-        trans_pow = satellite.transmitter.power # in Watts
-        distance = position_time.position.distance_km*1000
-        wavelength = (299792458)/(satellite.transmitter.frequency*1000000) #converts the MHz value to Hz
-        freespace_loss = ((4 * math.pi * distance)/wavelength)**2
-        power_value = (trans_pow * trans_gain * rec_gain)/(freespace_loss)
-        print("The receiver gain is: " + str(rec_gain) + " and the angles here are " + str(link_array[0]) + "," + str(link_array[1]))
-        return PowerTime(power=power_value, time=position_time.time)
+        power_value = SatelliteLinkBudgetEngine(facility).received_power(
+            satellite,
+            numpy.array([position_time.position.altitude]),
+            numpy.array([position_time.position.azimuth]),
+            numpy.array([position_time.position.distance_km]),
+            numpy.array([antenna_position.position.altitude]),
+            numpy.array([antenna_position.position.azimuth])
+        )[0]
+        return PowerTime(power=float(power_value), time=position_time.time)
 
     @cached_property
     def _antenna_positions_by_time(self) -> List[AntennaPosition]:
         return sorted(self._antenna_positions, key=lambda x: x.antenna_direction.time)
 
+    def _satellite_positions_before_cutoff(self, antenna_position: AntennaPosition) -> List[PositionTime]:
+        return [
+            satellite_position
+            for satellite_position in self._sort_satellite_positions_by_time(satellite_positions=antenna_position.satellite_positions)
+            if satellite_position.time < self._cutoff_time
+        ]
+
     @staticmethod
     def _sort_satellite_positions_by_time(satellite_positions: List[PositionTime]) -> List[PositionTime]:
         return sorted(satellite_positions, key=lambda x: x.time)
@@ -141,6 +196,15 @@ class SatellitesAboveHorizonFilter(SatellitesFilterStrategy):
     def is_in_view(self, satellite_position: Position, antenna_position: Position) -> bool:
         return satellite_position.altitude >= self._runtime_settings.min_altitude
 
+    def is_in_view_array(
+        self,
+        satellite_altitude: numpy.ndarray,
+        satellite_azimuth: numpy.ndarray,
+        antenna_altitude: numpy.ndarray,
+        antenna_azimuth: numpy.ndarray
+    ) -> numpy.ndarray:
+        return numpy.asarray(satellite_altitude) >= self._runtime_settings.min_altitude
+
 
 class SatellitesWithinMainBeamFilter(SatellitesFilterStrategy):
     def is_in_view(self, satellite_position: Position, antenna_position: Position) -> bool:
@@ -149,17 +213,86 @@ class SatellitesWithinMainBeamFilter(SatellitesFilterStrategy):
             and self._is_within_beam_with_azimuth(satellite_position.azimuth, antenna_position.azimuth)
         )
 
+    def is_in_view_array(
+        self,
+        satellite_altitude: numpy.ndarray,
+        satellite_azimuth: numpy.ndarray,
+        antenna_altitude: numpy.ndarray,
+        antenna_azimuth: numpy.ndarray
+    ) -> numpy.ndarray:
+        satellite_altitude = numpy.asarray(satellite_altitude)
+        satellite_azimuth = numpy.asarray(satellite_azimuth)
+        antenna_azimuth = numpy.asarray(antenna_azimuth)
+        is_within_beam_width_altitude = (
+            (satellite_altitude >= self._runtime_settings.min_altitude)
+            & (satellite_altitude >= numpy.asarray(antenna_altitude) - self._facility.half_beamwidth)
+        )
+        azimuths_to_compare = [satellite_azimuth, antenna_azimuth,
+                               satellite_azimuth + DEGREES_IN_A_CIRCLE, antenna_azimuth + DEGREES_IN_A_CIRCLE]
+        is_within_beam_width_azimuth = numpy.logical_or.reduce([
+            self._is_close_array(*azimuths) for azimuths in itertools.combinations(azimuths_to_compare, 2)
+        ])
+        return is_within_beam_width_altitude & is_within_beam_width_azimuth
+
     def _is_within_beam_width_altitude(self, satellite_altitude: float, antenna_altitude: float) -> bool:
         is_above_horizon = satellite_altitude >= self._runtime_settings.min_altitude
         lowest_main_beam_altitude = antenna_altitude - self._facility.half_beamwidth
         is_above_main_beam_altitude = satellite_altitude >= lowest_main_beam_altitude
         return is_above_horizon and is_above_main_beam_altitude
 
+    def lowest_altitude_in_view(self, antenna_position: Position) -> float:
+        return max(self._runtime_settings.min_altitude, antenna_position.altitude - self._facility.half_beamwidth)
+
     def _is_within_beam_with_azimuth(self, satellite_azimuth: float, antenna_azimuth: float) -> bool:
-        positions_to_compare_original = [satellite_azimuth, antenna_azimuth]
-        positions_to_compare_next_modulus = (numpy.array(positions_to_compare_original) + DEGREES_IN_A_CIRCLE).tolist()
-        positions_to_compare = itertools.combinations(positions_to_compare_original + positions_to_compare_next_modulus, 2)
-        return any([isclose(*positions, abs_tol=self._facility.half_beamwidth) for positions in positions_to_compare])
+        positions_to_compare = (satellite_azimuth, antenna_azimuth,
+                                satellite_azimuth + DEGREES_IN_A_CIRCLE, antenna_azimuth + DEGREES_IN_A_CIRCLE)
+        return any(isclose(*positions, abs_tol=self._facility.half_beamwidth)
+                   for positions in itertools.combinations(positions_to_compare, 2))
+
+    def _is_close_array(self, first: numpy.ndarray, second: numpy.ndarray) -> numpy.ndarray:
+        tolerance = numpy.maximum(ISCLOSE_RELATIVE_TOLERANCE * numpy.maximum(numpy.abs(first), numpy.abs(second)),
+                                  self._facility.half_beamwidth)
+        return numpy.abs(first - second) <= tolerance
+
+
+class SatellitesWithinCircularMainBeamFilter(SatellitesFilterStrategy):
+    '''
+    A satellite is in the main beam when it is above min_altitude and its great-circle separation from the antenna pointing
+    is at most half the beamwidth. The separation is tested as the dot product of the two unit vectors against the cosine
+    of the half beamwidth, so whole arrays are tested without any trigonometric inverse or per-sample allocation.
+    '''
+    def is_in_view(self, satellite_position: Position, antenna_position: Position) -> bool:
+        return bool(self.is_in_view_array(satellite_position.altitude, satellite_position.azimuth,
+                                          antenna_position.altitude, antenna_position.azimuth))
+
+    def is_in_view_array(
+        self,
+        satellite_altitude: numpy.ndarray,
+        satellite_azimuth: numpy.ndarray,
+        antenna_altitude: numpy.ndarray,
+        antenna_azimuth: numpy.ndarray
+    ) -> numpy.ndarray:
+        separation_cosine = numpy.einsum(
+            '...i,...i->...',
+            altitude_azimuth_to_unit_vectors(satellite_altitude, satellite_azimuth),
+            altitude_azimuth_to_unit_vectors(antenna_altitude, antenna_azimuth)
+        )
+        return (
+            (numpy.asarray(satellite_altitude) >= self._runtime_settings.min_altitude)
+            & (separation_cosine >= math.cos(math.radians(self._facility.half_beamwidth)))
+        )
+
+    def lowest_altitude_in_view(self, antenna_position: Position) -> float:
+        return max(self._runtime_settings.min_altitude, antenna_position.altitude - self._facility.half_beamwidth)
+
+
+def altitude_azimuth_to_unit_vectors(altitude: numpy.ndarray, azimuth: numpy.ndarray) -> numpy.ndarray:
+    altitude = numpy.radians(altitude)
+    azimuth = numpy.radians(azimuth)
+    cosine_altitude = numpy.cos(altitude)
+    return numpy.stack(numpy.broadcast_arrays(cosine_altitude * numpy.cos(azimuth),
+                                              cosine_altitude * numpy.sin(azimuth),
+                                              numpy.sin(altitude)), axis=-1)
 
 
 
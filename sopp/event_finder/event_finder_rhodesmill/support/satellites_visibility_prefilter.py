@@ -0,0 +1,104 @@
+import logging
+import math
+from typing import List
+
+from skyfield.api import load
+from skyfield.toposlib import wgs84
+
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.runtime_settings import RuntimeSettings
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_window import TimeWindow
+
+EARTH_GRAVITATIONAL_PARAMETER_KM3_PER_S2 = 398600.4418
+EARTH_POLAR_RADIUS_KM = 6356.752
+EARTH_ROTATION_RATE_RADIANS_PER_SECOND = 7.2921159e-5
+SECONDS_PER_MINUTE = 60
+ANGULAR_MARGIN_RADIANS = math.radians(1)
+APOGEE_MARGIN_FRACTION = 0.02
+LONGITUDE_DRIFT_RATE_MARGIN_RADIANS_PER_SECOND = math.radians(0.1) / 86400
+
+PREFILTER_TIMESCALE = load.timescale()
+
+LOGGER = logging.getLogger('sopp.prefilter')
+
+
+class SatellitesVisibilityPrefilter:
+    '''
+    The SatellitesVisibilityPrefilter drops satellites that provably never reach min_altitude at the facility during the
+    time window, before any of them are propagated on the full time grid.
+
+    A satellite at radius r is above altitude e only when the Earth central angle between its sub-satellite point and the
+    facility is at most acos(R cos e / r) - e, which is largest at apogee and for the smallest Earth radius R. A lower bound
+    on that central angle comes from two places:
+
+      + latitude:   the sub-satellite point never gets further from the equator than the orbit inclination, so the central
+                    angle is at least the facility latitude minus the inclination.
+      + longitude:  a near-geosynchronous satellite stays close to its sub-satellite longitude at the start of the window.
+                    Its longitude drifts at its mean motion minus the Earth rotation rate and oscillates by about 2e + i^2/4
+                    radians, so the central angle is at least the facility's distance from that point on the equator minus
+                    the inclination and the longitude excursion. Only checked when the excursion is below half a turn.
+
+    Satellites without TLE information are always kept. A one degree margin and a 2% apogee margin cover the difference
+    between mean and osculating elements and between geodetic and geocentric latitude. After run(),
+    number_of_satellites_pruned holds how many satellites were dropped, which is also logged at info level to the
+    'sopp.prefilter' logger. run_indices() returns the indices of the kept satellites instead.
+    '''
+    def __init__(self, facility: Facility, time_window: TimeWindow, runtime_settings: RuntimeSettings = RuntimeSettings()):
+        self._facility = facility
+        self._time_window = time_window
+        self._runtime_settings = runtime_settings
+        self.number_of_satellites_pruned = 0
+
+    def run(self, satellites: List[Satellite]) -> List[Satellite]:
+        return [satellites[index] for index in self.run_indices(satellites)]
+
+    def run_indices(self, satellites: List[Satellite]) -> List[int]:
+        indices_possibly_visible = [index for index, satellite in enumerate(satellites) if self._is_possibly_visible(satellite)]
+        self.number_of_satellites_pruned = len(satellites) - len(indices_possibly_visible)
+        LOGGER.info('Pruned %d of %d satellites that never reach %s degrees of altitude',
+                    self.number_of_satellites_pruned, len(satellites), self._runtime_settings.min_altitude)
+        return indices_possibly_visible
+
+    def _is_possibly_visible(self, satellite: Satellite) -> bool:
+        tle_information = satellite.tle_information
+        if tle_information is None or tle_information.mean_motion.value <= 0:
+            return True
+
+        mean_motion = tle_information.mean_motion.value / SECONDS_PER_MINUTE
+        semi_major_axis = (EARTH_GRAVITATIONAL_PARAMETER_KM3_PER_S2 / mean_motion ** 2) ** (1 / 3)
+        apogee_radius = semi_major_axis * (1 + tle_information.eccentricity) * (1 + APOGEE_MARGIN_FRACTION)
+        visibility_central_angle = self._visibility_central_angle(apogee_radius)
+        highest_latitude = min(tle_information.inclination, math.pi - tle_information.inclination)
+
+        facility_latitude = math.radians(self._facility.coordinates.latitude)
+        shortest_central_angle = abs(facility_latitude) - highest_latitude
+
+        longitude_excursion = (
+            (abs(mean_motion - EARTH_ROTATION_RATE_RADIANS_PER_SECOND) + LONGITUDE_DRIFT_RATE_MARGIN_RADIANS_PER_SECOND)
+            * self._time_window.duration.total_seconds()
+            + 2 * (2 * tle_information.eccentricity + highest_latitude ** 2 / 4)
+        )
+        if longitude_excursion < math.pi:
+            shortest_central_angle = max(
+                shortest_central_angle,
+                self._central_angle_to_equator_point(self._sub_satellite_longitude(satellite))
+                - highest_latitude - longitude_excursion
+            )
+
+        return shortest_central_angle <= visibility_central_angle + ANGULAR_MARGIN_RADIANS
+
+    def _visibility_central_angle(self, satellite_radius: float) -> float:
+        min_altitude = math.radians(self._runtime_settings.min_altitude) - ANGULAR_MARGIN_RADIANS
+        facility_radius = EARTH_POLAR_RADIUS_KM + min(0, self._facility.elevation / 1000)
+        cosine = facility_radius * math.cos(min_altitude) / satellite_radius
+        return math.acos(cosine) - min_altitude if cosine <= 1 else -math.inf
+
+    def _central_angle_to_equator_point(self, longitude: float) -> float:
+        facility_latitude = math.radians(self._facility.coordinates.latitude)
+        facility_longitude = math.radians(self._facility.coordinates.longitude)
+        return math.acos(math.cos(facility_latitude) * math.cos(longitude - facility_longitude))
+
+    def _sub_satellite_longitude(self, satellite: Satellite) -> float:
+        geocentric = satellite.to_rhodesmill().at(PREFILTER_TIMESCALE.from_datetime(self._time_window.begin))
+        return wgs84.latlon_of(geocentric)[1].radians
@@ -0,0 +1,102 @@
+import math
+import multiprocessing
+import multiprocessing.pool
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+CHUNKS_PER_PROCESS = 4
+
+_worker_state = None
+
+
+def _initialize_worker(state: Any):
+    global _worker_state
+    _worker_state = state
+
+
+def _run_task(function_and_arguments: Tuple[Callable, Tuple]) -> Any:
+    function, arguments = function_and_arguments
+    return function(_worker_state, *arguments)
+
+
+class WorkerPool:
+    '''
+    The WorkerPool is a multiprocessing pool that outlives a single query. Its workers receive a state object once, when
+    they start, and every task then calls function(state, *arguments) with only the small per-task arguments pickled. For
+    the EventFinderRhodesmill the state is the finder itself, with its reservation, time grid and catalog, and the
+    arguments are a satellite index and a filter strategy.
+
+    The workers are started on the first map() and kept until close(), so consecutive queries on the same state do not
+    pay process start-up or state serialization again. Mapping with a different state restarts the workers with it.
+
+    imap_unordered() yields results as soon as each task finishes. Closing its generator before it is exhausted
+    terminates the workers, so cancelled tasks stop right away, and the next call starts new ones.
+    '''
+    def __init__(self, processes: int = 1):
+        self._processes = max(1, int(processes))
+        self._pool = None
+        self._state = None
+
+    def map(self, function: Callable, state: Any, arguments: List[Tuple], chunksize: Optional[int] = None) -> List:
+        chunksize = chunksize or self._chunksize(len(arguments))
+        return self._pool_for(state).map(_run_task, [(function, task_arguments) for task_arguments in arguments],
+                                         chunksize=chunksize)
+
+    def imap_unordered(self, function: Callable, state: Any, arguments: List[Tuple], chunksize: int = 1) -> Iterator:
+        results = self._pool_for(state).imap_unordered(
+            _run_task, [(function, task_arguments) for task_arguments in arguments], chunksize=chunksize
+        )
+        is_exhausted = False
+        try:
+            yield from results
+            is_exhausted = True
+        finally:
+            if not is_exhausted:
+                self.terminate()
+
+    def terminate(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+        self._pool = None
+        self._state = None
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+        self._pool = None
+        self._state = None
+
+    def __enter__(self) -> 'WorkerPool':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getstate__(self):
+        return {'_processes': self._processes, '_pool': None, '_state': None}
+
+    def _pool_for(self, state: Any) -> multiprocessing.pool.Pool:
+        if self._pool is None or self._state is not state:
+            self.close()
+            self._pool = multiprocessing.Pool(processes=self._processes, initializer=_initialize_worker, initargs=(state,))
+            self._state = state
+        return self._pool
+
+    def _chunksize(self, number_of_tasks: int) -> int:
+        return max(1, math.ceil(number_of_tasks / (self._processes * CHUNKS_PER_PROCESS)))
+
+
+@contextmanager
+def query_worker_pool(worker_pool: Optional[WorkerPool], processes: int) -> Iterator[WorkerPool]:
+    '''
+    Uses the shared worker_pool when one was given, otherwise a WorkerPool that lives for a single query, so that all the
+    time chunks of a query run on the same workers.
+    '''
+    if worker_pool is not None:
+        yield worker_pool
+        return
+
+    with WorkerPool(processes=processes) as query_pool:
+        yield query_pool
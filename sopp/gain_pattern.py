@@ -1,20 +1,41 @@
+from typing import Optional, Tuple
+
 import pandas as pd
 import numpy as np
 
 from scipy.spatial import cKDTree
 
 class GainPattern:
-    def __init__(self, csv_file):
+    '''
+    The GainPattern looks up antenna gains by alpha (theta) and beta (phi) from a CSV file of measured points. get_gain()
+    returns the gain of the point closest to one direction and get_gains() the gains of whole arrays of directions, with
+    one KD-tree query and an index into a NumPy array of the gains.
+
+    When grid_resolution is given, the measured points are resampled once onto a regular alpha/beta grid with that
+    spacing, and gains are then interpolated bilinearly from the four grid nodes around each direction. Every lookup is a
+    constant number of array operations, independent of the number of measured points.
+    '''
+    def __init__(self, csv_file, grid_resolution: Optional[float] = None):
     
         self.csv_file = csv_file
         self.df = self.load_antenna_gain_data()  # Load and store the data
         self.tree = self.build_kd_tree()
+        self.gains = self.df['gain'].to_numpy(dtype=float)
+        self.grid_resolution = grid_resolution
+        self.grid = None if grid_resolution is None else self.build_regular_grid(grid_resolution)
 
     def build_kd_tree(self):
         # Build the KD-tree from the DataFrame points
         points = self.df[['alpha', 'beta']].values
         return cKDTree(points)
     
+    def build_regular_grid(self, resolution: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        alphas = np.arange(self.df['alpha'].min(), self.df['alpha'].max() + resolution / 2, resolution)
+        betas = np.arange(self.df['beta'].min(), self.df['beta'].max() + resolution / 2, resolution)
+        alpha_mesh, beta_mesh = np.meshgrid(alphas, betas, indexing='ij')
+        _, indices = self.tree.query(np.column_stack((alpha_mesh.ravel(), beta_mesh.ravel())))
+        return alphas, betas, self.gains[indices].reshape(alpha_mesh.shape)
+
     def load_antenna_gain_data(self):
 
         df = pd.read_csv(self.csv_file)
@@ -28,9 +49,6 @@ class GainPattern:
         return df
     
     def get_gain(self, theta: float, phi: float): # must be in altitude,azmith format THETA IS ALTITUDE
-
-        if (phi <= 0):
-            phi += 360
         """
         Get gain at specific spherical coordinates (theta, phi) in degrees.
         
@@ -38,28 +56,38 @@ class GainPattern:
         :param phi_deg: Phi in degrees (azimuth).
         :return: Gain value at the specified (theta, phi), or the closest value if exact match is not found.
         """
-        query_point = np.array([theta, phi])
+        return self.get_gains(np.array([theta], dtype=float), np.array([phi], dtype=float))[0]
 
-        # Query the KD-tree for the nearest neighbor
-        distance, index = self.tree.query(query_point)
-        
-        # Return the gain value of the closest point
-        closest_gain = self.df.iloc[index]['gain']
-        
-        return closest_gain
+    def get_gains(self, theta: np.ndarray, phi: np.ndarray) -> np.ndarray:
         """
-        # Compute distances between query_point and all points in DataFrame
-        df_points = self.df[['alpha', 'beta']].values
-        distances = np.linalg.norm(df_points - query_point, axis=1)
-        
-        # Find the index of the closest point
-        closest_index = np.argmin(distances)
-        
-        # Return the gain value of the closest point
-        closest_gain = self.df.iloc[closest_index]['gain']
-        
-        return closest_gain
+        Get the gains at arrays of spherical coordinates (theta, phi) in degrees, with the same shape as theta.
         """
+        theta = np.asarray(theta, dtype=float)
+        phi = np.asarray(phi, dtype=float)
+        phi = np.where(phi <= 0, phi + 360, phi)
+
+        if self.grid is not None:
+            return self._interpolate_grid(theta, phi)
+
+        # Query the KD-tree for the nearest neighbors of every point at once
+        _, indices = self.tree.query(np.column_stack((theta.ravel(), phi.ravel())))
+        return self.gains[indices].reshape(theta.shape)
+
+    def _interpolate_grid(self, theta: np.ndarray, phi: np.ndarray) -> np.ndarray:
+        alphas, betas, grid_gains = self.grid
+        alpha_lower, alpha_fraction, alpha_upper = self._grid_cell(alphas, theta)
+        beta_lower, beta_fraction, beta_upper = self._grid_cell(betas, phi)
+        return (
+            grid_gains[alpha_lower, beta_lower] * (1 - alpha_fraction) * (1 - beta_fraction)
+            + grid_gains[alpha_upper, beta_lower] * alpha_fraction * (1 - beta_fraction)
+            + grid_gains[alpha_lower, beta_upper] * (1 - alpha_fraction) * beta_fraction
+            + grid_gains[alpha_upper, beta_upper] * alpha_fraction * beta_fraction
+        )
+
+    def _grid_cell(self, nodes: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        position = np.clip((values - nodes[0]) / self.grid_resolution, 0, len(nodes) - 1)
+        lower = np.minimum(np.floor(position).astype(np.int64), max(len(nodes) - 2, 0))
+        return lower, position - lower, np.minimum(lower + 1, len(nodes) - 1)
 
 # Example usage:
 # file_path = 'path/to/your/gain_pattern.csv'
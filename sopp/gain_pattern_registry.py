@@ -0,0 +1,144 @@
+import hashlib
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+from uuid import uuid4
+
+import numpy as np
+
+from sopp.healpix import HEALPIX_METADATA_FILE_NAME, HealpixGainPattern, HealpixLoader
+
+GAIN_PATTERN_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE = 'SOPP_GAIN_PATTERN_CACHE'
+
+
+@dataclass(frozen=True)
+class GainPatternSource:
+    '''
+    Where a registered gain pattern comes from and how its HEALPix map is built.
+
+      + csv_file:       measured pattern with alpha, beta and gain columns, read by HealpixLoader.
+      + nside:          resolution of the HEALPix map.
+      + dtype:          storage type of the map.
+      + partial_sky:    whether only the pixels with data are built and kept.
+    '''
+    csv_file: Path
+    nside: int = 2048
+    dtype: type = np.float32
+    partial_sky: bool = True
+
+
+class GainPatternRegistry:
+    '''
+    The GainPatternRegistry maps pattern names to HealpixGainPatterns that are only built or loaded the first time they are
+    used, and then kept for the life of the process.
+
+    Registering a pattern only records its GainPatternSource. On first use the registry looks for the built map in the
+    cache directory, under a key made of the hash of the CSV file and the build options, and memory-maps it from there. On
+    a miss the map is built from the CSV file and saved to the cache first, so later processes, including worker processes,
+    load it without building it again and share the same physical copy. Without a cache directory, or when it cannot be
+    written, the map is built in memory.
+
+    The GAIN_PATTERN_REGISTRY of the package only caches to disk when the SOPP_GAIN_PATTERN_CACHE environment variable
+    names a directory, so that importing sopp never writes files.
+    '''
+    def __init__(self, cache_directory: Optional[Path] = None):
+        self.cache_directory = cache_directory
+        self._sources: Dict[str, GainPatternSource] = {}
+        self._patterns: Dict[str, HealpixGainPattern] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, csv_file: Path, nside: int = 2048, dtype: type = np.float32, partial_sky: bool = True):
+        with self._lock:
+            self._sources[name] = GainPatternSource(csv_file=Path(csv_file), nside=nside, dtype=dtype, partial_sky=partial_sky)
+            self._patterns.pop(name, None)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._patterns
+
+    def get(self, name: str) -> HealpixGainPattern:
+        pattern = self._patterns.get(name)
+        if pattern is not None:
+            return pattern
+
+        with self._lock:
+            if name not in self._patterns:
+                if name not in self._sources:
+                    raise KeyError(f'No gain pattern registered as {name!r}.')
+                self._patterns[name] = self._load(self._sources[name])
+            return self._patterns[name]
+
+    @staticmethod
+    def cache_key(source: GainPatternSource) -> str:
+        contents = repr((GainPatternRegistry._loader(source).cache_key(), source.partial_sky))
+        return hashlib.sha256(contents.encode()).hexdigest()
+
+    def _load(self, source: GainPatternSource) -> HealpixGainPattern:
+        if self.cache_directory is None:
+            return self._build(source)
+
+        directory = Path(self.cache_directory) / self.cache_key(source)
+        if not (directory / HEALPIX_METADATA_FILE_NAME).exists():
+            pattern = self._build(source)
+            try:
+                self._store(pattern, directory)
+            except OSError:
+                return pattern
+        return HealpixGainPattern.load(directory)
+
+    @staticmethod
+    def _build(source: GainPatternSource) -> HealpixGainPattern:
+        loader = GainPatternRegistry._loader(source)
+        if source.partial_sky:
+            return loader.load_partial_sky_gain_pattern()
+        return HealpixGainPattern(loader.load_healpix_gain_pattern(), nside=source.nside)
+
+    @staticmethod
+    def _loader(source: GainPatternSource) -> HealpixLoader:
+        return HealpixLoader(str(source.csv_file), nside=source.nside, dtype=source.dtype)
+
+    @staticmethod
+    def _store(pattern: HealpixGainPattern, directory: Path):
+        temporary_directory = directory.with_name(f'{uuid4().hex}.tmp')
+        pattern.save(temporary_directory)
+        try:
+            os.replace(temporary_directory, directory)
+        except OSError:
+            shutil.rmtree(temporary_directory, ignore_errors=True)
+            if not (directory / HEALPIX_METADATA_FILE_NAME).exists():
+                raise
+
+
+class RegisteredGainPattern:
+    '''
+    A lightweight reference to a pattern of the GAIN_PATTERN_REGISTRY by name. It resolves the pattern on the first lookup
+    and pickles as the name alone, so objects holding it are cheap to create and to send to worker processes.
+    '''
+    def __init__(self, name: str):
+        self.name = name
+
+    @property
+    def pattern(self) -> HealpixGainPattern:
+        return GAIN_PATTERN_REGISTRY.get(self.name)
+
+    def get_gain(self, theta: float, phi: float) -> float:
+        return self.pattern.get_gain(theta, phi)
+
+    def get_gains(self, theta: np.ndarray, phi: np.ndarray) -> np.ndarray:
+        return self.pattern.get_gains(theta, phi)
+
+    def __getstate__(self):
+        return {'name': self.name}
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.name!r})'
+
+
+def cache_directory_from_environment() -> Optional[Path]:
+    cache_directory = os.environ.get(GAIN_PATTERN_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE)
+    return Path(cache_directory) if cache_directory else None
+
+
+GAIN_PATTERN_REGISTRY = GainPatternRegistry(cache_directory=cache_directory_from_environment())
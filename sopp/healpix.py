@@ -1,15 +1,36 @@
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Tuple
+
 import numpy as np
 import pandas as pd
 import healpy as hp
-from scipy.interpolate import griddata
+from scipy.interpolate import CloughTocher2DInterpolator, LinearNDInterpolator, NearestNDInterpolator
 
 import matplotlib.pyplot as plt
 from scipy.interpolate import RegularGridInterpolator
 
+HEALPIX_GAIN_FILE_NAME = 'healpix_gain.npy'
+HEALPIX_PIXELS_FILE_NAME = 'healpix_pixels.npy'
+HEALPIX_METADATA_FILE_NAME = 'healpix_metadata.json'
+INTERPOLATION_CHUNK_SIZE = 2 ** 20
+
+
 class HealpixLoader:
-    def __init__(self, csv_file, nside=2048):
+    '''
+    The HealpixLoader builds a HEALPix map of an antenna gain pattern from a CSV file of alpha, beta and gain columns, by
+    averaging the gains of the points that fall in each pixel. The averaging is two np.bincount passes over the points.
+
+    load_healpix_gain_pattern() returns the full-sky map. load_partial_sky_gain_pattern() only builds the pixels that hold
+    a gain, so a pattern that covers part of the sphere never allocates the full map. cache_key() is a hash of the CSV
+    contents and of the build options, under which built patterns can be cached.
+    '''
+    def __init__(self, csv_file, nside=2048, dtype=np.float32):
         self.csv_file = csv_file
         self.nside = nside  # Resolution parameter, can be changed as needed
+        self.dtype = dtype  # np.float64 doubles the size of the map
     
     def load_antenna_gain_data(self):
         """
@@ -33,119 +54,218 @@ class HealpixLoader:
         # Convert gain from dB to linear scale
         #gain_linear = 10 ** (gain_dB / 10.0)
 
-        # Initialize HEALPix map
-        healpix_gain = np.zeros(hp.nside2npix(self.nside))
-        counts = np.zeros(hp.nside2npix(self.nside)) ##added for averaging***
-
         # Aggregate gains to HEALPix pixels
         pixel_indices = hp.ang2pix(self.nside, theta, phi)
-        
-        for i in range(len(gain_dB)):
-            healpix_gain[pixel_indices[i]] += gain_dB[i]
-            #healpix_gain[pixel_indices[i]] = gain_dB[i]
-            counts[pixel_indices[i]] += 1   ###added for averaging***
-        ### this stuff added for averaging
+        healpix_gain = np.bincount(pixel_indices, weights=gain_dB, minlength=hp.nside2npix(self.nside))
+        counts = np.bincount(pixel_indices, minlength=hp.nside2npix(self.nside)) ##added for averaging***
+
         with np.errstate(divide='ignore', invalid='ignore'):
-            healpix_gain = np.divide(healpix_gain, counts, where=(counts > 0))
+            healpix_gain = np.divide(healpix_gain, counts, out=np.zeros_like(healpix_gain), where=(counts > 0))
 
         return healpix_gain
 
+    def create_partial_healpix_object(self, azimuth, elevation, gain_dB) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Average the antenna gain of the pixels that hold points only. Returns the sorted pixels and their gains.
+        """
+        pixel_indices = hp.ang2pix(self.nside, np.radians(elevation), np.radians(azimuth))
+        pixels, point_pixels = np.unique(pixel_indices, return_inverse=True)
+        return pixels, np.bincount(point_pixels, weights=gain_dB) / np.bincount(point_pixels)
+
     def load_healpix_gain_pattern(self):
         azimuth, elevation, gain_dB = self.load_antenna_gain_data()
         healpix_gain = self.create_healpix_object(azimuth, elevation, gain_dB)
-        return healpix_gain
+        return healpix_gain.astype(self.dtype, copy=False)
+
+    def load_partial_sky_gain_pattern(self, fill_value: float = 0.0) -> 'HealpixGainPattern':
+        """
+        The partial-sky HealpixGainPattern of the pixels whose gain is not fill_value, like HealpixGainPattern.to_partial_sky()
+        of the full map.
+        """
+        pixels, healpix_gain = self.create_partial_healpix_object(*self.load_antenna_gain_data())
+        is_kept = healpix_gain != fill_value
+        return HealpixGainPattern(healpix_gain[is_kept].astype(self.dtype), nside=self.nside, pixels=pixels[is_kept],
+                                  fill_value=fill_value)
+
+    def cache_key(self) -> str:
+        with open(self.csv_file, 'rb') as f:
+            csv_hash = hashlib.sha256(f.read()).hexdigest()
+        contents = repr((csv_hash, self.__class__.__name__, self.nside, np.dtype(self.dtype).str))
+        return hashlib.sha256(contents.encode()).hexdigest()
 
 
 class HealpixInterLoader(HealpixLoader):
+    '''
+    The HealpixInterLoader builds the map by interpolating the measured points at the center of every pixel instead of
+    averaging them, for patterns that are not evenly sampled. The interpolator is built once, like griddata() does, and
+    evaluated on chunks of INTERPOLATION_CHUNK_SIZE pixels whose centers come from one array pix2ang() call each. The chunks
+    are spread over a pool of worker threads, os.cpu_count() by default, since SciPy evaluates them without holding the GIL.
+    '''
+    def __init__(self, csv_file, nside=2048, dtype=np.float32, workers: Optional[int] = None):
+        super().__init__(csv_file, nside=nside, dtype=dtype)
+        self.workers = workers
+
     def interpolate_data(self, azimuth, elevation, gain_dB, method='linear'):
         """
         Interpolate antenna gain data to ensure even sampling.
         """
+        gain_interpolated = self.interpolate_pixels(azimuth, elevation, gain_dB, method=method)
+        elevation_mesh, azimuth_mesh = hp.pix2ang(self.nside, np.arange(hp.nside2npix(self.nside)))
+        grid_points = np.column_stack((azimuth_mesh, elevation_mesh))
+        return gain_interpolated, grid_points
+
+    def interpolate_pixels(self, azimuth, elevation, gain_dB, method='linear', pixels: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Interpolate antenna gain data at the center of every pixel, or of the given pixels, in pixel order.
+        """
         # Convert azimuth and elevation to radians
         theta = np.radians(elevation)
         phi = np.radians(azimuth)
+        interpolator = self._interpolator((phi, theta), gain_dB, method=method)
 
-        npix_mesh = hp.nside2npix(self.nside)
-        #elevation_mesh = np.zeros(npix_mesh)
-        elevation_mesh = []
-        #azimuth_mesh = np.zeros(npix_mesh)
-        azimuth_mesh = []
-
-        for i in range(npix_mesh):
-            theta_s,phi_s = hp.pix2ang(self.nside, i)
-            elevation_mesh.append(theta_s)
-            azimuth_mesh.append(phi_s)
+        if pixels is None:
+            pixels = np.arange(hp.nside2npix(self.nside))
+        gain_interpolated = np.empty(len(pixels))
 
-        # Define grid for interpolation
-        # azimuth_grid = np.linspace(0, 360, grid_resolution)
-        # elevation_grid = np.linspace(-90, 90, grid_resolution)
-        # azimuth_mesh, elevation_mesh = np.meshgrid(azimuth_grid, elevation_grid)
-
-        # Interpolate gain values
-        # gain_interpolated = RegularGridInterpolator((phi,theta), gain_dB)
-        grid_points = np.column_stack((azimuth_mesh, elevation_mesh))
+        def interpolate_chunk(start: int):
+            chunk = slice(start, start + INTERPOLATION_CHUNK_SIZE)
+            elevation_mesh, azimuth_mesh = hp.pix2ang(self.nside, pixels[chunk])
+            gain_interpolated[chunk] = interpolator(np.column_stack((azimuth_mesh, elevation_mesh)))
 
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(interpolate_chunk, range(0, len(pixels), INTERPOLATION_CHUNK_SIZE)))
 
-        gain_interpolated = griddata((phi,theta), gain_dB, grid_points, method=method, fill_value=0.0)
-
-        # return azimuth_mesh, elevation_mesh, gain_interpolated
-        return gain_interpolated, grid_points
+        return gain_interpolated
 
     def create_healpix_object(self, azimuth, elevation, gain_dB, method='linear'):
         """
-        Create HEALPix object for antenna gain with interpolation.
-        """
-        gain_interpolated, grid_points = self.interpolate_data(azimuth, elevation, gain_dB, method=method)
-
-        # Convert interpolated azimuth and elevation to spherical coordinates
-        # theta_mesh = np.radians(90 - elevation_mesh)
-        # phi_mesh = np.radians(azimuth_mesh)
-
-        # Initialize HEALPix map
-        healpix_gain = np.zeros(hp.nside2npix(self.nside))
-        npix_mesh = hp.nside2npix(self.nside)
-        """
-        for i in range(len(healpix_gain)):
-            theta_s,phi_s = hp.pix2ang(self.nside, i)
-            ## now that we have an angle, we must conif (gain_value == 0):
-        print("oops")vert the angle to an index that corresponds to a query point
-             # Convert theta_s and phi_s to radians (already in radians)
-            query_point = np.array([phi_s, theta_s])
-
-            # Retrieve interpolated gain value
-            if np.isnan(gain_interpolated).all():
-                # Handle case where all interpolated values are NaN
-                healpix_gain[i] = np.nan
-                print("somethings wrong here")
-            else:
-                # Use np.where to find closest index in grid_points
-                distances = np.linalg.norm(grid_points - query_point, axis=1)
-                closest_index = np.argmin(distances)
-                healpix_gain[i] = gain_interpolated[closest_index]
-            # healpix_gain[i] = 10* np.log10(gain_interpolated[i]) #index accesses the index of the query point (third argument)
-            # healpix_gain[i] = gain_interpolated[i]
-        # Aggregate gains to HEALPix pixels
-        # pixel_indices = hp.ang2pix(self.nside, theta_mesh.ravel(), phi_mesh.ravel())
-        # for i, pixel_index in enumerate(pixel_indices):
-        #    healpix_gain[pixel_index] += gain_interpolated.ravel()[i]
+        Create HEALPix object for antenna gain with interpolation. The pixel centers are interpolated in pixel order, so
+        the interpolated gains are the map.
         """
-        # return gain_interpolated
-        return healpix_gain
+        return self.interpolate_pixels(azimuth, elevation, gain_dB, method=method)
+
+    def create_partial_healpix_object(self, azimuth, elevation, gain_dB, method='linear') -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolate antenna gain data at the pixels that can hold a gain only. Linear and cubic interpolation are 0 outside
+        the convex hull of the measured points, so only the pixels in the band of zenith angles the points span are
+        interpolated. Returns the sorted pixels and their gains.
+        """
+        if method == 'nearest':
+            pixels = np.arange(hp.nside2npix(self.nside))
+        else:
+            theta = np.radians(elevation)
+            pixels = np.sort(hp.query_strip(self.nside, np.min(theta), np.max(theta), inclusive=True))
+        return pixels, self.interpolate_pixels(azimuth, elevation, gain_dB, method=method, pixels=pixels)
+
+    @staticmethod
+    def _interpolator(points, values, method: str):
+        if method == 'nearest':
+            return NearestNDInterpolator(np.column_stack(points), values, rescale=False)
+        if method == 'linear':
+            return LinearNDInterpolator(np.column_stack(points), values, fill_value=0.0, rescale=False)
+        if method == 'cubic':
+            return CloughTocher2DInterpolator(np.column_stack(points), values, fill_value=0.0, rescale=False)
+        raise ValueError(f'Unknown interpolation method {method!r}.')
 
 
 class HealpixGainPattern:
-    def __init__(self, healpix_gain: np.ndarray):
+    '''
+    The HealpixGainPattern looks up antenna gains in a RING ordered HEALPix map. The nside is taken from the length of the
+    map unless it is given.
+
+    A partial-sky map stores only the pixels in pixels, sorted, with their gains in healpix_gain, and every other pixel has
+    fill_value. to_partial_sky() drops the pixels of a full map that hold fill_value, so a pattern that only covers part of
+    the sphere only costs memory for that part. Storing the map as float32 halves it again.
+
+    save() writes the map to a directory as .npy files and load() maps them back read-only with mmap_mode='r', so every
+    process that loads or unpickles the same pattern shares one physical copy of it through the page cache. Pickling a
+    loaded pattern only sends the directory.
+    '''
+    def __init__(
+        self,
+        healpix_gain: np.ndarray,
+        nside: Optional[int] = None,
+        pixels: Optional[np.ndarray] = None,
+        fill_value: float = 0.0
+    ):
+        if nside is None and pixels is not None:
+            raise ValueError('nside must be given for a partial-sky map.')
         self.healpix_gain = healpix_gain
-        self.nside = 2048
+        self.nside = hp.npix2nside(len(healpix_gain)) if nside is None else nside
+        self.pixels = pixels
+        self.fill_value = fill_value
+        self._directory = None
+        self._mmap_mode = None
 
     def get_gain(self, theta: float, phi: float) -> float:
         """
         Get gain at specific spherical coordinates (theta, phi).
         """
-        npix = hp.nside2npix(self.nside)
-        #pixel_index = hp.ang2pix(self.nside, np.radians(90-theta), np.radians(phi))
-        pixel_index = hp.ang2pix(self.nside, np.radians(theta), np.radians(phi))
-        return self.healpix_gain[pixel_index]
+        return self.get_gains(np.array([theta], dtype=float), np.array([phi], dtype=float))[0]
+
+    def get_gains(self, theta: np.ndarray, phi: np.ndarray) -> np.ndarray:
+        """
+        Get the gains at arrays of spherical coordinates (theta, phi) in degrees.
+        """
+        pixel_indices = hp.ang2pix(self.nside, np.radians(theta), np.radians(phi))
+        if self.pixels is None:
+            return self.healpix_gain[pixel_indices]
+        if not len(self.pixels):
+            return np.full(np.shape(pixel_indices), self.fill_value, dtype=self.healpix_gain.dtype)
+
+        positions = np.minimum(np.searchsorted(self.pixels, pixel_indices), len(self.pixels) - 1)
+        return np.where(self.pixels[positions] == pixel_indices, self.healpix_gain[positions], self.fill_value)
+
+    @property
+    def is_partial_sky(self) -> bool:
+        return self.pixels is not None
+
+    def to_partial_sky(self) -> 'HealpixGainPattern':
+        if self.is_partial_sky:
+            return self
+        pixels = np.flatnonzero(self.healpix_gain != self.fill_value)
+        return HealpixGainPattern(self.healpix_gain[pixels], nside=self.nside, pixels=pixels, fill_value=self.fill_value)
+
+    def astype(self, dtype) -> 'HealpixGainPattern':
+        return HealpixGainPattern(np.asarray(self.healpix_gain, dtype=dtype), nside=self.nside, pixels=self.pixels,
+                                  fill_value=self.fill_value)
+
+    def save(self, directory: Path):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / HEALPIX_GAIN_FILE_NAME, np.ascontiguousarray(self.healpix_gain))
+        if self.is_partial_sky:
+            np.save(directory / HEALPIX_PIXELS_FILE_NAME, np.ascontiguousarray(self.pixels, dtype=np.int64))
+        (directory / HEALPIX_METADATA_FILE_NAME).write_text(json.dumps({
+            'nside': int(self.nside),
+            'fill_value': float(self.fill_value),
+        }))
+
+    @classmethod
+    def load(cls, directory: Path, mmap_mode: Optional[str] = 'r') -> 'HealpixGainPattern':
+        directory = Path(directory)
+        metadata = json.loads((directory / HEALPIX_METADATA_FILE_NAME).read_text())
+        pixels_path = directory / HEALPIX_PIXELS_FILE_NAME
+        pattern = cls(
+            np.load(directory / HEALPIX_GAIN_FILE_NAME, mmap_mode=mmap_mode),
+            nside=metadata['nside'],
+            pixels=np.load(pixels_path, mmap_mode=mmap_mode) if pixels_path.exists() else None,
+            fill_value=metadata['fill_value']
+        )
+        pattern._directory = directory
+        pattern._mmap_mode = mmap_mode
+        return pattern
+
+    def __getstate__(self):
+        if self._directory is not None and self._mmap_mode is not None:
+            return {'_directory': self._directory, '_mmap_mode': self._mmap_mode}
+        return self.__dict__.copy()
+
+    def __setstate__(self, state):
+        if 'healpix_gain' in state:
+            self.__dict__.update(state)
+        else:
+            self.__dict__.update(HealpixGainPattern.load(state['_directory'], mmap_mode=state['_mmap_mode']).__dict__)
     
 """
 # Example usage IF the data is already in Healpix format
@@ -1,5 +1,5 @@
 from functools import cached_property
-from typing import List, Type
+from typing import List, Optional, Type
 from datetime import timedelta
 
 import matplotlib.pyplot as plt
@@ -20,6 +20,8 @@ from sopp.custom_dataclasses.power_window import PowerWindow
 
 from sopp.power_summer import sum_power
 from sopp.custom_dataclasses.power_array import PowerArray
+from sopp.custom_dataclasses.power_contributions import PowerContributions
+from sopp.custom_dataclasses.power_statistics import PowerStatistics
 
 
 class PowerSopp:
@@ -40,6 +42,12 @@ class PowerSopp:
     def get_power_from_sats(self) -> PowerArray:
         return self._event_finder.get_satellite_power()
 
+    def get_power_contributions(self) -> Optional[PowerContributions]:
+        return self._event_finder.power_contributions
+
+    def get_power_statistics(self) -> PowerStatistics:
+        return self._event_finder.get_power_statistics()
+
     @cached_property
     def _event_finder(self) -> EventFinder:
         self._validate_configuration()
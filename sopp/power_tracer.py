@@ -0,0 +1,82 @@
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional
+
+LOGGER = logging.getLogger('sopp.power')
+
+
+@dataclass(frozen=True)
+class TraceEvent:
+    '''
+    One sampled record of the power tracer.
+
+      + stage:      name of the step that recorded it, for example 'link_budget.received_power'.
+      + count:      how many items the stage has recorded so far, this record included.
+      + fields:     the values passed by the stage, scalars for single samples and arrays for batches of samples.
+    '''
+    stage: str
+    count: int
+    fields: Dict[str, Any] = field(default_factory=dict)
+
+
+def log_trace_event(trace_event: TraceEvent):
+    LOGGER.debug('%s #%d %s', trace_event.stage, trace_event.count, trace_event.fields)
+
+
+class PowerTracer:
+    '''
+    The PowerTracer is how the power calculations report what they do, in place of printing every sample. It is disabled by
+    default, and the stages check enabled before building any record, so a production run pays a single attribute lookup
+    per call and no string formatting or I/O.
+
+    When enabled, every record() adds its count to a per-stage counter, and every sample_every-th item of a stage is sent
+    to the callback as a TraceEvent. The default callback logs the event at DEBUG level to the 'sopp.power' logger. Stages
+    that record a batch of samples at once pass the number of samples as count and emit at most one event per batch.
+
+    Counters are kept per process, so the counts of worker processes are not added to those of the parent.
+    '''
+    def __init__(self):
+        self.enabled = False
+        self.sample_every = 1
+        self.counters: Counter = Counter()
+        self._callback: Callable[[TraceEvent], None] = log_trace_event
+        self._lock = threading.Lock()
+
+    def enable(self, callback: Optional[Callable[[TraceEvent], None]] = None, sample_every: int = 1):
+        if sample_every < 1:
+            raise ValueError(f'sample_every must be at least 1, provided: {sample_every}')
+        self._callback = callback or log_trace_event
+        self.sample_every = sample_every
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+
+    @contextmanager
+    def tracing(self, callback: Optional[Callable[[TraceEvent], None]] = None, sample_every: int = 1) -> Iterator['PowerTracer']:
+        previous_settings = (self.enabled, self._callback, self.sample_every)
+        self.enable(callback=callback, sample_every=sample_every)
+        try:
+            yield self
+        finally:
+            self.enabled, self._callback, self.sample_every = previous_settings
+
+    def record(self, stage: str, count: int = 1, **fields):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            previous_count = self.counters[stage]
+            self.counters[stage] = previous_count + count
+        if (previous_count + count) // self.sample_every > previous_count // self.sample_every:
+            self._callback(TraceEvent(stage=stage, count=previous_count + count, fields=fields))
+
+
+POWER_TRACER = PowerTracer()
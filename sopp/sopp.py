@@ -1,10 +1,12 @@
 from functools import cached_property
-from typing import List, Type
+from typing import Iterator, List, Type
 from datetime import timedelta
 
 from sopp.event_finder.event_finder import EventFinder
 from sopp.event_finder.event_finder_rhodesmill.event_finder_rhodesmill import EventFinderRhodesmill
+from sopp.event_finder.event_finder_rhodesmill.support.worker_pool import WorkerPool
 from sopp.custom_dataclasses.configuration import Configuration
+from sopp.custom_dataclasses.interference_report import InterferenceReport
 from sopp.custom_dataclasses.overhead_window import OverheadWindow
 from sopp.custom_dataclasses.satellite.satellite import Satellite
 from sopp.custom_dataclasses.runtime_settings import RuntimeSettings
@@ -14,6 +16,14 @@ from sopp.custom_dataclasses.time_window import TimeWindow
 
 
 class Sopp:
+    '''
+    Sopp owns a WorkerPool that is shared by every query. Its worker processes start on the first query and receive the
+    event finder, with the reservation, time grid and catalog, once. Later queries reuse them. Call close(), or use Sopp as
+    a context manager, to stop the workers.
+
+    The iter_ queries yield OverheadWindows as soon as each satellite is finished instead of returning them all at the
+    end. Closing the generator before it is exhausted cancels the satellites that are still being processed.
+    '''
     def __init__(
         self,
         configuration: Configuration,
@@ -21,6 +31,7 @@ class Sopp:
     ):
         self._configuration = configuration
         self._event_finder_class = event_finder_class
+        self._worker_pool = WorkerPool(processes=configuration.runtime_settings.concurrency_level)
 
     def get_satellites_above_horizon(self) -> List[OverheadWindow]:
         return self._event_finder.get_satellites_above_horizon()
@@ -28,14 +39,36 @@ class Sopp:
     def get_satellites_crossing_main_beam(self) -> List[OverheadWindow]:
         return self._event_finder.get_satellites_crossing_main_beam()
 
+    def iter_satellites_above_horizon(self) -> Iterator[OverheadWindow]:
+        yield from self._event_finder.iter_satellites_above_horizon()
+
+    def iter_satellites_crossing_main_beam(self) -> Iterator[OverheadWindow]:
+        yield from self._event_finder.iter_satellites_crossing_main_beam()
+
+    def get_interference_report(self) -> InterferenceReport:
+        return self._event_finder.get_interference_report()
+
+    def close(self):
+        self._worker_pool.close()
+
+    def __enter__(self) -> 'Sopp':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     @cached_property
     def _event_finder(self) -> EventFinder:
         self._validate_configuration()
+        worker_pool_arguments = (
+            {'worker_pool': self._worker_pool} if issubclass(self._event_finder_class, EventFinderRhodesmill) else {}
+        )
         return self._event_finder_class(
             list_of_satellites=self._configuration.satellites,
             reservation=self._configuration.reservation,
             antenna_direction_path=self._configuration.antenna_direction_path,
             runtime_settings=self._configuration.runtime_settings,
+            **worker_pool_arguments
         )
 
     def _validate_configuration(self):
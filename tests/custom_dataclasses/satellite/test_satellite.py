@@ -1,8 +1,11 @@
+import pickle
+
 import pytest
 
 from sopp.custom_dataclasses.satellite.satellite import Satellite
 from sopp.custom_dataclasses.satellite.mean_motion import MeanMotion
 from sopp.custom_dataclasses.satellite.tle_information import TleInformation
+from tests.custom_dataclasses.satellite.utilities import expected_international_space_station_tle_as_satellite_cu
 
 
 class TestSatellite:
@@ -12,6 +15,29 @@ class TestSatellite:
         sat0.tle_information.mean_motion = MeanMotion(0, 0, radians_per_minute)
         assert sat0.orbits_per_day == pytest.approx(1.0, rel=.01)
 
+    def test_to_rhodesmill_is_memoized(self):
+        satellite = self.iss
+        assert satellite.to_rhodesmill() is satellite.to_rhodesmill()
+
+    def test_to_rhodesmill_is_rebuilt_when_tle_changes(self):
+        satellite = self.iss
+        original = satellite.to_rhodesmill()
+        satellite.tle_information.mean_motion = MeanMotion(0, 0, 0.06)
+        rebuilt = satellite.to_rhodesmill()
+        assert rebuilt is not original
+        assert rebuilt.model.no_kozai == pytest.approx(0.06)
+
+    def test_satellite_with_cached_rhodesmill_can_be_pickled(self):
+        satellite = self.iss
+        satellite.to_rhodesmill()
+        unpickled = pickle.loads(pickle.dumps(satellite))
+        assert unpickled.tle_information == satellite.tle_information
+        assert unpickled.to_rhodesmill().model.satnum == satellite.to_rhodesmill().model.satnum
+
+    @property
+    def iss(self):
+        return expected_international_space_station_tle_as_satellite_cu()
+
     @property
     def sat0(self):
         sat0 = Satellite(name='TestSatellite0')
@@ -0,0 +1,60 @@
+import pickle
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from sopp.custom_dataclasses.overhead_window import OverheadWindow
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_arrays import PositionArrays
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+
+ARBITRARY_START = datetime(year=2023, month=6, day=7, tzinfo=timezone.utc)
+ARBITRARY_TIMES = [ARBITRARY_START + timedelta(seconds=i) for i in range(10)]
+ARBITRARY_POSITION_ARRAYS = PositionArrays(
+    altitude=np.arange(10, dtype=float),
+    azimuth=np.arange(10, dtype=float) * 2,
+    distance_km=np.arange(10, dtype=float) * 3,
+    times=ARBITRARY_TIMES
+)
+
+
+class TestOverheadWindow:
+    def test_positions_are_built_from_position_arrays_when_accessed(self):
+        overhead_window = OverheadWindow(satellite=Satellite(name='name'), position_arrays=ARBITRARY_POSITION_ARRAYS.time_slice(2, 5))
+
+        assert overhead_window._positions is None
+        assert overhead_window.positions == [
+            PositionTime(position=Position(altitude=i, azimuth=2 * i, distance_km=3 * i), time=ARBITRARY_TIMES[i])
+            for i in range(2, 5)
+        ]
+
+    def test_overhead_time_does_not_build_positions(self):
+        overhead_window = OverheadWindow(satellite=Satellite(name='name'), position_arrays=ARBITRARY_POSITION_ARRAYS.time_slice(2, 5))
+
+        assert overhead_window.overhead_time.begin == ARBITRARY_TIMES[2]
+        assert overhead_window.overhead_time.end == ARBITRARY_TIMES[4]
+        assert overhead_window._positions is None
+
+    def test_only_position_arrays_are_pickled(self):
+        overhead_window = OverheadWindow(satellite=Satellite(name='name'), position_arrays=ARBITRARY_POSITION_ARRAYS.time_slice(2, 5))
+        overhead_window.positions
+
+        unpickled_overhead_window = pickle.loads(pickle.dumps(overhead_window))
+
+        assert unpickled_overhead_window._positions is None
+        assert unpickled_overhead_window.positions == overhead_window.positions
+
+    def test_position_lists_are_sorted_by_time(self):
+        positions = [PositionTime(position=Position(altitude=0, azimuth=0), time=time) for time in reversed(ARBITRARY_TIMES)]
+
+        assert OverheadWindow(satellite=Satellite(name='name'), positions=positions).positions[0].time == ARBITRARY_TIMES[0]
+
+    def test_windows_compare_and_print_by_their_positions(self):
+        satellite = Satellite(name='name')
+        array_window = OverheadWindow(satellite=satellite, position_arrays=ARBITRARY_POSITION_ARRAYS.time_slice(2, 5))
+        list_window = OverheadWindow(satellite=satellite, positions=ARBITRARY_POSITION_ARRAYS.time_slice(2, 5).to_position_times())
+
+        assert array_window == list_window
+        assert array_window != OverheadWindow(satellite=satellite, positions=list_window.positions[:1])
+        assert repr(array_window) == repr(list_window)
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from sopp.custom_dataclasses.power_array import PowerArray
+from sopp.custom_dataclasses.time_window import TimeWindow
+
+ARBITRARY_BEGIN = datetime(2023, 3, 30, 12, tzinfo=timezone.utc)
+
+
+class TestPowerArray:
+    def test_length_covers_the_time_window(self):
+        time_window = TimeWindow(begin=ARBITRARY_BEGIN, end=ARBITRARY_BEGIN + timedelta(minutes=2))
+
+        assert PowerArray.for_time_window(time_window).length == 121
+        assert PowerArray.for_time_window(time_window, bin_width=timedelta(seconds=10)).length == 13
+        assert PowerArray.for_time_window(time_window, bin_width=timedelta(milliseconds=500)).length == 241
+
+    def test_samples_at_the_bin_width_fill_consecutive_bins(self):
+        power_array = PowerArray(6, begin=ARBITRARY_BEGIN, bin_width=timedelta(seconds=10))
+        timestamps = ARBITRARY_BEGIN.timestamp() + np.arange(0, 60, 10, dtype=float)
+
+        power_array.add_powers_at(timestamps, np.ones(6))
+
+        assert power_array.array.tolist() == [1.] * 6
+
+    def test_sub_second_bins(self):
+        power_array = PowerArray(4, begin=ARBITRARY_BEGIN, bin_width=timedelta(milliseconds=500))
+
+        power_array.add_power_at(ARBITRARY_BEGIN + timedelta(seconds=1.5), 2.)
+        power_array.add_power_at(ARBITRARY_BEGIN + timedelta(seconds=0.7), 1.)
+
+        assert power_array.array.tolist() == [0., 1., 0., 2.]
+        assert power_array.time_of(3) == ARBITRARY_BEGIN + timedelta(seconds=1.5)
+
+    def test_time_indexing_requires_a_begin_time(self):
+        with pytest.raises(ValueError):
+            PowerArray(3).add_power_at(ARBITRARY_BEGIN, 1.)
+
+    def test_summary_keeps_maximum_and_mean_per_coarse_bin(self):
+        power_array = PowerArray(150, begin=ARBITRARY_BEGIN)
+        power_array.add_powers(np.arange(150), np.arange(150, dtype=float))
+
+        summary = power_array.summary(timedelta(minutes=1))
+
+        assert summary.bin_width == timedelta(minutes=1)
+        assert summary.maximum.tolist() == [59., 119., 149.]
+        assert summary.mean.tolist() == [29.5, 89.5, 134.5]
+
+    def test_summary_with_a_bin_width_that_does_not_divide_evenly(self):
+        power_array = PowerArray(10, bin_width=timedelta(seconds=7))
+        power_array.add_powers(np.arange(10), np.arange(10, dtype=float))
+
+        assert power_array.summary(timedelta(minutes=1)).maximum.tolist() == [8., 9.]
+
+    def test_summary_is_recomputed_after_adding_power(self):
+        power_array = PowerArray(120)
+        assert power_array.summary(timedelta(minutes=1)).maximum.tolist() == [0., 0.]
+
+        power_array.add_power(70, 3.)
+
+        assert power_array.summary(timedelta(minutes=1)).maximum.tolist() == [0., 3.]
+
+    def test_default_summaries_are_per_minute_and_per_hour(self):
+        summaries = PowerArray(7201).summaries()
+
+        assert [(summary.bin_width, len(summary)) for summary in summaries] == [
+            (timedelta(minutes=1), 121), (timedelta(hours=1), 3)
+        ]
+
+    def test_summary_finer_than_the_bins_is_rejected(self):
+        with pytest.raises(ValueError):
+            PowerArray(10, bin_width=timedelta(minutes=1)).summary(timedelta(seconds=1))
+
+    def test_power_arrays_on_different_time_axes_are_not_added(self):
+        with pytest.raises(ValueError):
+            PowerArray(3, begin=ARBITRARY_BEGIN).add_power_array(PowerArray(3))
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from sopp.custom_dataclasses.power_array import PowerArray
+from sopp.custom_dataclasses.power_contributions import PowerContribution, PowerContributions
+from sopp.custom_dataclasses.time_window import TimeWindow
+
+ARBITRARY_BEGIN = datetime(2023, 3, 30, 12, tzinfo=timezone.utc)
+
+
+class TestPowerContributions:
+    def test_only_in_view_samples_are_stored(self):
+        power_contributions = self._power_contributions
+
+        assert power_contributions.matrix.shape == (3, 100)
+        assert power_contributions.matrix.nnz == 5
+
+    def test_energy_per_satellite(self):
+        assert self._power_contributions.energy_per_satellite().tolist() == [6., 0., 20.]
+
+    def test_top_contributors_in_a_time_window(self):
+        time_window = TimeWindow(begin=ARBITRARY_BEGIN + timedelta(seconds=45), end=ARBITRARY_BEGIN + timedelta(seconds=90))
+
+        assert self._power_contributions.top_contributors(k=5, time_window=time_window) == [
+            PowerContribution(satellite_index=0, satellite_name='first', energy=5.),
+            PowerContribution(satellite_index=2, satellite_name='third', energy=5.),
+        ]
+
+    def test_top_contributors_are_limited_to_k(self):
+        assert [contribution.satellite_name for contribution in self._power_contributions.top_contributors(k=1)] == ['third']
+
+    def test_power_of_a_satellite(self):
+        power = self._power_contributions.power_of(0)
+
+        assert power[[10, 50]].tolist() == [1., 5.]
+        assert power.sum() == 6.
+
+    def test_summed_contributions_match_the_power_array(self):
+        power_array = PowerArray(100, begin=ARBITRARY_BEGIN)
+        power_array.add_powers(np.array([10, 50, 50, 55, 90]), np.array([1., 5., 2., 3., 15.]))
+
+        assert self._power_contributions.to_power_array().array.tolist() == power_array.array.tolist()
+
+    def test_extended_contributions_are_added(self):
+        power_contributions = self._power_contributions
+        power_contributions.matrix
+        other_power_contributions = self._power_contributions
+
+        power_contributions.extend(other_power_contributions)
+
+        assert power_contributions.energy_per_satellite().tolist() == [12., 0., 40.]
+
+    def test_contributions_on_different_time_axes_are_not_extended(self):
+        with pytest.raises(ValueError):
+            self._power_contributions.extend(PowerContributions(['first', 'second', 'third'], length=100))
+
+    def test_indices_out_of_range_are_rejected(self):
+        with pytest.raises(IndexError):
+            self._power_contributions.add(0, np.array([100]), np.array([1.]))
+
+    @property
+    def _power_contributions(self) -> PowerContributions:
+        power_contributions = PowerContributions(['first', 'second', 'third'], length=100, begin=ARBITRARY_BEGIN)
+        power_contributions.add(0, np.array([10, 50]), np.array([1., 5.]))
+        power_contributions.add(2, np.array([50, 55, 90]), np.array([2., 3., 15.]))
+        return power_contributions
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from sopp.custom_dataclasses.power_statistics import PowerStatistics
+
+
+class TestPowerStatistics:
+    def test_exact_peak_mean_and_count(self):
+        power_statistics = PowerStatistics()
+        power_statistics.update(self._powers[:500])
+        power_statistics.update(self._powers[500:])
+
+        assert power_statistics.count == len(self._powers)
+        assert power_statistics.peak == self._powers.max()
+        assert power_statistics.mean == pytest.approx(self._powers.mean())
+
+    @pytest.mark.parametrize('q', [0.1, 0.5, 0.9, 0.99, 1.0])
+    def test_quantiles_are_within_the_resolution(self, q):
+        power_statistics = PowerStatistics(resolution_db=0.01)
+        power_statistics.update(self._powers)
+
+        expected_quantile = np.quantile(self._powers, q, method='inverted_cdf')
+        assert 10 * np.log10(power_statistics.quantile(q)) == pytest.approx(10 * np.log10(expected_quantile), abs=0.01)
+
+    def test_quantiles_of_zero_power_bins(self):
+        power_statistics = PowerStatistics()
+        power_statistics.update(np.zeros(90))
+        power_statistics.update(np.full(10, 1e-12))
+
+        assert power_statistics.quantiles([0.5, 0.9, 0.95]) == [0.0, 0.0, pytest.approx(1e-12)]
+
+    def test_exceedance_fraction_is_within_one_bin(self):
+        power_statistics = PowerStatistics()
+        power_statistics.update(self._powers)
+        threshold = np.median(self._powers)
+
+        assert power_statistics.exceedance_fraction(threshold) == pytest.approx(0.5, abs=0.01)
+        assert power_statistics.exceedance_fraction(0.0) == 1.0
+        assert power_statistics.exceedance_fraction(self._powers.max()) == 0.0
+
+    def test_exceedance_duration(self):
+        power_statistics = PowerStatistics(bin_width=timedelta(seconds=10))
+        power_statistics.update([0.0, 0.0, 1e-10, 1e-10])
+
+        assert power_statistics.exceedance_duration(1e-11) == timedelta(seconds=20)
+
+    def test_merged_statistics_match_a_single_accumulator(self):
+        whole_power_statistics = PowerStatistics()
+        whole_power_statistics.update(self._powers)
+        first_power_statistics, second_power_statistics = PowerStatistics(), PowerStatistics()
+        first_power_statistics.update(self._powers[:300])
+        second_power_statistics.update(self._powers[300:])
+
+        first_power_statistics.merge(second_power_statistics)
+
+        assert first_power_statistics.counts.tolist() == whole_power_statistics.counts.tolist()
+        assert first_power_statistics.quantile(0.5) == whole_power_statistics.quantile(0.5)
+
+    def test_statistics_with_different_bins_are_not_merged(self):
+        with pytest.raises(ValueError):
+            PowerStatistics().merge(PowerStatistics(resolution_db=0.1))
+
+    def test_quantile_must_be_a_fraction(self):
+        with pytest.raises(ValueError):
+            PowerStatistics().quantile(1.5)
+
+    @property
+    def _powers(self) -> np.ndarray:
+        return 10 ** np.random.default_rng(0).uniform(-16, -10, 1000)
@@ -0,0 +1,47 @@
+import pickle
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from skyfield.api import load
+
+from sopp.custom_dataclasses.time_grid import TimeGrid
+
+ARBITRARY_START = datetime(year=2023, month=6, day=7, hour=1, minute=2, second=3, microsecond=500000, tzinfo=timezone.utc)
+ARBITRARY_DATETIMES = [ARBITRARY_START + timedelta(seconds=i) for i in range(10)]
+
+
+class TestTimeGrid:
+    def test_behaves_like_a_list_of_datetimes(self):
+        time_grid = TimeGrid.from_datetimes(ARBITRARY_DATETIMES)
+
+        assert len(time_grid) == len(ARBITRARY_DATETIMES)
+        assert list(time_grid) == ARBITRARY_DATETIMES
+        assert time_grid[3] == ARBITRARY_DATETIMES[3]
+
+    def test_indexing_with_indices_returns_a_time_grid(self):
+        time_grid = TimeGrid.from_datetimes(ARBITRARY_DATETIMES)[np.array([1, 4])]
+
+        assert isinstance(time_grid, TimeGrid)
+        assert list(time_grid) == [ARBITRARY_DATETIMES[1], ARBITRARY_DATETIMES[4]]
+
+    def test_timestamps(self):
+        time_grid = TimeGrid.from_datetimes(ARBITRARY_DATETIMES)
+
+        assert np.array_equal(time_grid.timestamps, [time.timestamp() for time in ARBITRARY_DATETIMES])
+
+    def test_timescale_matches_datetimes(self):
+        timescale = load.timescale()
+        time = TimeGrid.from_datetimes(ARBITRARY_DATETIMES).to_timescale(timescale)
+        expected_time = timescale.from_datetimes(ARBITRARY_DATETIMES)
+
+        assert np.array_equal(time.whole, expected_time.whole)
+        assert np.allclose(time.tai_fraction, expected_time.tai_fraction, rtol=0, atol=1e-12)
+
+    def test_datetimes_are_not_pickled(self):
+        time_grid = TimeGrid.from_datetimes(ARBITRARY_DATETIMES)
+        time_grid.datetimes
+
+        unpickled_time_grid = pickle.loads(pickle.dumps(time_grid))
+
+        assert 'datetimes' not in vars(unpickled_time_grid)
+        assert list(unpickled_time_grid) == ARBITRARY_DATETIMES
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.time_grid import TimeGrid
+from sopp.custom_dataclasses.time_window import TimeWindow
+from sopp.event_finder.event_finder_rhodesmill.support.antenna_direction_pairing import AntennaDirectionPairing
+
+ARBITRARY_START = datetime(2023, 3, 30, 12, tzinfo=timezone.utc)
+
+
+class TestAntennaDirectionPairing:
+    def test_samples_are_paired_with_the_last_antenna_direction_started(self):
+        pairing = self._pairing()
+
+        assert pairing.pair(TimeGrid(begin=ARBITRARY_START, seconds=np.arange(6, dtype=float))).tolist() == [0, 0, 1, 1, 1, 1]
+        assert pairing.altitudes.tolist() == [10.0, 20.0]
+
+    def test_samples_outside_the_time_window_or_before_the_path_are_unpaired(self):
+        datetimes = [ARBITRARY_START - timedelta(seconds=1), ARBITRARY_START + timedelta(seconds=3),
+                     ARBITRARY_START + timedelta(seconds=10)]
+
+        assert self._pairing().pair(datetimes).tolist() == [-1, 1, -1]
+
+    @staticmethod
+    def _pairing() -> AntennaDirectionPairing:
+        return AntennaDirectionPairing(
+            antenna_direction_path=[
+                PositionTime(position=Position(altitude=20, azimuth=0), time=ARBITRARY_START + timedelta(seconds=2)),
+                PositionTime(position=Position(altitude=10, azimuth=0), time=ARBITRARY_START),
+            ],
+            time_window=TimeWindow(begin=ARBITRARY_START - timedelta(seconds=5), end=ARBITRARY_START + timedelta(seconds=10))
+        )
@@ -0,0 +1,99 @@
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from sopp.custom_dataclasses.antenna import Antenna
+from sopp.custom_dataclasses.coordinates import Coordinates
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.reservation import Reservation
+from sopp.custom_dataclasses.runtime_settings import RuntimeSettings
+from sopp.custom_dataclasses.time_window import TimeWindow
+from sopp.event_finder.event_finder_rhodesmill.event_finder_rhodesmill import EventFinderRhodesmill
+from sopp.event_finder.event_finder_rhodesmill.support.coarse_to_fine_time_refiner import CoarseToFineTimeRefiner
+from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.satellite_positions_with_respect_to_facility_retriever_rhodesmill import \
+    SatellitePositionsWithRespectToFacilityRetrieverRhodesmill
+from tests.custom_dataclasses.satellite.utilities import expected_international_space_station_tle_as_satellite_cu
+
+ARBITRARY_FACILITY = Facility(Coordinates(latitude=40.8, longitude=-121.4), elevation=986, antenna=Antenna(gain_pattern=5.0))
+ARBITRARY_START = datetime(year=2023, month=6, day=7, tzinfo=timezone.utc)
+
+
+class TestCoarseToFineTimeRefiner:
+    def test_coarse_grid_includes_last_sample(self):
+        refiner = self._refiner(number_of_samples=25, coarse_step_count=10)
+        assert refiner.coarse_indices.tolist() == [0, 10, 20, 24]
+
+    def test_intervals_far_below_horizon_are_skipped(self):
+        refiner = self._refiner(number_of_samples=31, coarse_step_count=10)
+        refined_indices = refiner.refine(
+            satellite=self._satellite,
+            coarse_altitudes=np.array([-80, -80, 10, -80]),
+            lowest_altitude_in_view=0
+        )
+        assert refined_indices.tolist() == list(range(10, 31))
+
+    def test_nan_altitudes_are_refined(self):
+        refiner = self._refiner(number_of_samples=21, coarse_step_count=10)
+        refined_indices = refiner.refine(satellite=self._satellite, coarse_altitudes=np.array([-80, np.nan, -80]),
+                                         lowest_altitude_in_view=0)
+        assert refined_indices.tolist() == list(range(21))
+
+    def test_adaptive_event_finder_matches_dense_run(self):
+        reservation = Reservation(
+            facility=ARBITRARY_FACILITY,
+            time=TimeWindow(begin=ARBITRARY_START, end=ARBITRARY_START + timedelta(hours=3))
+        )
+        antenna_direction_path = [PositionTime(position=Position(altitude=20, azimuth=100), time=ARBITRARY_START)]
+        dense_run, adaptive_run = [
+            EventFinderRhodesmill(
+                antenna_direction_path=antenna_direction_path,
+                list_of_satellites=[self._satellite],
+                reservation=reservation,
+                runtime_settings=RuntimeSettings(time_continuity_resolution=10, coarse_time_resolution=coarse_time_resolution)
+            ).get_satellites_above_horizon()
+            for coarse_time_resolution in (None, 120)
+        ]
+
+        assert dense_run
+        assert [window.positions for window in adaptive_run] == [window.positions for window in dense_run]
+
+    def test_adaptive_event_finder_reads_refined_samples_from_the_ephemeris_cache(self, tmp_path, monkeypatch):
+        dense_run = self._run(RuntimeSettings(time_continuity_resolution=10, ephemeris_cache_directory=tmp_path))
+
+        def propagate_refined_samples(*args, **kwargs):
+            raise AssertionError('refined samples should be read from the ephemeris cache')
+
+        monkeypatch.setattr(SatellitePositionsWithRespectToFacilityRetrieverRhodesmill, 'run_indices', propagate_refined_samples)
+        adaptive_run = self._run(
+            RuntimeSettings(time_continuity_resolution=10, coarse_time_resolution=120, ephemeris_cache_directory=tmp_path)
+        )
+
+        assert dense_run
+        assert [window.positions for window in adaptive_run] == [window.positions for window in dense_run]
+
+    def _run(self, runtime_settings: RuntimeSettings):
+        return EventFinderRhodesmill(
+            antenna_direction_path=[PositionTime(position=Position(altitude=20, azimuth=100), time=ARBITRARY_START)],
+            list_of_satellites=[self._satellite],
+            reservation=Reservation(
+                facility=ARBITRARY_FACILITY,
+                time=TimeWindow(begin=ARBITRARY_START, end=ARBITRARY_START + timedelta(hours=3))
+            ),
+            runtime_settings=runtime_settings
+        ).get_satellites_above_horizon()
+
+    @property
+    def _satellite(self):
+        return replace(expected_international_space_station_tle_as_satellite_cu(), antenna=Antenna(gain_pattern=5.0))
+
+    @staticmethod
+    def _refiner(number_of_samples: int, coarse_step_count: int) -> CoarseToFineTimeRefiner:
+        return CoarseToFineTimeRefiner(
+            facility=ARBITRARY_FACILITY,
+            datetimes=[ARBITRARY_START + timedelta(seconds=i) for i in range(number_of_samples)],
+            resolution=timedelta(seconds=1),
+            coarse_resolution=timedelta(seconds=coarse_step_count)
+        )
@@ -0,0 +1,173 @@
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import numpy as np
+
+from sopp.custom_dataclasses.antenna import Antenna
+from sopp.custom_dataclasses.coordinates import Coordinates
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.reservation import Reservation
+from sopp.custom_dataclasses.runtime_settings import RuntimeSettings
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_grid import TimeGrid
+from sopp.custom_dataclasses.time_window import TimeWindow
+from sopp.event_finder.event_finder_rhodesmill.event_finder_rhodesmill import EventFinderRhodesmill
+from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.ephemeris_cache import \
+    EphemerisCache, BYTES_PER_MEGABYTE
+from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.satellite_positions_with_respect_to_facility_retriever_cache import \
+    SatellitePositionsWithRespectToFacilityRetrieverCache
+from sopp.event_finder.event_finder_rhodesmill.support.satellites_interference_filter import SatellitesAboveHorizonFilter
+from tests.custom_dataclasses.satellite.utilities import expected_international_space_station_tle_as_satellite_cu
+
+ARBITRARY_FACILITY = Facility(Coordinates(latitude=0, longitude=0), antenna=Antenna(gain_pattern=5.0))
+ARBITRARY_DATETIMES = [datetime(year=2023, month=6, day=7, tzinfo=timezone.utc) + timedelta(seconds=i) for i in range(10)]
+
+
+class SatellitePositionsWithRespectToFacilityRetrieverCountingStub:
+    def __init__(self, facility, datetimes):
+        self._datetimes = datetimes
+        self.satellites_propagated = 0
+
+    def run(self, satellite: Satellite) -> List[PositionTime]:
+        self.satellites_propagated += 1
+        return [
+            PositionTime(position=Position(altitude=i, azimuth=2 * i, distance_km=3 * i), time=time)
+            for i, time in enumerate(self._datetimes)
+        ]
+
+
+class TestEphemerisCache:
+    def test_stored_positions_are_loaded_memory_mapped(self, tmp_path):
+        cache = EphemerisCache(directory=tmp_path)
+        positions = np.arange(30, dtype=np.float64).reshape(3, 10)
+        cache.store('key', positions)
+
+        loaded = cache.load('key')
+
+        assert isinstance(loaded, np.memmap)
+        assert np.array_equal(loaded, positions)
+
+    def test_missing_key_returns_none(self, tmp_path):
+        assert EphemerisCache(directory=tmp_path).load('missing') is None
+
+    def test_key_depends_on_facility_elevation(self):
+        satellite = expected_international_space_station_tle_as_satellite_cu()
+        time_grid_hash = EphemerisCache.hash_time_grid(ARBITRARY_DATETIMES)
+        higher_facility = replace(ARBITRARY_FACILITY, elevation=1000)
+        assert EphemerisCache.key(satellite, ARBITRARY_FACILITY, time_grid_hash) \
+               != EphemerisCache.key(satellite, higher_facility, time_grid_hash)
+
+    def test_time_grid_hash_depends_on_the_sample_times_only(self):
+        time_grid = TimeGrid(begin=ARBITRARY_DATETIMES[0] - timedelta(seconds=5), seconds=np.arange(5, 15, dtype=float))
+
+        assert EphemerisCache.hash_time_grid(time_grid) == EphemerisCache.hash_time_grid(ARBITRARY_DATETIMES)
+        assert EphemerisCache.hash_time_grid(time_grid) != EphemerisCache.hash_time_grid(ARBITRARY_DATETIMES[1:])
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        positions = np.zeros((3, 1000))
+        entry_size_mb = (positions.nbytes + 128) / BYTES_PER_MEGABYTE
+        cache = EphemerisCache(directory=tmp_path, max_size_mb=2.5 * entry_size_mb)
+
+        cache.store('first', positions)
+        cache.store('second', positions)
+        cache.load('first')
+        cache.store('third', positions)
+
+        assert cache.load('second') is None
+        assert cache.load('first') is not None
+        assert cache.load('third') is not None
+
+    def test_replacing_an_entry_does_not_count_its_size_twice(self, tmp_path):
+        positions = np.zeros((3, 1000))
+        entry_size_mb = (positions.nbytes + 128) / BYTES_PER_MEGABYTE
+        cache = EphemerisCache(directory=tmp_path, max_size_mb=2.5 * entry_size_mb)
+
+        cache.store('first', positions)
+        cache.store('second', positions)
+        cache.store('second', positions)
+
+        assert cache._size_bytes == sum(path.stat().st_size for path in tmp_path.iterdir())
+        assert cache.load('first') is not None
+
+
+class TestSatellitePositionsWithRespectToFacilityRetrieverCache:
+    def test_cached_satellites_are_not_propagated_again(self, tmp_path):
+        satellite = expected_international_space_station_tle_as_satellite_cu()
+        retriever = SatellitePositionsWithRespectToFacilityRetrieverCountingStub(ARBITRARY_FACILITY, ARBITRARY_DATETIMES)
+        first_run = self._cached_retriever(retriever, tmp_path).run(satellite)
+        second_run = self._cached_retriever(retriever, tmp_path).run(satellite)
+
+        assert retriever.satellites_propagated == 1
+        assert second_run == first_run
+
+    def test_run_all_only_propagates_missing_satellites(self, tmp_path):
+        satellite = expected_international_space_station_tle_as_satellite_cu()
+        other_satellite = replace(satellite, tle_information=replace(satellite.tle_information, satellite_number=1))
+        retriever = SatellitePositionsWithRespectToFacilityRetrieverCountingStub(ARBITRARY_FACILITY, ARBITRARY_DATETIMES)
+        self._cached_retriever(retriever, tmp_path).run(satellite)
+
+        positions = self._cached_retriever(retriever, tmp_path).run_all([satellite, other_satellite])
+
+        assert retriever.satellites_propagated == 2
+        assert [satellite_positions.altitude.shape for satellite_positions in positions] == [(len(ARBITRARY_DATETIMES),)] * 2
+        assert np.array_equal(positions[1].distance_km, 3 * np.arange(len(ARBITRARY_DATETIMES)))
+
+    def test_run_all_returns_memory_mapped_positions_on_a_hit(self, tmp_path):
+        satellite = expected_international_space_station_tle_as_satellite_cu()
+        retriever = SatellitePositionsWithRespectToFacilityRetrieverCountingStub(ARBITRARY_FACILITY, ARBITRARY_DATETIMES)
+        self._cached_retriever(retriever, tmp_path).run(satellite)
+
+        positions = self._cached_retriever(retriever, tmp_path).run_all([satellite])[0]
+
+        assert all(isinstance(array, np.memmap) for array in (positions.altitude, positions.azimuth, positions.distance_km))
+        assert np.array_equal(positions.azimuth, 2 * np.arange(len(ARBITRARY_DATETIMES)))
+
+    def test_cache_all_returns_keys_that_load_the_positions(self, tmp_path):
+        satellite = expected_international_space_station_tle_as_satellite_cu()
+        retriever = SatellitePositionsWithRespectToFacilityRetrieverCountingStub(ARBITRARY_FACILITY, ARBITRARY_DATETIMES)
+        keys = self._cached_retriever(retriever, tmp_path).cache_all([satellite])
+
+        positions = self._cached_retriever(retriever, tmp_path).load(keys[0])
+
+        assert retriever.satellites_propagated == 1
+        assert isinstance(positions.altitude, np.memmap)
+        assert np.array_equal(positions.altitude, np.arange(len(ARBITRARY_DATETIMES)))
+        assert self._cached_retriever(retriever, tmp_path).load('missing') is None
+
+    def test_event_finder_passes_cache_keys_to_workers(self, tmp_path):
+        satellite = replace(expected_international_space_station_tle_as_satellite_cu(), antenna=Antenna(gain_pattern=5.0))
+        reservation = Reservation(
+            facility=Facility(Coordinates(latitude=40.8, longitude=-121.4), elevation=986, antenna=Antenna(gain_pattern=5.0)),
+            time=TimeWindow(begin=ARBITRARY_DATETIMES[0], end=ARBITRARY_DATETIMES[0] + timedelta(hours=3))
+        )
+        cached_event_finder, event_finder = [
+            EventFinderRhodesmill(
+                antenna_direction_path=[PositionTime(position=Position(altitude=20, azimuth=100), time=ARBITRARY_DATETIMES[0])],
+                list_of_satellites=[satellite],
+                reservation=reservation,
+                runtime_settings=RuntimeSettings(time_continuity_resolution=10, ephemeris_cache_directory=ephemeris_cache_directory)
+            )
+            for ephemeris_cache_directory in (tmp_path, None)
+        ]
+        arguments = cached_event_finder._satellite_arguments(
+            [0], (SatellitesAboveHorizonFilter,), (0, len(cached_event_finder._time_grid))
+        )
+        cached_overhead_windows = cached_event_finder.get_satellites_above_horizon()
+
+        assert [type(argument) for argument in arguments[0]] == [int, tuple, tuple, type(None), str]
+        assert cached_overhead_windows
+        assert [window.positions for window in cached_overhead_windows] == [
+            window.positions for window in event_finder.get_satellites_above_horizon()
+        ]
+
+    @staticmethod
+    def _cached_retriever(retriever, directory) -> SatellitePositionsWithRespectToFacilityRetrieverCache:
+        return SatellitePositionsWithRespectToFacilityRetrieverCache(
+            facility=ARBITRARY_FACILITY,
+            datetimes=ARBITRARY_DATETIMES,
+            retriever=retriever,
+            cache=EphemerisCache(directory=directory)
+        )
@@ -0,0 +1,184 @@
+import math
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from sopp.custom_dataclasses.antenna import Antenna
+from sopp.custom_dataclasses.coordinates import Coordinates
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.power_array import PowerArray
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_grid import TimeGrid
+from sopp.event_finder.event_finder_rhodesmill.support.satellite_link_budget_angle_calc import \
+    SatelliteLinkBudgetAngleCalculator
+from sopp.event_finder.event_finder_rhodesmill.support.satellite_link_budget_engine import SatelliteLinkBudgetEngine
+from sopp.event_finder.event_finder_rhodesmill.support.satellites_interference_filter import (
+    SatellitesAboveHorizonFilter,
+    SatellitesInterferenceFilter
+)
+
+ARBITRARY_TIME = datetime(2023, 3, 30, 12, tzinfo=timezone.utc)
+SATELLITES_TLE_PATH = Path(__file__).parents[3] / 'satellites_loader' / 'satellites.tle'
+
+# Altitude, azimuth, distance_km, antenna altitude and antenna azimuth of three samples, one minute apart, and the link
+# angles and received powers that the scalar SatelliteLinkBudgetAngleCalculator.get_link_angles() and
+# SatellitesInterferenceFilter.convert_position_to_power() computed for them before they used the engine.
+REFERENCE_SAMPLES = [(45.0, 120.0, 800.0, 60.0, 100.0), (20.0, 300.0, 1500.0, 30.0, 270.0), (75.0, 10.0, 550.0, 80.0, 350.0)]
+REFERENCE_SECONDS = np.array([0.0, 60.0, 120.0])
+REFERENCE_LINK_ANGLES = [
+    [19.16031150745792, -47.46414598817854, 43.22530021526967, 42.794661872732334],
+    [28.862631728193442, -76.74230673519315, 64.87868954989297, 31.928013510632752],
+    [6.544177369350226, -50.96053259811873, 15.602665583909355, -179.87842221307002],
+]
+REFERENCE_POWERS = [1.234406483650152e-15, 3.265053351998115e-16, 2.7197097809124137e-15]
+
+
+class GainPatternStub:
+    def get_gain(self, theta: float, phi: float) -> float:
+        if phi <= 0:
+            phi += 360
+        return 1 + math.cos(math.radians(theta)) ** 2 + phi / 1000
+
+
+class TestSatelliteLinkBudgetEngine:
+    def test_ground_angles_match_the_scalar_calculator(self):
+        altitude, azimuth, distance_km, antenna_altitude, antenna_azimuth = self._samples
+        alpha, beta = SatelliteLinkBudgetEngine(self._facility).ground_angles(
+            altitude, azimuth, distance_km, antenna_altitude, antenna_azimuth
+        )
+
+        expected = [
+            SatelliteLinkBudgetAngleCalculator(self._facility, antenna_direction, satellite_position, satellite=None).calculate_ab_ground()
+            for antenna_direction, satellite_position in self._position_times
+        ]
+        assert alpha == pytest.approx([angles[0] for angles in expected], abs=1e-9)
+        assert beta == pytest.approx([angles[1] for angles in expected], abs=1e-9)
+
+    def test_link_angles_match_the_reference_values(self):
+        satellite = Satellite.from_tle_file(SATELLITES_TLE_PATH)[0]
+        angles = SatelliteLinkBudgetEngine(self._facility).link_angles(
+            satellite, *self._reference_samples, times=TimeGrid(begin=ARBITRARY_TIME, seconds=REFERENCE_SECONDS)
+        )
+
+        for angle_index, angle in enumerate(angles):
+            assert angle == pytest.approx([sample_angles[angle_index] for sample_angles in REFERENCE_LINK_ANGLES], abs=1e-9)
+
+    def test_scalar_link_angles_match_the_reference_values(self):
+        satellite = Satellite.from_tle_file(SATELLITES_TLE_PATH)[0]
+        angles = [
+            SatelliteLinkBudgetAngleCalculator(self._facility, antenna_direction, satellite_position, satellite).get_link_angles()
+            for antenna_direction, satellite_position in self._reference_position_times
+        ]
+
+        for actual_angles, expected_angles in zip(angles, REFERENCE_LINK_ANGLES):
+            assert actual_angles == pytest.approx(expected_angles, abs=1e-9)
+
+    def test_link_angles_propagate_the_indexed_samples_of_a_time_grid(self):
+        satellite = Satellite.from_tle_file(SATELLITES_TLE_PATH)[0]
+        time_grid = TimeGrid(begin=ARBITRARY_TIME, seconds=np.arange(100, dtype=float))
+        indices = np.arange(0, 100, 2)
+        engine = SatelliteLinkBudgetEngine(self._facility)
+
+        indexed_angles = engine.link_angles(satellite, *self._samples, times=time_grid, indices=indices)
+        sliced_angles = engine.link_angles(satellite, *self._samples, times=time_grid[indices])
+
+        for indexed_angle, sliced_angle in zip(indexed_angles, sliced_angles):
+            assert indexed_angle.tolist() == sliced_angle.tolist()
+
+    def test_link_angles_reject_times_that_do_not_match_the_samples(self):
+        satellite = Satellite.from_tle_file(SATELLITES_TLE_PATH)[0]
+        time_grid = TimeGrid(begin=ARBITRARY_TIME, seconds=np.arange(100, dtype=float))
+
+        with pytest.raises(ValueError):
+            SatelliteLinkBudgetEngine(self._facility).link_angles(satellite, *self._samples, times=time_grid)
+
+    def test_received_power_matches_the_reference_values(self):
+        satellite = Satellite.from_tle_file(SATELLITES_TLE_PATH)[0]
+        power = SatelliteLinkBudgetEngine(self._facility).received_power(satellite, *self._reference_samples)
+
+        assert power == pytest.approx(REFERENCE_POWERS, rel=1e-12)
+
+    def test_convert_position_to_power_matches_the_reference_values(self):
+        satellite = Satellite.from_tle_file(SATELLITES_TLE_PATH)[0]
+        interference_filter = SatellitesInterferenceFilter(
+            facility=self._facility,
+            antenna_positions=[],
+            cutoff_time=ARBITRARY_TIME,
+            filter_strategy=SatellitesAboveHorizonFilter
+        )
+        power = [
+            interference_filter.convert_position_to_power(self._facility, antenna_direction, satellite, satellite_position).power
+            for antenna_direction, satellite_position in self._reference_position_times
+        ]
+
+        assert power == pytest.approx(REFERENCE_POWERS, rel=1e-12)
+
+    def test_constant_gain_pattern(self):
+        facility = Facility(Coordinates(latitude=0, longitude=0), antenna=Antenna(gain_pattern=5.0))
+        gains = SatelliteLinkBudgetEngine(facility).receiver_gains(np.array([10., 20.]), np.array([30., 40.]))
+
+        assert gains.tolist() == [5.0, 5.0]
+
+    def test_missing_distance_raises(self):
+        satellite = Satellite.from_tle_file(SATELLITES_TLE_PATH)[0]
+        with pytest.raises(ValueError):
+            SatelliteLinkBudgetEngine(self._facility).received_power(
+                satellite, np.array([10.]), np.array([20.]), np.array([None]), np.array([30.]), np.array([40.])
+            )
+
+    def test_power_array_adds_powers_at_repeated_indices(self):
+        power_array = PowerArray(4)
+        power_array.add_powers(np.array([1, 3, 1]), np.array([1., 2., 3.]))
+
+        assert power_array.array.tolist() == [0., 4., 0., 2.]
+
+    def test_power_array_rejects_indices_out_of_range(self):
+        with pytest.raises(IndexError):
+            PowerArray(4).add_powers(np.array([4]), np.array([1.]))
+
+    @property
+    def _facility(self) -> Facility:
+        return Facility(Coordinates(latitude=40.8, longitude=-121.5), antenna=Antenna(gain_pattern=GainPatternStub()))
+
+    @property
+    def _samples(self):
+        random = np.random.default_rng(0)
+        return (
+            random.uniform(0, 90, 50),
+            random.uniform(0, 360, 50),
+            random.uniform(500, 2000, 50),
+            random.uniform(10, 90, 50),
+            random.uniform(0, 360, 50)
+        )
+
+    @property
+    def _reference_samples(self):
+        return tuple(np.array(values) for values in zip(*REFERENCE_SAMPLES))
+
+    @property
+    def _reference_position_times(self):
+        return [
+            (
+                PositionTime(Position(altitude=antenna_altitude, azimuth=antenna_azimuth), time=ARBITRARY_TIME),
+                PositionTime(Position(altitude=altitude, azimuth=azimuth, distance_km=distance_km),
+                             time=ARBITRARY_TIME + timedelta(seconds=seconds))
+            )
+            for (altitude, azimuth, distance_km, antenna_altitude, antenna_azimuth), seconds
+            in zip(REFERENCE_SAMPLES, REFERENCE_SECONDS.tolist())
+        ]
+
+    @property
+    def _position_times(self):
+        altitude, azimuth, distance_km, antenna_altitude, antenna_azimuth = self._samples
+        return [
+            (
+                PositionTime(Position(altitude=antenna_altitude[index], azimuth=antenna_azimuth[index]), time=ARBITRARY_TIME),
+                PositionTime(Position(altitude=altitude[index], azimuth=azimuth[index], distance_km=distance_km[index]),
+                             time=ARBITRARY_TIME + timedelta(seconds=index))
+            )
+            for index in range(len(altitude))
+        ]
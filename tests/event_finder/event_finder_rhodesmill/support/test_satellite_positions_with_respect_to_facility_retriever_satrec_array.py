@@ -0,0 +1,125 @@
+import logging
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from sopp.custom_dataclasses.antenna import Antenna
+from sopp.custom_dataclasses.coordinates import Coordinates
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.satellite.international_designator import InternationalDesignator
+from sopp.custom_dataclasses.satellite.mean_motion import MeanMotion
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.satellite.tle_information import TleInformation
+from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.satellite_positions_with_respect_to_facility_retriever_rhodesmill import \
+    SatellitePositionsWithRespectToFacilityRetrieverRhodesmill
+from sopp.event_finder.event_finder_rhodesmill.support.satellite_positions_with_respect_to_facility_retriever.satellite_positions_with_respect_to_facility_retriever_satrec_array import \
+    SatellitePositionsWithRespectToFacilityRetrieverSatrecArray
+
+ARBITRARY_FACILITY = Facility(Coordinates(latitude=40.8, longitude=-121.4), elevation=986, antenna=Antenna(gain_pattern=5.0))
+
+
+class TestSatellitePositionsWithRespectToFacilityRetrieverSatrecArray:
+    def test_positions_match_rhodesmill_retriever(self):
+        expected = SatellitePositionsWithRespectToFacilityRetrieverRhodesmill(
+            facility=ARBITRARY_FACILITY,
+            datetimes=self._arbitrary_datetimes
+        ).run(self._arbitrary_satellite)
+        actual = SatellitePositionsWithRespectToFacilityRetrieverSatrecArray(
+            facility=ARBITRARY_FACILITY,
+            datetimes=self._arbitrary_datetimes
+        ).run(self._arbitrary_satellite)
+
+        assert [position.time for position in actual] == [position.time for position in expected]
+        for actual_position, expected_position in zip(actual, expected):
+            assert actual_position.position.altitude == pytest.approx(expected_position.position.altitude, abs=1e-9)
+            assert actual_position.position.azimuth == pytest.approx(expected_position.position.azimuth, abs=1e-9)
+            assert actual_position.position.distance_km == pytest.approx(expected_position.position.distance_km, abs=1e-6)
+
+    def test_run_all_returns_one_row_per_satellite(self):
+        other_satellite = replace(
+            self._arbitrary_satellite,
+            tle_information=replace(self._arbitrary_satellite.tle_information, mean_anomaly=1.0)
+        )
+        retriever = SatellitePositionsWithRespectToFacilityRetrieverSatrecArray(
+            facility=ARBITRARY_FACILITY,
+            datetimes=self._arbitrary_datetimes
+        )
+        positions = retriever.run_all([self._arbitrary_satellite, other_satellite])
+
+        assert positions.altitude.shape == (2, len(self._arbitrary_datetimes))
+        assert positions.azimuth.shape == (2, len(self._arbitrary_datetimes))
+        assert positions.distance_km.shape == (2, len(self._arbitrary_datetimes))
+        assert positions[1].to_position_times()[0].position.altitude == retriever.run(other_satellite)[0].position.altitude
+
+    def test_samples_with_propagation_errors_are_nan_and_logged(self, caplog):
+        decaying_satellite = replace(
+            self._arbitrary_satellite,
+            name='DECAYING SATELLITE',
+            tle_information=replace(self._arbitrary_satellite.tle_information, eccentricity=0.95)
+        )
+        retriever = SatellitePositionsWithRespectToFacilityRetrieverSatrecArray(
+            facility=ARBITRARY_FACILITY,
+            datetimes=self._arbitrary_datetimes
+        )
+        with caplog.at_level(logging.WARNING, logger='sopp.propagation'):
+            positions = retriever.run_all([self._arbitrary_satellite, decaying_satellite])
+
+        assert not np.isnan(positions.altitude[0]).any()
+        assert np.isnan(positions.altitude[1]).any()
+        assert np.array_equal(np.isnan(positions.altitude), np.isnan(positions.distance_km))
+        assert 'DECAYING SATELLITE' in caplog.text
+
+    @pytest.mark.parametrize('retriever_class', [
+        SatellitePositionsWithRespectToFacilityRetrieverRhodesmill,
+        SatellitePositionsWithRespectToFacilityRetrieverSatrecArray
+    ])
+    def test_run_indices_matches_run_at_the_same_samples(self, retriever_class):
+        retriever = retriever_class(facility=ARBITRARY_FACILITY, datetimes=self._arbitrary_datetimes)
+        indices = np.array([0, 7, 8, 9, 119])
+        expected = [retriever.run(self._arbitrary_satellite)[index] for index in indices]
+        actual = retriever.run_indices(self._arbitrary_satellite, indices)
+
+        assert [position.time for position in actual] == [position.time for position in expected]
+        for actual_position, expected_position in zip(actual, expected):
+            assert actual_position.position.altitude == pytest.approx(expected_position.position.altitude, abs=1e-9)
+            assert actual_position.position.azimuth == pytest.approx(expected_position.position.azimuth, abs=1e-9)
+            assert actual_position.position.distance_km == pytest.approx(expected_position.position.distance_km, abs=1e-6)
+
+    @property
+    def _arbitrary_datetimes(self):
+        start = datetime(year=2023, month=6, day=7, tzinfo=timezone.utc)
+        return [start + timedelta(minutes=i) for i in range(120)]
+
+    @property
+    def _arbitrary_satellite(self) -> Satellite:
+        """
+        From 0 COSMOS 1932 DEB
+        """
+        return Satellite(
+                name='ARBITRARY SATELLITE',
+                tle_information=TleInformation(
+                    argument_of_perigee=5.153187590939126,
+                    drag_coefficient=0.00015211,
+                    eccentricity=0.0057116,
+                    epoch_days=26633.28893622,
+                    inclination=1.1352005427406557,
+                    international_designator=InternationalDesignator(
+                        year=88,
+                        launch_number=19,
+                        launch_piece='F'
+                    ),
+                    mean_anomaly=4.188343400497881,
+                    mean_motion=MeanMotion(
+                        first_derivative=2.363466695408988e-12,
+                        second_derivative=0.0,
+                        value=0.060298700041442894
+                    ),
+                    revolution_number=95238,
+                    right_ascension_of_ascending_node=2.907844197528697,
+                    satellite_number=28275,
+                    classification='U'
+                ),
+                frequency=[]
+            )
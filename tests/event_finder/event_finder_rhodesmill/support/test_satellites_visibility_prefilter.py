@@ -0,0 +1,100 @@
+import logging
+import math
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+from skyfield.api import load
+from skyfield.toposlib import wgs84
+
+from sopp.custom_dataclasses.antenna import Antenna
+from sopp.custom_dataclasses.coordinates import Coordinates
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.reservation import Reservation
+from sopp.custom_dataclasses.satellite.mean_motion import MeanMotion
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_window import TimeWindow
+from sopp.event_finder.event_finder_rhodesmill.event_finder_rhodesmill import EventFinderRhodesmill
+from sopp.event_finder.event_finder_rhodesmill.support.satellites_visibility_prefilter import SatellitesVisibilityPrefilter
+from tests.custom_dataclasses.satellite.utilities import expected_international_space_station_tle_as_satellite_cu
+
+ARBITRARY_START = datetime(year=2023, month=6, day=7, tzinfo=timezone.utc)
+ARBITRARY_TIME_WINDOW = TimeWindow(begin=ARBITRARY_START, end=ARBITRARY_START + timedelta(hours=6))
+GEOSYNCHRONOUS_MEAN_MOTION = 2 * math.pi / 1436.1
+
+
+class TestSatellitesVisibilityPrefilter:
+    def test_low_inclination_satellite_is_pruned_at_high_latitude(self):
+        satellite = self._satellite_with(inclination=math.radians(10))
+        prefilter = SatellitesVisibilityPrefilter(facility=self._facility(latitude=78), time_window=ARBITRARY_TIME_WINDOW)
+
+        assert prefilter.run([satellite]) == []
+        assert prefilter.number_of_satellites_pruned == 1
+
+    def test_satellite_reaching_facility_latitude_is_kept(self):
+        satellite = expected_international_space_station_tle_as_satellite_cu()
+        prefilter = SatellitesVisibilityPrefilter(facility=self._facility(latitude=40.8), time_window=ARBITRARY_TIME_WINDOW)
+
+        assert prefilter.run([satellite]) == [satellite]
+        assert prefilter.number_of_satellites_pruned == 0
+
+    def test_satellite_without_tle_information_is_kept(self):
+        satellite = Satellite(name='arbitrary', antenna=Antenna(gain_pattern=5.0))
+        prefilter = SatellitesVisibilityPrefilter(facility=self._facility(latitude=89), time_window=ARBITRARY_TIME_WINDOW)
+
+        assert prefilter.run([satellite]) == [satellite]
+
+    def test_geosynchronous_satellite_behind_the_earth_is_pruned(self):
+        satellite = self._satellite_with(inclination=0.001, eccentricity=0.0001, mean_motion=GEOSYNCHRONOUS_MEAN_MOTION)
+        sub_satellite_longitude = self._sub_satellite_longitude(satellite)
+        behind_the_earth = SatellitesVisibilityPrefilter(
+            facility=self._facility(latitude=0, longitude=sub_satellite_longitude + 180),
+            time_window=ARBITRARY_TIME_WINDOW
+        )
+        below_the_satellite = SatellitesVisibilityPrefilter(
+            facility=self._facility(latitude=0, longitude=sub_satellite_longitude),
+            time_window=ARBITRARY_TIME_WINDOW
+        )
+
+        assert behind_the_earth.run([satellite]) == []
+        assert below_the_satellite.run([satellite]) == [satellite]
+
+    def test_event_finder_reports_pruned_satellites(self, caplog):
+        event_finder = EventFinderRhodesmill(
+            antenna_direction_path=[PositionTime(position=Position(altitude=0, azimuth=0), time=ARBITRARY_START)],
+            list_of_satellites=[self._satellite_with(inclination=math.radians(10))],
+            reservation=Reservation(facility=self._facility(latitude=78), time=ARBITRARY_TIME_WINDOW)
+        )
+
+        with caplog.at_level(logging.INFO, logger='sopp.prefilter'):
+            interference_report = event_finder.get_interference_report()
+
+        assert interference_report.satellites_above_horizon == []
+        assert interference_report.number_of_satellites_pruned == 1
+        assert event_finder.number_of_satellites_pruned == 1
+        assert 'Pruned 1 of 1 satellites' in caplog.text
+
+    @staticmethod
+    def _satellite_with(inclination: float, eccentricity: float = 0.0001, mean_motion: float = 0.0675) -> Satellite:
+        satellite = expected_international_space_station_tle_as_satellite_cu()
+        return replace(
+            satellite,
+            antenna=Antenna(gain_pattern=5.0),
+            tle_information=replace(
+                satellite.tle_information,
+                inclination=inclination,
+                eccentricity=eccentricity,
+                drag_coefficient=0,
+                mean_motion=MeanMotion(first_derivative=0, second_derivative=0, value=mean_motion)
+            )
+        )
+
+    @staticmethod
+    def _facility(latitude: float, longitude: float = 0) -> Facility:
+        return Facility(Coordinates(latitude=latitude, longitude=longitude), antenna=Antenna(gain_pattern=5.0))
+
+    @staticmethod
+    def _sub_satellite_longitude(satellite: Satellite) -> float:
+        geocentric = satellite.to_rhodesmill().at(load.timescale().from_datetime(ARBITRARY_START))
+        return wgs84.latlon_of(geocentric)[1].degrees
@@ -0,0 +1,50 @@
+from sopp.event_finder.event_finder_rhodesmill.support.worker_pool import WorkerPool
+
+
+def add_offset(state: dict, value: int) -> int:
+    return state['offset'] + value
+
+
+def count_tasks(state: dict, _) -> int:
+    state['tasks'] = state.get('tasks', 0) + 1
+    return state['tasks']
+
+
+class TestWorkerPool:
+    def test_tasks_receive_state_and_arguments(self):
+        with WorkerPool(processes=2) as worker_pool:
+            results = worker_pool.map(add_offset, state={'offset': 10}, arguments=[(1,), (2,), (3,)])
+
+        assert results == [11, 12, 13]
+
+    def test_workers_are_kept_between_maps_on_the_same_state(self):
+        state = {}
+        with WorkerPool(processes=1) as worker_pool:
+            first_results = worker_pool.map(count_tasks, state=state, arguments=[(None,)] * 3)
+            second_results = worker_pool.map(count_tasks, state=state, arguments=[(None,)] * 3)
+
+        assert first_results == [1, 2, 3]
+        assert second_results == [4, 5, 6]
+
+    def test_workers_are_restarted_for_a_different_state(self):
+        with WorkerPool(processes=1) as worker_pool:
+            worker_pool.map(count_tasks, state={}, arguments=[(None,)] * 3)
+            results = worker_pool.map(count_tasks, state={}, arguments=[(None,)] * 3)
+
+        assert results == [1, 2, 3]
+
+    def test_imap_unordered_yields_every_result(self):
+        with WorkerPool(processes=2) as worker_pool:
+            results = list(worker_pool.imap_unordered(add_offset, state={'offset': 10}, arguments=[(1,), (2,), (3,)]))
+
+        assert sorted(results) == [11, 12, 13]
+
+    def test_closing_imap_unordered_early_restarts_the_workers(self):
+        state = {}
+        with WorkerPool(processes=1) as worker_pool:
+            results = worker_pool.imap_unordered(count_tasks, state=state, arguments=[(None,)] * 100)
+            next(results)
+            results.close()
+            restarted_results = worker_pool.map(count_tasks, state=state, arguments=[(None,)] * 3)
+
+        assert restarted_results == [1, 2, 3]
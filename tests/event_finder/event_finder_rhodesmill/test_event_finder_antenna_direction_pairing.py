@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from sopp.custom_dataclasses.antenna import Antenna
+from sopp.custom_dataclasses.coordinates import Coordinates
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.reservation import Reservation
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_window import TimeWindow
+from sopp.event_finder.event_finder_rhodesmill.event_finder_rhodesmill import EventFinderRhodesmill
+
+ARBITRARY_START = datetime(year=2023, month=6, day=7, tzinfo=timezone.utc)
+ARBITRARY_FACILITY = Facility(coordinates=Coordinates(latitude=0, longitude=0), antenna=Antenna(gain_pattern=5.0))
+
+
+class SatellitePositionsWithRespectToFacilityRetrieverNorthStub:
+    def __init__(self, facility, datetimes):
+        self._datetimes = datetimes
+
+    def run(self, satellite: Satellite) -> List[PositionTime]:
+        return [PositionTime(position=Position(altitude=45, azimuth=0), time=time) for time in self._datetimes]
+
+
+class TestEventFinderAntennaDirectionPairing:
+    def test_samples_are_paired_with_the_active_antenna_direction(self):
+        windows = self._event_finder(antenna_direction_path=[
+            self._antenna_direction(azimuth=0, seconds=0),
+            self._antenna_direction(azimuth=180, seconds=3),
+            self._antenna_direction(azimuth=0, seconds=6),
+        ]).get_satellites_crossing_main_beam()
+
+        assert [self._seconds(window.positions) for window in windows] == [[0, 1, 2], [6, 7, 8, 9]]
+
+    def test_samples_before_first_antenna_direction_are_skipped(self):
+        windows = self._event_finder(antenna_direction_path=[
+            self._antenna_direction(azimuth=0, seconds=4),
+        ]).get_satellites_crossing_main_beam()
+
+        assert [self._seconds(window.positions) for window in windows] == [[4, 5, 6, 7, 8, 9]]
+
+    @staticmethod
+    def _event_finder(antenna_direction_path: List[PositionTime]) -> EventFinderRhodesmill:
+        return EventFinderRhodesmill(
+            antenna_direction_path=antenna_direction_path,
+            list_of_satellites=[Satellite(name='arbitrary', antenna=Antenna(gain_pattern=5.0))],
+            reservation=Reservation(
+                facility=ARBITRARY_FACILITY,
+                time=TimeWindow(begin=ARBITRARY_START, end=ARBITRARY_START + timedelta(seconds=10))
+            ),
+            satellite_positions_with_respect_to_facility_retriever_class=SatellitePositionsWithRespectToFacilityRetrieverNorthStub
+        )
+
+    @staticmethod
+    def _antenna_direction(azimuth: float, seconds: int) -> PositionTime:
+        return PositionTime(position=Position(altitude=45, azimuth=azimuth), time=ARBITRARY_START + timedelta(seconds=seconds))
+
+    @staticmethod
+    def _seconds(positions: List[PositionTime]) -> List[int]:
+        return [int((position.time - ARBITRARY_START).total_seconds()) for position in positions]
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from sopp.custom_dataclasses.antenna import Antenna
+from sopp.custom_dataclasses.coordinates import Coordinates
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.reservation import Reservation
+from sopp.custom_dataclasses.runtime_settings import RuntimeSettings
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_window import TimeWindow
+from sopp.event_finder.event_finder_rhodesmill.event_finder_rhodesmill import EventFinderRhodesmill
+
+ARBITRARY_START = datetime(year=2023, month=6, day=7, tzinfo=timezone.utc)
+ARBITRARY_FACILITY = Facility(coordinates=Coordinates(latitude=0, longitude=0), beamwidth=20, antenna=Antenna(gain_pattern=5.0))
+
+
+class SatellitePositionsWithRespectToFacilityRetrieverRisingStub:
+    def __init__(self, facility, datetimes):
+        self._datetimes = datetimes
+
+    def run(self, satellite: Satellite) -> List[PositionTime]:
+        return [
+            PositionTime(position=Position(altitude=10 * i - 20, azimuth=0), time=time)
+            for i, time in enumerate(self._datetimes)
+        ]
+
+
+class TestEventFinderInterferenceReport:
+    def test_report_matches_separate_queries(self):
+        event_finder = self._event_finder()
+        report = event_finder.get_interference_report()
+
+        assert self._seconds(report.satellites_above_horizon) == self._seconds(event_finder.get_satellites_above_horizon())
+        assert self._seconds(report.satellites_crossing_main_beam) \
+               == self._seconds(event_finder.get_satellites_crossing_main_beam())
+        assert self._seconds(report.satellites_above_horizon) == [[2, 3, 4, 5, 6, 7, 8, 9]]
+        assert self._seconds(report.satellites_crossing_main_beam) == [[4, 5, 6, 7, 8, 9]]
+
+    @staticmethod
+    def _event_finder() -> EventFinderRhodesmill:
+        return EventFinderRhodesmill(
+            antenna_direction_path=[PositionTime(position=Position(altitude=30, azimuth=0), time=ARBITRARY_START)],
+            list_of_satellites=[Satellite(name='arbitrary', antenna=Antenna(gain_pattern=5.0))],
+            reservation=Reservation(
+                facility=ARBITRARY_FACILITY,
+                time=TimeWindow(begin=ARBITRARY_START, end=ARBITRARY_START + timedelta(seconds=10))
+            ),
+            satellite_positions_with_respect_to_facility_retriever_class=SatellitePositionsWithRespectToFacilityRetrieverRisingStub,
+            runtime_settings=RuntimeSettings(concurrency_level=1)
+        )
+
+    @staticmethod
+    def _seconds(windows) -> List[List[int]]:
+        return [[int((position.time - ARBITRARY_START).total_seconds()) for position in window.positions] for window in windows]
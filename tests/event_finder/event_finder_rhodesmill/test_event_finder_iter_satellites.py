@@ -0,0 +1,54 @@
+from datetime import timedelta
+from typing import List
+
+from sopp.custom_dataclasses.antenna import Antenna
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.reservation import Reservation
+from sopp.custom_dataclasses.runtime_settings import RuntimeSettings
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_window import TimeWindow
+from sopp.event_finder.event_finder_rhodesmill.event_finder_rhodesmill import EventFinderRhodesmill
+from sopp.event_finder.event_finder_rhodesmill.support.worker_pool import WorkerPool
+from tests.event_finder.event_finder_rhodesmill.test_event_finder_interference_report import ARBITRARY_FACILITY, \
+    ARBITRARY_START, SatellitePositionsWithRespectToFacilityRetrieverRisingStub
+
+
+class TestEventFinderIterSatellites:
+    def test_streamed_windows_match_the_list_query(self):
+        event_finder = self._event_finder(number_of_satellites=3)
+
+        assert sorted(self._names_and_seconds(event_finder.iter_satellites_above_horizon())) \
+               == sorted(self._names_and_seconds(event_finder.get_satellites_above_horizon()))
+
+    def test_closing_the_generator_early_cancels_the_remaining_satellites(self):
+        with WorkerPool(processes=1) as worker_pool:
+            overhead_windows = self._event_finder(number_of_satellites=50, worker_pool=worker_pool).iter_satellites_crossing_main_beam()
+            first_window = next(overhead_windows)
+            overhead_windows.close()
+
+            assert first_window.satellite.name.startswith('satellite')
+            assert worker_pool._pool is None
+
+    @staticmethod
+    def _event_finder(number_of_satellites: int, worker_pool: WorkerPool = None) -> EventFinderRhodesmill:
+        return EventFinderRhodesmill(
+            antenna_direction_path=[PositionTime(position=Position(altitude=30, azimuth=0), time=ARBITRARY_START)],
+            list_of_satellites=[
+                Satellite(name=f'satellite {index}', antenna=Antenna(gain_pattern=5.0)) for index in range(number_of_satellites)
+            ],
+            reservation=Reservation(
+                facility=ARBITRARY_FACILITY,
+                time=TimeWindow(begin=ARBITRARY_START, end=ARBITRARY_START + timedelta(seconds=10))
+            ),
+            satellite_positions_with_respect_to_facility_retriever_class=SatellitePositionsWithRespectToFacilityRetrieverRisingStub,
+            runtime_settings=RuntimeSettings(concurrency_level=2),
+            worker_pool=worker_pool
+        )
+
+    @staticmethod
+    def _names_and_seconds(overhead_windows) -> List:
+        return [
+            (window.satellite.name, [int((position.time - ARBITRARY_START).total_seconds()) for position in window.positions])
+            for window in overhead_windows
+        ]
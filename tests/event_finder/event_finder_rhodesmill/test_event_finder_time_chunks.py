@@ -0,0 +1,64 @@
+from datetime import timedelta
+from typing import List
+
+from sopp.custom_dataclasses.antenna import Antenna
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.reservation import Reservation
+from sopp.custom_dataclasses.runtime_settings import RuntimeSettings
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_window import TimeWindow
+from sopp.event_finder.event_finder_rhodesmill.event_finder_rhodesmill import EventFinderRhodesmill
+from tests.event_finder.event_finder_rhodesmill.test_event_finder_interference_report import ARBITRARY_FACILITY, \
+    ARBITRARY_START
+
+
+class SatellitePositionsWithRespectToFacilityRetrieverOscillatingStub:
+    def __init__(self, facility, datetimes):
+        self._datetimes = datetimes
+
+    def run(self, satellite: Satellite) -> List[PositionTime]:
+        return [
+            PositionTime(
+                position=Position(altitude=10 if (time - ARBITRARY_START).total_seconds() % 10 < 7 else -10, azimuth=0),
+                time=time
+            )
+            for time in self._datetimes
+        ]
+
+
+class TestEventFinderTimeChunks:
+    def test_windows_crossing_chunk_boundaries_are_stitched(self):
+        chunked_event_finder = self._event_finder(memory_budget_mb=0.001)
+
+        assert len(chunked_event_finder._time_chunks(number_of_satellites=1)) > 1
+        assert self._seconds(chunked_event_finder.get_satellites_above_horizon()) \
+               == self._seconds(self._event_finder(memory_budget_mb=None).get_satellites_above_horizon())
+        assert self._seconds(chunked_event_finder.get_satellites_above_horizon()) \
+               == [list(range(begin, begin + 7)) for begin in range(0, 30, 10)]
+
+    def test_streamed_windows_crossing_chunk_boundaries_are_stitched(self):
+        chunked_event_finder = self._event_finder(memory_budget_mb=0.001)
+
+        assert self._seconds(chunked_event_finder.iter_satellites_above_horizon()) \
+               == [list(range(begin, begin + 7)) for begin in range(0, 30, 10)]
+
+    def test_whole_reservation_is_one_chunk_without_a_memory_budget(self):
+        assert self._event_finder(memory_budget_mb=None)._time_chunks(number_of_satellites=1) == [(0, 30)]
+
+    @staticmethod
+    def _event_finder(memory_budget_mb) -> EventFinderRhodesmill:
+        return EventFinderRhodesmill(
+            antenna_direction_path=[PositionTime(position=Position(altitude=30, azimuth=0), time=ARBITRARY_START)],
+            list_of_satellites=[Satellite(name='arbitrary', antenna=Antenna(gain_pattern=5.0))],
+            reservation=Reservation(
+                facility=ARBITRARY_FACILITY,
+                time=TimeWindow(begin=ARBITRARY_START, end=ARBITRARY_START + timedelta(seconds=30))
+            ),
+            satellite_positions_with_respect_to_facility_retriever_class=SatellitePositionsWithRespectToFacilityRetrieverOscillatingStub,
+            runtime_settings=RuntimeSettings(concurrency_level=1, memory_budget_mb=memory_budget_mb)
+        )
+
+    @staticmethod
+    def _seconds(windows) -> List[List[int]]:
+        return [[int((position.time - ARBITRARY_START).total_seconds()) for position in window.positions] for window in windows]
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from sopp.custom_dataclasses.antenna import Antenna
+from sopp.custom_dataclasses.coordinates import Coordinates
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.power_array import PowerArray
+from sopp.custom_dataclasses.reservation import Reservation
+from sopp.custom_dataclasses.runtime_settings import RuntimeSettings
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_window import TimeWindow
+from sopp.event_finder.event_finder_rhodesmill.power_finder_rhodesmill import PowerFinderRhodesmill
+from sopp.event_finder.event_finder_rhodesmill.support.satellites_interference_filter import SatellitesAboveHorizonFilter, \
+    SatellitesFilterStrategy
+from sopp.event_finder.event_finder_rhodesmill.support.worker_pool import WorkerPool
+
+ARBITRARY_START = datetime(2023, 3, 30, 5, 40, tzinfo=timezone.utc)
+SATELLITES_TLE_PATH = Path(__file__).parents[2] / 'satellites_loader' / 'satellites.tle'
+
+
+class NeverInViewFilterStub(SatellitesFilterStrategy):
+    def is_in_view(self, satellite_position, antenna_position) -> bool:
+        return False
+
+    def is_in_view_array(self, satellite_altitude, satellite_azimuth, antenna_altitude, antenna_azimuth):
+        return np.zeros(len(satellite_altitude), dtype=bool)
+
+
+class TestPowerFinderConcurrency:
+    @pytest.mark.parametrize('concurrency_level', [2, 3])
+    def test_parallel_power_matches_serial_power(self, concurrency_level):
+        serial_power = self._power_finder(concurrency_level=1).get_satellite_power().array
+        parallel_power = self._power_finder(concurrency_level=concurrency_level).get_satellite_power().array
+
+        assert serial_power.any()
+        assert parallel_power.tolist() == pytest.approx(serial_power.tolist(), rel=1e-12)
+
+    def test_shared_worker_pool_is_left_open(self):
+        with WorkerPool(processes=2) as worker_pool:
+            power_finder = self._power_finder(concurrency_level=2, worker_pool=worker_pool)
+            power_finder.get_satellite_power()
+
+            assert worker_pool._pool is not None
+
+    def test_workers_use_the_filter_strategy_of_each_query(self):
+        with WorkerPool(processes=2) as worker_pool:
+            power_finder = self._power_finder(concurrency_level=2, worker_pool=worker_pool)
+            above_horizon_power, _ = power_finder._get_power(SatellitesAboveHorizonFilter, power_finder._full_time_chunk,
+                                                             track_power_contributions=False, worker_pool=worker_pool)
+            never_in_view_power, _ = power_finder._get_power(NeverInViewFilterStub, power_finder._full_time_chunk,
+                                                             track_power_contributions=False, worker_pool=worker_pool)
+
+        assert above_horizon_power.array.any()
+        assert not never_in_view_power.array.any()
+
+    def test_satellites_are_dealt_into_one_batch_per_worker(self):
+        power_finder = self._power_finder(concurrency_level=2, satellites=self._satellites * 3)
+
+        assert power_finder._satellite_index_batches() == [[0, 2, 4], [1, 3, 5]]
+
+    def test_tree_sum_adds_every_power_array(self):
+        power_arrays = [PowerArray(3) for _ in range(5)]
+        for index, power_array in enumerate(power_arrays):
+            power_array.add_power(index % 3, index + 1)
+
+        assert PowerArray.tree_sum(power_arrays).array.tolist() == [5., 7., 3.]
+        assert power_arrays[0].array.tolist() == [1., 0., 0.]
+
+    def test_tree_sum_rejects_power_arrays_of_different_lengths(self):
+        with pytest.raises(ValueError):
+            PowerArray.tree_sum([PowerArray(3), PowerArray(4)])
+
+    def _power_finder(self, concurrency_level: int, worker_pool=None, satellites=None) -> PowerFinderRhodesmill:
+        facility = Facility(Coordinates(latitude=40.8, longitude=-121.5), antenna=Antenna(gain_pattern=1.0))
+        return PowerFinderRhodesmill(
+            antenna_direction_path=[PositionTime(Position(altitude=90, azimuth=0), ARBITRARY_START)],
+            list_of_satellites=satellites or self._satellites,
+            reservation=Reservation(facility=facility,
+                                    time=TimeWindow(begin=ARBITRARY_START, end=ARBITRARY_START + timedelta(minutes=20))),
+            runtime_settings=RuntimeSettings(concurrency_level=concurrency_level),
+            worker_pool=worker_pool
+        )
+
+    @property
+    def _satellites(self):
+        return Satellite.from_tle_file(SATELLITES_TLE_PATH)
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from sopp.custom_dataclasses.antenna import Antenna
+from sopp.custom_dataclasses.coordinates import Coordinates
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.reservation import Reservation
+from sopp.custom_dataclasses.runtime_settings import RuntimeSettings
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_window import TimeWindow
+from sopp.event_finder.event_finder_rhodesmill.power_finder_rhodesmill import PowerFinderRhodesmill
+
+ARBITRARY_START = datetime(2023, 3, 30, 5, 40, tzinfo=timezone.utc)
+SATELLITES_TLE_PATH = Path(__file__).parents[2] / 'satellites_loader' / 'satellites.tle'
+
+
+class TestPowerFinderContributions:
+    def test_contributions_are_not_tracked_by_default(self):
+        power_finder = self._power_finder(RuntimeSettings())
+        power_finder.get_satellite_power()
+
+        assert power_finder.power_contributions is None
+
+    @pytest.mark.parametrize('concurrency_level', [1, 2])
+    def test_contributions_add_up_to_the_power_array(self, concurrency_level):
+        power_finder = self._power_finder(RuntimeSettings(concurrency_level=concurrency_level, track_power_contributions=True))
+        power_array = power_finder.get_satellite_power()
+        power_contributions = power_finder.power_contributions
+
+        assert power_contributions.matrix.nnz == (power_contributions.matrix.toarray() > 0).sum()
+        assert power_contributions.to_power_array().array.tolist() == pytest.approx(power_array.array.tolist(), rel=1e-12)
+        assert power_contributions.top_contributors(k=1)[0].energy == max(power_contributions.energy_per_satellite())
+
+    @staticmethod
+    def _power_finder(runtime_settings: RuntimeSettings) -> PowerFinderRhodesmill:
+        facility = Facility(Coordinates(latitude=40.8, longitude=-121.5), antenna=Antenna(gain_pattern=1.0))
+        return PowerFinderRhodesmill(
+            antenna_direction_path=[PositionTime(Position(altitude=90, azimuth=0), ARBITRARY_START)],
+            list_of_satellites=Satellite.from_tle_file(SATELLITES_TLE_PATH),
+            reservation=Reservation(facility=facility,
+                                    time=TimeWindow(begin=ARBITRARY_START, end=ARBITRARY_START + timedelta(minutes=20))),
+            runtime_settings=runtime_settings
+        )
@@ -0,0 +1,96 @@
+import multiprocessing
+import pickle
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+from sopp.custom_dataclasses.antenna import Antenna
+from sopp.custom_dataclasses.coordinates import Coordinates
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.power_statistics import PowerStatistics
+from sopp.custom_dataclasses.reservation import Reservation
+from sopp.custom_dataclasses.runtime_settings import RuntimeSettings
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+from sopp.custom_dataclasses.time_window import TimeWindow
+from sopp.event_finder.event_finder_rhodesmill.power_finder_rhodesmill import PowerFinderRhodesmill
+from sopp.event_finder.event_finder_rhodesmill.support.worker_pool import WorkerPool
+
+ARBITRARY_START = datetime(2023, 3, 30, 5, 40, tzinfo=timezone.utc)
+SATELLITES_TLE_PATH = Path(__file__).parents[2] / 'satellites_loader' / 'satellites.tle'
+
+
+class TestPowerFinderStatistics:
+    def test_chunked_statistics_match_the_whole_power_array(self):
+        power_array = self._power_finder().get_satellite_power()
+        expected_power_statistics = PowerStatistics()
+        expected_power_statistics.update(power_array.array[:20 * 60])
+
+        power_statistics = self._power_finder().get_power_statistics(time_chunk=timedelta(minutes=7))
+
+        assert power_statistics.count == 20 * 60
+        assert power_statistics.zero_count == expected_power_statistics.zero_count
+        assert power_statistics.counts.tolist() == expected_power_statistics.counts.tolist()
+        assert power_statistics.peak == expected_power_statistics.peak
+
+    def test_time_chunks_cover_the_reservation_on_the_sample_times(self):
+        power_finder = self._power_finder(RuntimeSettings(time_continuity_resolution=timedelta(seconds=3)))
+
+        assert power_finder._time_chunks(timedelta(minutes=7, seconds=1)) == [(0, 141), (141, 282), (282, 400)]
+
+    def test_parallel_chunked_statistics_start_the_workers_once(self, monkeypatch):
+        started_pools = []
+        pool_class = multiprocessing.Pool
+
+        def pool(*args, **kwargs):
+            started_pools.append(kwargs)
+            return pool_class(*args, **kwargs)
+
+        monkeypatch.setattr(multiprocessing, 'Pool', pool)
+        with WorkerPool(processes=2) as worker_pool:
+            power_finder = self._power_finder(RuntimeSettings(concurrency_level=2), worker_pool=worker_pool)
+            power_statistics = power_finder.get_power_statistics(time_chunk=timedelta(minutes=7))
+
+        assert len(started_pools) == 1
+        assert power_statistics.counts.tolist() == self._power_finder().get_power_statistics().counts.tolist()
+
+    def test_statistics_keep_no_state_of_the_whole_reservation(self):
+        power_finder = self._power_finder(RuntimeSettings(track_power_contributions=True))
+        power_finder.get_power_statistics(time_chunk=timedelta(minutes=7))
+
+        assert power_finder._power_array is None
+        assert power_finder._power_contributions is None
+
+    def test_worker_state_leaves_out_results_and_retrievers(self):
+        power_finder = self._power_finder(RuntimeSettings(track_power_contributions=True))
+        power_finder.get_satellite_power()
+
+        worker_state = pickle.loads(pickle.dumps(power_finder))
+
+        assert worker_state._power_array is None
+        assert worker_state._power_contributions is None
+        assert worker_state._time_chunk_satellite_positions_retriever is None
+        assert worker_state.power_array.array.tolist() == [0.0] * len(power_finder.power_array.array)
+
+    def test_statistics_bin_width_follows_the_time_resolution(self):
+        power_finder = self._power_finder(RuntimeSettings(time_continuity_resolution=timedelta(seconds=10)))
+
+        power_statistics = power_finder.get_power_statistics()
+
+        assert power_statistics.bin_width == timedelta(seconds=10)
+        assert power_statistics.count == 120
+        assert np.isclose(power_statistics.exceedance_duration(0.0).total_seconds(), (power_statistics.count - power_statistics.zero_count) * 10)
+
+    @staticmethod
+    def _power_finder(runtime_settings: RuntimeSettings = RuntimeSettings(), worker_pool=None) -> PowerFinderRhodesmill:
+        facility = Facility(Coordinates(latitude=40.8, longitude=-121.5), antenna=Antenna(gain_pattern=1.0))
+        return PowerFinderRhodesmill(
+            antenna_direction_path=[PositionTime(Position(altitude=90, azimuth=0), ARBITRARY_START)],
+            list_of_satellites=Satellite.from_tle_file(SATELLITES_TLE_PATH),
+            reservation=Reservation(facility=facility,
+                                    time=TimeWindow(begin=ARBITRARY_START, end=ARBITRARY_START + timedelta(minutes=20))),
+            runtime_settings=runtime_settings,
+            worker_pool=worker_pool
+        )
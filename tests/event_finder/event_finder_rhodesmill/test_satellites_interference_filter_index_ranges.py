@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from sopp.custom_dataclasses.antenna import Antenna
+from sopp.custom_dataclasses.coordinates import Coordinates
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.runtime_settings import RuntimeSettings
+from sopp.event_finder.event_finder_rhodesmill.support.satellites_interference_filter import SatellitesInterferenceFilter, \
+    SatellitesAboveHorizonFilter, SatellitesWithinMainBeamFilter, SatellitesFilterStrategy, AntennaPosition
+
+ARBITRARY_FACILITY = Facility(coordinates=Coordinates(latitude=0, longitude=0), antenna=Antenna(gain_pattern=5.0))
+ARBITRARY_START = datetime(year=2023, month=6, day=7, tzinfo=timezone.utc)
+
+
+class SatellitesAboveHorizonScalarFilter(SatellitesFilterStrategy):
+    def is_in_view(self, satellite_position: Position, antenna_position: Position) -> bool:
+        return satellite_position.altitude >= 0
+
+
+class TestSatellitesInterferenceFilterIndexRanges:
+    def test_segments_of_whole_catalog(self):
+        altitude = np.array([
+            [-1, 1, 1, -1, 1],
+            [1, 1, -1, -1, -1],
+        ])
+        satellite_indices, begins, ends = self._filter(SatellitesAboveHorizonFilter).run_index_ranges(
+            satellite_altitude=altitude,
+            satellite_azimuth=np.zeros_like(altitude),
+            antenna_altitude=0,
+            antenna_azimuth=0
+        )
+
+        assert satellite_indices.tolist() == [0, 0, 1]
+        assert begins.tolist() == [1, 4, 0]
+        assert ends.tolist() == [3, 5, 2]
+
+    def test_samples_after_cutoff_time_are_dropped(self):
+        times = np.array([ARBITRARY_START + timedelta(seconds=i) for i in range(4)])
+        _, begins, ends = self._filter(SatellitesAboveHorizonFilter, cutoff_time=times[2]).run_index_ranges(
+            satellite_altitude=np.ones(4),
+            satellite_azimuth=np.zeros(4),
+            antenna_altitude=0,
+            antenna_azimuth=0,
+            times=times
+        )
+
+        assert begins.tolist() == [0]
+        assert ends.tolist() == [2]
+
+    def test_main_beam_array_matches_scalar_test_across_north(self):
+        satellite_azimuth = np.array([358.0, 359.5, 0.5, 2.0, 180.0])
+        antenna_azimuth = np.array([0.0, 0.0, 359.0, 359.0, 0.0])
+        strategy = SatellitesWithinMainBeamFilter(facility=ARBITRARY_FACILITY, runtime_settings=RuntimeSettings())
+        in_view = strategy.is_in_view_array(np.full(5, 45.0), satellite_azimuth, np.full(5, 45.0), antenna_azimuth)
+
+        assert in_view.tolist() == [
+            strategy.is_in_view(Position(altitude=45, azimuth=satellite), Position(altitude=45, azimuth=antenna))
+            for satellite, antenna in zip(satellite_azimuth, antenna_azimuth)
+        ]
+        assert in_view.tolist() == [False, True, True, False, False]
+
+    def test_strategies_without_array_form_fall_back_to_is_in_view(self):
+        satellite_positions = [
+            PositionTime(position=Position(altitude=altitude, azimuth=0), time=ARBITRARY_START + timedelta(seconds=i))
+            for i, altitude in enumerate([1, -1, 1, 1])
+        ]
+        windows = SatellitesInterferenceFilter(
+            facility=ARBITRARY_FACILITY,
+            antenna_positions=[AntennaPosition(satellite_positions=satellite_positions,
+                                               antenna_direction=PositionTime(position=Position(altitude=0, azimuth=0),
+                                                                              time=ARBITRARY_START))],
+            cutoff_time=ARBITRARY_START + timedelta(minutes=1),
+            filter_strategy=SatellitesAboveHorizonScalarFilter
+        ).run()
+
+        assert windows == [satellite_positions[:1], satellite_positions[2:]]
+
+    @staticmethod
+    def _filter(filter_strategy, cutoff_time: datetime = ARBITRARY_START + timedelta(days=1)) -> SatellitesInterferenceFilter:
+        return SatellitesInterferenceFilter(
+            facility=ARBITRARY_FACILITY,
+            antenna_positions=[],
+            cutoff_time=cutoff_time,
+            filter_strategy=filter_strategy
+        )
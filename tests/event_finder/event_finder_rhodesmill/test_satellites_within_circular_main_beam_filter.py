@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from sopp.custom_dataclasses.antenna import Antenna
+from sopp.custom_dataclasses.coordinates import Coordinates
+from sopp.custom_dataclasses.facility import Facility
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.runtime_settings import RuntimeSettings
+from sopp.event_finder.event_finder_rhodesmill.support.satellites_interference_filter import \
+    SatellitesWithinCircularMainBeamFilter, altitude_azimuth_to_unit_vectors
+
+ARBITRARY_FACILITY = Facility(coordinates=Coordinates(latitude=0, longitude=0), beamwidth=10, antenna=Antenna(gain_pattern=5.0))
+
+
+class TestSatellitesWithinCircularMainBeamFilter:
+    def test_unit_vectors_point_north_east_and_up(self):
+        unit_vectors = altitude_azimuth_to_unit_vectors(np.array([0, 0, 90]), np.array([0, 90, 0]))
+        assert unit_vectors == pytest.approx(np.eye(3), abs=1e-12)
+
+    def test_beam_is_circular(self):
+        in_view = self._strategy.is_in_view_array(
+            satellite_altitude=np.array([45, 50.1, 45, 45]),
+            satellite_azimuth=np.array([100, 100, 106, 107.5]),
+            antenna_altitude=45,
+            antenna_azimuth=100
+        )
+        assert in_view.tolist() == [True, False, True, False]
+
+    def test_beam_wraps_across_north(self):
+        assert self._strategy.is_in_view(Position(altitude=10, azimuth=358), Position(altitude=10, azimuth=2))
+
+    def test_beam_crosses_the_zenith(self):
+        assert self._strategy.is_in_view(Position(altitude=88, azimuth=0), Position(altitude=88, azimuth=180))
+
+    def test_satellite_below_min_altitude_is_not_in_view(self):
+        strategy = SatellitesWithinCircularMainBeamFilter(facility=ARBITRARY_FACILITY, runtime_settings=RuntimeSettings(min_altitude=5))
+        assert not strategy.is_in_view(Position(altitude=4, azimuth=0), Position(altitude=5, azimuth=0))
+
+    @property
+    def _strategy(self) -> SatellitesWithinCircularMainBeamFilter:
+        return SatellitesWithinCircularMainBeamFilter(facility=ARBITRARY_FACILITY, runtime_settings=RuntimeSettings())
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from sopp.gain_pattern import GainPattern
+
+
+class TestGainPattern:
+    def test_get_gains_matches_get_gain(self, tmp_path):
+        gain_pattern = GainPattern(self._write_pattern(tmp_path))
+        theta = np.array([0., 12., 44., 89., 90.])
+        phi = np.array([-90., 0., 91., 179., 360.])
+
+        gains = gain_pattern.get_gains(theta, phi)
+
+        assert gains.tolist() == [gain_pattern.get_gain(*angles) for angles in zip(theta, phi)]
+
+    def test_get_gains_returns_nearest_measured_gain(self, tmp_path):
+        gain_pattern = GainPattern(self._write_pattern(tmp_path))
+
+        gains = gain_pattern.get_gains(np.array([[44., 46.]]), np.array([[-88., 92.]]))
+
+        assert gains.tolist() == [[45 + 270, 45 + 90]]
+
+    def test_regular_grid_interpolates_bilinearly(self, tmp_path):
+        gain_pattern = GainPattern(self._write_pattern(tmp_path), grid_resolution=45)
+
+        gains = gain_pattern.get_gains(np.array([22.5, 45., 90.]), np.array([135., 90., 400.]))
+
+        assert gains == pytest.approx([22.5 + 135, 45 + 90, 90 + 360])
+
+    @staticmethod
+    def _write_pattern(tmp_path) -> str:
+        alpha, beta = np.meshgrid(np.arange(0, 91, 45), np.arange(0, 361, 45), indexing='ij')
+        csv_file = tmp_path / 'gain_pattern.csv'
+        csv_file.write_text('alpha,beta,gain\n' + ''.join(
+            f'{a},{b},{a + b}\n' for a, b in zip(alpha.ravel(), beta.ravel())
+        ))
+        return str(csv_file)
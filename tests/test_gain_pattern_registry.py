@@ -0,0 +1,88 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from sopp.custom_dataclasses.satellite.satellite import DEFAULT_SATELLITE_GAIN_PATTERN, Satellite
+from sopp.gain_pattern_registry import GAIN_PATTERN_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE, GAIN_PATTERN_REGISTRY, \
+    GainPatternRegistry, RegisteredGainPattern, cache_directory_from_environment
+
+NSIDE = 8
+
+
+class TestGainPatternRegistry:
+    def test_pattern_is_loaded_on_first_use(self, tmp_path):
+        registry = GainPatternRegistry()
+        registry.register('pattern', self._write_pattern(tmp_path), nside=NSIDE)
+
+        assert not registry.is_loaded('pattern')
+        assert registry.get('pattern').get_gain(30, 40) == 20
+        assert registry.is_loaded('pattern')
+
+    def test_pattern_is_shared(self, tmp_path):
+        registry = GainPatternRegistry()
+        registry.register('pattern', self._write_pattern(tmp_path), nside=NSIDE)
+
+        assert registry.get('pattern') is registry.get('pattern')
+
+    def test_built_pattern_is_cached_and_memory_mapped(self, tmp_path):
+        csv_file = self._write_pattern(tmp_path)
+        cache_directory = tmp_path / 'cache'
+        first_registry = GainPatternRegistry(cache_directory=cache_directory)
+        first_registry.register('pattern', csv_file, nside=NSIDE)
+        first_registry.get('pattern')
+
+        second_registry = GainPatternRegistry(cache_directory=cache_directory)
+        second_registry.register('pattern', csv_file, nside=NSIDE)
+        pattern = second_registry.get('pattern')
+
+        assert len(list(cache_directory.iterdir())) == 1
+        assert isinstance(pattern.healpix_gain, np.memmap)
+        assert pattern.get_gain(30, 40) == 20
+
+    def test_changed_csv_file_is_rebuilt(self, tmp_path):
+        csv_file = self._write_pattern(tmp_path)
+        cache_directory = tmp_path / 'cache'
+        registry = GainPatternRegistry(cache_directory=cache_directory)
+        registry.register('pattern', csv_file, nside=NSIDE)
+        registry.get('pattern')
+
+        csv_file.write_text('alpha,beta,gain\n30,40,25.0\n')
+        registry.register('pattern', csv_file, nside=NSIDE)
+
+        assert registry.get('pattern').get_gain(30, 40) == 25
+        assert len(list(cache_directory.iterdir())) == 2
+
+    def test_unknown_pattern_raises(self):
+        with pytest.raises(KeyError):
+            GainPatternRegistry().get('unknown')
+
+    def test_registered_gain_pattern_pickles_as_its_name(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(GAIN_PATTERN_REGISTRY, 'cache_directory', tmp_path / 'cache')
+        GAIN_PATTERN_REGISTRY.register('test_registered_gain_pattern', self._write_pattern(tmp_path), nside=NSIDE)
+        reference = RegisteredGainPattern('test_registered_gain_pattern')
+        reference.get_gain(30, 40)
+
+        unpickled_reference = pickle.loads(pickle.dumps(reference))
+
+        assert len(pickle.dumps(reference)) < 200
+        assert unpickled_reference.get_gains(np.array([30.]), np.array([40.])).tolist() == [20.]
+
+    def test_disk_cache_is_opt_in(self, tmp_path, monkeypatch):
+        monkeypatch.delenv(GAIN_PATTERN_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE, raising=False)
+        assert cache_directory_from_environment() is None
+
+        monkeypatch.setenv(GAIN_PATTERN_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE, str(tmp_path))
+        assert cache_directory_from_environment() == tmp_path
+
+    def test_satellite_refers_to_the_default_pattern(self):
+        gain_pattern = Satellite(name='name').antenna.gain_pattern
+
+        assert isinstance(gain_pattern, RegisteredGainPattern)
+        assert gain_pattern.name == DEFAULT_SATELLITE_GAIN_PATTERN
+
+    @staticmethod
+    def _write_pattern(tmp_path):
+        csv_file = tmp_path / 'gain_pattern.csv'
+        csv_file.write_text('alpha,beta,gain\n30,40,20.0\n150,200,-5.0\n')
+        return csv_file
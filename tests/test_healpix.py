@@ -0,0 +1,141 @@
+import pickle
+
+import healpy as hp
+import numpy as np
+import pytest
+
+from scipy.interpolate import griddata
+
+from sopp.healpix import HealpixGainPattern, HealpixInterLoader, HealpixLoader
+
+NSIDE = 8
+
+
+class TestHealpixGainPattern:
+    def test_nside_is_taken_from_the_map(self):
+        assert HealpixGainPattern(self._full_map).nside == NSIDE
+
+    def test_partial_sky_map_requires_nside(self):
+        with pytest.raises(ValueError):
+            HealpixGainPattern(np.ones(3), pixels=np.arange(3))
+
+    def test_get_gains_matches_get_gain(self):
+        pattern = HealpixGainPattern(self._full_map)
+        theta, phi = self._directions
+
+        assert pattern.get_gains(theta, phi).tolist() == [pattern.get_gain(*angles) for angles in zip(theta, phi)]
+
+    def test_partial_sky_map_matches_full_map(self):
+        pattern = HealpixGainPattern(self._full_map)
+        partial_pattern = pattern.to_partial_sky()
+        theta, phi = self._directions
+
+        assert partial_pattern.is_partial_sky
+        assert len(partial_pattern.pixels) < hp.nside2npix(NSIDE)
+        assert partial_pattern.get_gains(theta, phi).tolist() == pattern.get_gains(theta, phi).tolist()
+
+    def test_float32_storage(self):
+        pattern = HealpixGainPattern(self._full_map).astype(np.float32)
+        theta, phi = self._directions
+
+        assert pattern.healpix_gain.dtype == np.float32
+        assert pattern.get_gains(theta, phi) == pytest.approx(HealpixGainPattern(self._full_map).get_gains(theta, phi))
+
+    @pytest.mark.parametrize('partial_sky', [False, True])
+    def test_saved_pattern_loads_memory_mapped(self, tmp_path, partial_sky):
+        pattern = HealpixGainPattern(self._full_map)
+        pattern = pattern.to_partial_sky() if partial_sky else pattern
+        pattern.save(tmp_path)
+        loaded_pattern = HealpixGainPattern.load(tmp_path)
+        theta, phi = self._directions
+
+        assert isinstance(loaded_pattern.healpix_gain, np.memmap)
+        assert loaded_pattern.nside == NSIDE
+        assert loaded_pattern.get_gains(theta, phi).tolist() == pattern.get_gains(theta, phi).tolist()
+
+    def test_loaded_pattern_pickles_as_its_directory(self, tmp_path):
+        HealpixGainPattern(self._full_map).save(tmp_path)
+        loaded_pattern = HealpixGainPattern.load(tmp_path)
+
+        unpickled_pattern = pickle.loads(pickle.dumps(loaded_pattern))
+
+        assert len(pickle.dumps(loaded_pattern)) < loaded_pattern.healpix_gain.nbytes
+        assert isinstance(unpickled_pattern.healpix_gain, np.memmap)
+        assert unpickled_pattern.get_gain(10, 20) == loaded_pattern.get_gain(10, 20)
+
+    @property
+    def _full_map(self) -> np.ndarray:
+        theta, _ = hp.pix2ang(NSIDE, np.arange(hp.nside2npix(NSIDE)))
+        return np.where(theta < np.radians(60), 30 * np.cos(theta), 0.0)
+
+    @property
+    def _directions(self):
+        return np.array([0., 10., 45., 59., 90., 170.]), np.array([0., 20., 100., 200., 300., 359.])
+
+
+class TestHealpixLoader:
+    def test_float32_map(self, tmp_path):
+        csv_file = tmp_path / 'gain_pattern.csv'
+        csv_file.write_text('alpha,beta,gain\n30,40,20.0\n30,40,10.0\n150,200,-5.0\n')
+
+        healpix_gain = HealpixLoader(str(csv_file), nside=NSIDE, dtype=np.float32).load_healpix_gain_pattern()
+
+        assert healpix_gain.dtype == np.float32
+        assert healpix_gain[hp.ang2pix(NSIDE, np.radians(30), np.radians(40))] == 15.0
+        assert np.count_nonzero(healpix_gain) == 2
+
+    def test_map_is_float32_by_default(self, tmp_path):
+        csv_file = tmp_path / 'gain_pattern.csv'
+        csv_file.write_text('alpha,beta,gain\n30,40,20.0\n150,200,-5.0\n')
+
+        assert HealpixLoader(str(csv_file), nside=NSIDE).load_healpix_gain_pattern().dtype == np.float32
+
+    def test_partial_sky_pattern_matches_the_full_map(self, tmp_path):
+        csv_file = tmp_path / 'gain_pattern.csv'
+        csv_file.write_text('alpha,beta,gain\n30,40,20.0\n30,40,10.0\n150,200,-5.0\n60,10,0.0\n')
+        loader = HealpixLoader(str(csv_file), nside=NSIDE)
+
+        partial_pattern = loader.load_partial_sky_gain_pattern()
+        full_pattern = HealpixGainPattern(loader.load_healpix_gain_pattern()).to_partial_sky()
+
+        assert partial_pattern.pixels.tolist() == full_pattern.pixels.tolist()
+        assert partial_pattern.healpix_gain.tolist() == full_pattern.healpix_gain.tolist()
+
+    def test_cache_key_changes_with_the_csv_file(self, tmp_path):
+        csv_file = tmp_path / 'gain_pattern.csv'
+        csv_file.write_text('alpha,beta,gain\n30,40,20.0\n')
+        first_key = HealpixLoader(str(csv_file), nside=NSIDE).cache_key()
+        csv_file.write_text('alpha,beta,gain\n30,40,25.0\n')
+
+        assert HealpixLoader(str(csv_file), nside=NSIDE).cache_key() != first_key
+
+
+class TestHealpixInterLoader:
+    @pytest.mark.parametrize('method', ['linear', 'nearest', 'cubic'])
+    def test_map_matches_griddata_at_pixel_centers(self, method):
+        random = np.random.default_rng(0)
+        azimuth, elevation, gain = random.uniform(0, 360, 200), random.uniform(0, 180, 200), random.normal(10, 5, 200)
+        theta, phi = hp.pix2ang(NSIDE, np.arange(hp.nside2npix(NSIDE)))
+
+        healpix_gain = HealpixInterLoader('unused.csv', nside=NSIDE, workers=2).create_healpix_object(
+            azimuth, elevation, gain, method=method
+        )
+
+        expected = griddata((np.radians(azimuth), np.radians(elevation)), gain, np.column_stack((phi, theta)),
+                            method=method, fill_value=0.0)
+        assert healpix_gain.tolist() == expected.tolist()
+
+    @pytest.mark.parametrize('method', ['linear', 'nearest', 'cubic'])
+    def test_partial_map_matches_the_full_map(self, method):
+        random = np.random.default_rng(0)
+        azimuth, elevation, gain = random.uniform(0, 360, 200), random.uniform(20, 70, 200), random.normal(10, 5, 200)
+        loader = HealpixInterLoader('unused.csv', nside=NSIDE, workers=2)
+
+        pixels, partial_gain = loader.create_partial_healpix_object(azimuth, elevation, gain, method=method)
+        healpix_gain = loader.create_healpix_object(azimuth, elevation, gain, method=method)
+
+        assert np.all(np.diff(pixels) > 0)
+        assert partial_gain.tolist() == healpix_gain[pixels].tolist()
+        assert np.count_nonzero(np.delete(healpix_gain, pixels)) == 0
+        if method != 'nearest':
+            assert len(pixels) < hp.nside2npix(NSIDE)
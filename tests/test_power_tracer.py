@@ -0,0 +1,68 @@
+import logging
+
+import numpy as np
+import pytest
+
+from sopp.custom_dataclasses.power_array import PowerArray
+from sopp.power_tracer import POWER_TRACER, PowerTracer
+
+
+class TestPowerTracer:
+    def test_disabled_tracer_records_nothing(self):
+        tracer = PowerTracer()
+        tracer.record('stage', index=1)
+
+        assert not tracer.enabled
+        assert tracer.counters == {}
+
+    def test_counters_are_kept_per_stage(self):
+        tracer = PowerTracer()
+        with tracer.tracing(callback=lambda trace_event: None):
+            tracer.record('first')
+            tracer.record('first')
+            tracer.record('second', count=10)
+
+        assert tracer.counters == {'first': 2, 'second': 10}
+        assert not tracer.enabled
+
+    def test_every_nth_item_is_sent_to_the_callback(self):
+        tracer = PowerTracer()
+        trace_events = []
+        with tracer.tracing(callback=trace_events.append, sample_every=3):
+            for index in range(7):
+                tracer.record('stage', index=index)
+            tracer.record('stage', count=4)
+
+        assert [(trace_event.count, trace_event.fields) for trace_event in trace_events] == [
+            (3, {'index': 2}), (6, {'index': 5}), (11, {})
+        ]
+
+    def test_sample_every_must_be_positive(self):
+        with pytest.raises(ValueError):
+            PowerTracer().enable(sample_every=0)
+
+    def test_default_callback_logs_at_debug_level(self, caplog):
+        tracer = PowerTracer()
+        with caplog.at_level(logging.DEBUG, logger='sopp.power'), tracer.tracing():
+            tracer.record('stage', power=1.5)
+
+        assert "stage #1 {'power': 1.5}" in caplog.text
+
+    def test_power_array_is_quiet_by_default(self, capsys):
+        power_array = PowerArray(3)
+        power_array.add_power(1, 2.0)
+
+        assert capsys.readouterr().out == ''
+
+    def test_power_array_records_added_powers(self):
+        trace_events = []
+        POWER_TRACER.reset()
+        with POWER_TRACER.tracing(callback=trace_events.append):
+            power_array = PowerArray(3)
+            power_array.add_power(1, 2.0)
+            power_array.add_powers(np.array([0, 2]), np.array([1., 3.]))
+        POWER_TRACER.reset()
+
+        assert [trace_event.stage for trace_event in trace_events] == ['power_array.add_power', 'power_array.add_powers']
+        assert trace_events[1].count == 2
+        assert trace_events[1].fields['powers'].tolist() == [1., 3.]